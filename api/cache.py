@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """Запись кэша ответов API"""
+    value: Any
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class ResponseCache:
+    """
+    Кэш последних успешных ответов API с вытеснением по LRU.
+
+    Используется для условных запросов (ETag/Last-Modified) и как
+    источник данных, когда API недоступно.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """
+        Получение значения из кэша
+
+        Args:
+            key: Ключ запроса
+            max_age: Максимальный возраст записи в секундах (опционально)
+
+        Returns:
+            Сохраненное значение или None, если записи нет или она устарела
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if max_age is not None and time.monotonic() - entry.stored_at > max_age:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def peek(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Получение записи кэша без проверки возраста
+
+        Args:
+            key: Ключ запроса
+
+        Returns:
+            Запись кэша или None
+        """
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: Any, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        Сохранение значения в кэше
+
+        Args:
+            key: Ключ запроса
+            value: Ответ API
+            etag: Значение заголовка ETag ответа (опционально)
+            last_modified: Значение заголовка Last-Modified ответа (опционально)
+        """
+        self._entries[key] = CacheEntry(
+            value=value,
+            stored_at=time.monotonic(),
+            etag=etag,
+            last_modified=last_modified
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        """
+        Удаление записи из кэша (если она есть)
+
+        Args:
+            key: Ключ запроса
+        """
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
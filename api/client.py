@@ -1,13 +1,64 @@
+import asyncio
 import logging
+import time
 import aiohttp
-import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, List, Optional, Hashable, Callable, Tuple
 from datetime import datetime
-
-from config.config import API_BASE_URL, API_TOKEN, API_TIMEOUT
+from dataclasses import dataclass
+
+from config.config import (
+    API_BASE_URL,
+    API_TOKEN,
+    API_TIMEOUT,
+    API_RETRY_ATTEMPTS,
+    API_BREAKER_FAILURE_THRESHOLD,
+    API_BREAKER_RESET_TIMEOUT,
+    API_CACHE_MAX_ENTRIES,
+    API_CACHE_STALE_TTL,
+    API_POOL_SIZE,
+    API_KEEPALIVE_TIMEOUT,
+    API_DNS_CACHE_TTL,
+)
+from utils import json_codec, phases
+from utils.metrics import API_REQUEST_SECONDS
+from api.singleflight import SingleFlight
+from api.cache import ResponseCache, CacheEntry
+from api.errors import ApiError
+from api.models import (
+    ModelValidationError,
+    Match,
+    Team,
+    Championship,
+    Invitation,
+    UserProfile,
+)
+from api.resilience import (
+    RETRYABLE_STATUSES,
+    TransientApiError,
+    CircuitBreaker,
+    route_for,
+    timeout_for,
+    backoff_delay,
+)
 
 logger = logging.getLogger(__name__)
 
+# Общие для всех экземпляров клиента: основной процесс использует общий
+# клиент get_api_client(), задачи в других потоках создают свои ApiClient,
+# но все они обращаются к одному и тому же API
+_singleflight = SingleFlight()
+_breaker = CircuitBreaker(API_BREAKER_FAILURE_THRESHOLD, API_BREAKER_RESET_TIMEOUT)
+_response_cache = ResponseCache(API_CACHE_MAX_ENTRIES)
+
+
+@dataclass(slots=True)
+class _Response:
+    """Результат одной попытки запроса к API"""
+    payload: Any = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
 
 class ApiClient:
     """
@@ -18,72 +69,385 @@ class ApiClient:
         self.base_url = API_BASE_URL
         self.headers = {
             "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
             "Authorization": f"Bearer {API_TOKEN}"
         }
         self.timeout = aiohttp.ClientTimeout(total=API_TIMEOUT)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        HTTP-сессия клиента с пулом соединений к API
+
+        Сессия создается при первом запросе (в цикле событий, где работает
+        клиент) и переиспользует соединения между запросами.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(
+                    limit=API_POOL_SIZE,
+                    keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=API_DNS_CACHE_TTL
+                )
+            )
+        return self._session
+
+    async def warm_up(self, connections: int) -> int:
+        """
+        Открытие соединений с API заранее, до первых запросов пользователей
+
+        Одновременные HEAD-запросы к базовому URL разрешают имя сервера
+        (адрес попадает в кэш DNS) и оставляют в пуле до connections открытых
+        соединений. Код ответа значения не имеет.
+
+        Args:
+            connections: Количество соединений
+
+        Returns:
+            Количество успешно выполненных запросов
+        """
+        session = self._get_session()
+
+        async def touch() -> bool:
+            try:
+                async with session.head(self.base_url, headers=self.headers, allow_redirects=False) as response:
+                    await response.read()
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Не удалось открыть соединение с API {self.base_url}: {e}")
+                return False
+
+        results = await asyncio.gather(*(touch() for _ in range(connections)))
+        return sum(results)
+
+    async def close(self):
+        """
+        Закрытие HTTP-сессии клиента
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
-    async def _make_request(self, method: str, endpoint: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def _make_request(
+            self,
+            method: str,
+            endpoint: str,
+            data: Dict[str, Any] = None,
+            decoder: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
         """
         Выполнение HTTP запроса к API
 
+        Одновременные одинаковые GET-запросы (метод, URL и параметры)
+        объединяются в один запрос к API, результат получают все вызывающие.
+        Возвращаемый объект общий, изменять его нельзя.
+
         Args:
             method: HTTP метод (GET, POST, PUT, DELETE)
             endpoint: Конечная точка API
             data: Данные для отправки (опционально)
+            decoder: Функция преобразования ответа в модели (опционально)
 
         Returns:
-            Ответ от API в виде словаря
+            Ответ от API (модели, если указан decoder) или словарь с ошибкой
+        """
+        with phases.measure(phases.API):
+            if method != "GET":
+                return await self._execute(method, endpoint, data, decoder=decoder)
+
+            url = f"{self.base_url}/{endpoint}"
+            params_key = tuple(sorted((data or {}).items()))
+            return await _singleflight.do(
+                (method, url, params_key),
+                lambda: self._execute(method, endpoint, data, cache_key=(url, params_key), decoder=decoder)
+            )
+
+    async def _fetch(
+            self,
+            endpoint: str,
+            decoder: Callable[[Any], Any],
+            params: Dict[str, Any] = None
+    ) -> Any:
+        """
+        Получение данных из API в виде моделей
+
+        Args:
+            endpoint: Конечная точка API
+            decoder: Функция преобразования ответа в модели
+            params: Параметры запроса (опционально)
+
+        Returns:
+            Модели, построенные из ответа API
 
         Raises:
-            Exception: Если произошла ошибка при выполнении запроса
+            ApiError: Если API вернуло ошибку или некорректный ответ
         """
-        url = f"{self.base_url}/{endpoint}"
+        result = await self._make_request("GET", endpoint, params, decoder=decoder)
+        if isinstance(result, dict) and "error" in result:
+            raise ApiError.from_result(result)
+        return result
+
+    async def _execute(
+            self,
+            method: str,
+            endpoint: str,
+            data: Dict[str, Any] = None,
+            cache_key: Optional[Hashable] = None,
+            decoder: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        Выполнение запроса с измерением его времени по конечной точке
 
+        Args:
+            method: HTTP метод
+            endpoint: Конечная точка API
+            data: Данные для отправки (опционально)
+            cache_key: Ключ кэша ответов (только для GET-запросов)
+            decoder: Функция преобразования ответа в модели (опционально)
+
+        Returns:
+            Ответ от API (модели, если указан decoder) или словарь с ошибкой
+        """
+        start = time.perf_counter()
+        outcome = "error"
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                if method == "GET":
-                    async with session.get(url, headers=self.headers, params=data) as response:
-                        if response.status != 200:
-                            error_text = await response.text()
-                            logger.error(f"API error {response.status}: {error_text}")
-                            return {"error": f"API error {response.status}: {error_text}"}
-                        return await response.json()
-
-                elif method == "POST":
-                    async with session.post(url, headers=self.headers, json=data) as response:
-                        if response.status not in (200, 201):
-                            error_text = await response.text()
-                            logger.error(f"API error {response.status}: {error_text}")
-                            return {"error": f"API error {response.status}: {error_text}"}
-                        return await response.json()
-
-                elif method == "PUT":
-                    async with session.put(url, headers=self.headers, json=data) as response:
-                        if response.status != 200:
-                            error_text = await response.text()
-                            logger.error(f"API error {response.status}: {error_text}")
-                            return {"error": f"API error {response.status}: {error_text}"}
-                        return await response.json()
-
-                elif method == "DELETE":
-                    async with session.delete(url, headers=self.headers) as response:
-                        if response.status != 204:
-                            error_text = await response.text()
-                            logger.error(f"API error {response.status}: {error_text}")
-                            return {"error": f"API error {response.status}: {error_text}"}
-                        return {"success": True}
-
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
+            result = await self._execute_with_retries(method, endpoint, data, cache_key, decoder)
+            if not (isinstance(result, dict) and "error" in result):
+                outcome = "ok"
+            return result
+        finally:
+            API_REQUEST_SECONDS.observe(time.perf_counter() - start, method, route_for(endpoint), outcome)
+
+    async def _execute_with_retries(
+            self,
+            method: str,
+            endpoint: str,
+            data: Dict[str, Any] = None,
+            cache_key: Optional[Hashable] = None,
+            decoder: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        """
+        Выполнение запроса с бюджетом времени, повторами и автоматическим выключателем
+
+        Повторяются только GET-запросы, со случайной экспоненциальной задержкой.
+        Все попытки укладываются в бюджет времени конечной точки. Пока
+        выключатель открыт, запросы к API не выполняются, а GET-запросы
+        получают последний успешный ответ из кэша, если он есть.
+        Если API отвечает 304 Not Modified, возвращается сохраненный ответ.
+
+        Ответ проверяется и преобразуется в модели один раз, при получении.
+        В кэше хранятся уже готовые модели.
+
+        Args:
+            method: HTTP метод
+            endpoint: Конечная точка API
+            data: Данные для отправки (опционально)
+            cache_key: Ключ кэша ответов (только для GET-запросов)
+            decoder: Функция преобразования ответа в модели (опционально)
 
+        Returns:
+            Ответ от API (модели, если указан decoder) или словарь с ошибкой
+        """
+        url = f"{self.base_url}/{endpoint}"
+        route = route_for(endpoint)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_for(route)
+        attempts = max(API_RETRY_ATTEMPTS, 1) if method == "GET" else 1
+        error = f"Timeout: budget for {route} exhausted"
+
+        for attempt in range(attempts):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+
+            if not _breaker.allow_request():
+                logger.warning(f"API недоступно, запрос {method} {route} отклонен автоматическим выключателем")
+                error = "Service unavailable: circuit breaker is open"
+                break
+
+            cached_entry = _response_cache.peek(cache_key) if cache_key is not None else None
+            try:
+                response = await self._send_request(method, url, data, remaining, cached_entry)
+            except TransientApiError as e:
+                _breaker.record_failure()
+                error = str(e)
+                logger.warning(f"Попытка {attempt + 1}/{attempts} запроса {method} {route} не удалась: {e}")
+                if attempt + 1 < attempts:
+                    delay = min(backoff_delay(attempt), deadline - loop.time())
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                continue
+
+            _breaker.record_success()
+            if response.not_modified:
+                _response_cache.set(cache_key, cached_entry.value, cached_entry.etag, cached_entry.last_modified)
+                return cached_entry.value
+
+            result = response.payload
+            if isinstance(result, dict) and "error" in result:
+                return result
+
+            if decoder is not None:
+                try:
+                    result = decoder(result)
+                except ModelValidationError as e:
+                    logger.error(f"Некорректный ответ API на запрос {method} {route}: {e}")
+                    return {"error": f"Invalid response: {e}"}
+
+            if cache_key is not None:
+                _response_cache.set(cache_key, result, response.etag, response.last_modified)
+            return result
+
+        if cache_key is not None:
+            cached = _response_cache.get(cache_key, max_age=API_CACHE_STALE_TTL)
+            if cached is not None:
+                logger.warning(f"Запрос {method} {route} не выполнен ({error}), используются кэшированные данные")
+                return cached
+
+        logger.error(f"Ошибка при выполнении запроса к {url}: {error}")
+        return {"error": error}
+
+    async def _send_request(
+            self,
+            method: str,
+            url: str,
+            data: Dict[str, Any] = None,
+            timeout: float = None,
+            cached_entry: Optional[CacheEntry] = None
+    ) -> _Response:
+        """
+        Выполнение одной попытки HTTP запроса к API
+
+        Если для GET-запроса есть сохраненный ответ с валидаторами,
+        запрос выполняется как условный (If-None-Match/If-Modified-Since).
+
+        Args:
+            method: HTTP метод (GET, POST, PUT, DELETE)
+            url: Полный URL запроса
+            data: Данные для отправки (опционально)
+            timeout: Таймаут попытки в секундах (опционально)
+            cached_entry: Сохраненный ответ на этот же GET-запрос (опционально)
+
+        Returns:
+            Ответ от API
+
+        Raises:
+            TransientApiError: Если произошел сетевой сбой, таймаут или API вернуло 5xx/429
+        """
+        client_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else self.timeout
+
+        try:
+            session = self._get_session()
+            if method == "GET":
+                headers = self.headers
+                if cached_entry is not None and (cached_entry.etag or cached_entry.last_modified):
+                    headers = dict(self.headers)
+                    if cached_entry.etag:
+                        headers["If-None-Match"] = cached_entry.etag
+                    if cached_entry.last_modified:
+                        headers["If-Modified-Since"] = cached_entry.last_modified
+
+                async with session.get(url, headers=headers, params=data, timeout=client_timeout) as response:
+                    if response.status == 304 and cached_entry is not None:
+                        return _Response(not_modified=True)
+                    if response.status != 200:
+                        return _Response(await self._error_response(response))
+                    return _Response(
+                        await self._read_json(response),
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified")
+                    )
+
+            elif method == "POST":
+                async with session.post(
+                        url, headers=self.headers, data=self._encode_body(data), timeout=client_timeout
+                ) as response:
+                    if response.status not in (200, 201):
+                        return _Response(await self._error_response(response))
+                    return _Response(await self._read_json(response))
+
+            elif method == "PUT":
+                async with session.put(
+                        url, headers=self.headers, data=self._encode_body(data), timeout=client_timeout
+                ) as response:
+                    if response.status != 200:
+                        return _Response(await self._error_response(response))
+                    return _Response(await self._read_json(response))
+
+            elif method == "DELETE":
+                async with session.delete(url, headers=self.headers, timeout=client_timeout) as response:
+                    if response.status != 204:
+                        return _Response(await self._error_response(response))
+                    return _Response({"success": True})
+
+            else:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+
+        except TransientApiError:
+            raise
+        except asyncio.TimeoutError:
+            raise TransientApiError(f"Timeout after {client_timeout.total:.1f}s")
         except aiohttp.ClientError as e:
-            logger.error(f"Ошибка при выполнении запроса к {url}: {e}")
-            return {"error": f"Network error: {str(e)}"}
+            raise TransientApiError(f"Network error: {str(e)}")
         except Exception as e:
             logger.error(f"Необработанная ошибка при запросе к {url}: {e}")
-            return {"error": f"Unexpected error: {str(e)}"}
+            return _Response({"error": f"Unexpected error: {str(e)}"})
 
-    async def get_user_data(self, phone_number: str) -> Dict[str, Any]:
+    @staticmethod
+    def _encode_body(data: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        """
+        Кодирование тела запроса в JSON
+
+        Args:
+            data: Данные для отправки
+
+        Returns:
+            Тело запроса или None, если данных нет
+        """
+        if data is None:
+            return None
+        return json_codec.dumps_bytes(data)
+
+    @staticmethod
+    async def _read_json(response: aiohttp.ClientResponse) -> Any:
+        """
+        Чтение и декодирование JSON из ответа API
+
+        Args:
+            response: Ответ API
+
+        Returns:
+            Декодированный ответ или None, если тело ответа пустое
+        """
+        body = await response.read()
+        if not body.strip():
+            return None
+        return json_codec.loads(body)
+
+    @staticmethod
+    async def _error_response(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+        """
+        Обработка ответа API с неуспешным статусом
+
+        Args:
+            response: Ответ API
+
+        Returns:
+            Словарь с описанием ошибки
+
+        Raises:
+            TransientApiError: Если статус говорит о временной недоступности API
+        """
+        error_text = await response.text()
+        message = f"API error {response.status}: {error_text}"
+        if response.status in RETRYABLE_STATUSES:
+            raise TransientApiError(message)
+        logger.error(message)
+        return {"error": message, "status": response.status}
+
+    async def get_user_data(self, phone_number: str) -> UserProfile:
         """
         Получение данных пользователя по номеру телефона
 
@@ -91,11 +455,14 @@ class ApiClient:
             phone_number: Номер телефона пользователя
 
         Returns:
-            Словарь с данными пользователя
+            Профиль пользователя
+
+        Raises:
+            ApiError: Если пользователь не найден или API недоступно
         """
-        return await self._make_request("GET", f"users/by-phone/{phone_number}")
+        return await self._fetch(f"users/by-phone/{phone_number}", UserProfile.from_dict)
 
-    async def get_upcoming_matches(self, days: int = 1) -> List[Dict[str, Any]]:
+    async def get_upcoming_matches(self, days: int = 1) -> Tuple[Match, ...]:
         """
         Получение предстоящих матчей на ближайшие дни
 
@@ -104,10 +471,13 @@ class ApiClient:
 
         Returns:
             Список матчей
+
+        Raises:
+            ApiError: Если API вернуло ошибку
         """
-        return await self._make_request("GET", "matches/upcoming", {"days": days})
+        return await self._fetch("matches/upcoming", Match.parse_list, {"days": days})
 
-    async def get_recommended_championships(self, user_id: int) -> List[Dict[str, Any]]:
+    async def get_recommended_championships(self, user_id: int) -> Tuple[Championship, ...]:
         """
         Получение рекомендуемых чемпионатов для пользователя
 
@@ -116,16 +486,25 @@ class ApiClient:
 
         Returns:
             Список рекомендуемых чемпионатов
+
+        Raises:
+            ApiError: Если API вернуло ошибку
         """
-        return await self._make_request("GET", f"championships/recommended/{user_id}")
+        return await self._fetch(f"championships/recommended/{user_id}", Championship.parse_list)
 
-    async def confirm_notification_delivery(self, notification_id: int, delivered: bool = True) -> Dict[str, Any]:
+    async def confirm_notification_delivery(
+            self,
+            notification_id: int,
+            delivered: bool = True,
+            delivered_at: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Подтверждение доставки уведомления
 
         Args:
             notification_id: ID уведомления
             delivered: Флаг доставки
+            delivered_at: Время доставки в формате ISO 8601 (по умолчанию - текущее)
 
         Returns:
             Результат операции
@@ -133,11 +512,27 @@ class ApiClient:
         data = {
             "notification_id": notification_id,
             "delivered": delivered,
-            "delivered_at": datetime.now().isoformat()
+            "delivered_at": delivered_at or datetime.now().isoformat()
         }
         return await self._make_request("POST", "notifications/confirm-delivery", data)
 
-    async def get_user_teams(self, user_id: int) -> List[Dict[str, Any]]:
+    async def confirm_notification_deliveries(self, receipts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Подтверждение доставки нескольких уведомлений одним запросом
+
+        Пачка передается отдельной конечной точке confirm-delivery/batch в
+        теле {"receipts": [...]}, формат каждого подтверждения - как у
+        confirm_notification_delivery.
+
+        Args:
+            receipts: Подтверждения: notification_id, delivered и delivered_at
+
+        Returns:
+            Результат операции
+        """
+        return await self._make_request("POST", "notifications/confirm-delivery/batch", {"receipts": receipts})
+
+    async def get_user_teams(self, user_id: int) -> Tuple[Team, ...]:
         """
         Получение команд пользователя
 
@@ -146,10 +541,13 @@ class ApiClient:
 
         Returns:
             Список команд пользователя
+
+        Raises:
+            ApiError: Если API вернуло ошибку
         """
-        return await self._make_request("GET", f"users/{user_id}/teams")
+        return await self._fetch(f"users/{user_id}/teams", Team.parse_list)
 
-    async def get_user_championships(self, user_id: int) -> List[Dict[str, Any]]:
+    async def get_user_championships(self, user_id: int) -> Tuple[Championship, ...]:
         """
         Получение чемпионатов пользователя
 
@@ -158,10 +556,13 @@ class ApiClient:
 
         Returns:
             Список чемпионатов пользователя
+
+        Raises:
+            ApiError: Если API вернуло ошибку
         """
-        return await self._make_request("GET", f"users/{user_id}/championships")
+        return await self._fetch(f"users/{user_id}/championships", Championship.parse_list)
 
-    async def get_user_matches(self, user_id: int, status: str = "upcoming") -> List[Dict[str, Any]]:
+    async def get_user_matches(self, user_id: int, status: str = "upcoming") -> Tuple[Match, ...]:
         """
         Получение матчей пользователя
 
@@ -171,10 +572,13 @@ class ApiClient:
 
         Returns:
             Список матчей пользователя
+
+        Raises:
+            ApiError: Если API вернуло ошибку
         """
-        return await self._make_request("GET", f"users/{user_id}/matches", {"status": status})
+        return await self._fetch(f"users/{user_id}/matches", Match.parse_list, {"status": status})
 
-    async def get_team_details(self, team_id: int) -> Dict[str, Any]:
+    async def get_team_details(self, team_id: int) -> Team:
         """
         Получение детальной информации о команде
 
@@ -183,10 +587,13 @@ class ApiClient:
 
         Returns:
             Информация о команде
+
+        Raises:
+            ApiError: Если команда не найдена или API вернуло ошибку
         """
-        return await self._make_request("GET", f"teams/{team_id}")
+        return await self._fetch(f"teams/{team_id}", Team.from_dict)
 
-    async def get_championship_details(self, tournament_id: int) -> Dict[str, Any]:
+    async def get_championship_details(self, tournament_id: int) -> Championship:
         """
         Получение детальной информации о чемпионате
 
@@ -195,8 +602,11 @@ class ApiClient:
 
         Returns:
             Информация о чемпионате
+
+        Raises:
+            ApiError: Если чемпионат не найден или API вернуло ошибку
         """
-        return await self._make_request("GET", f"championships/{tournament_id}")
+        return await self._fetch(f"championships/{tournament_id}", Championship.from_dict)
 
     async def accept_team_invitation(self, invitation_id: int) -> Dict[str, Any]:
         """
@@ -250,7 +660,7 @@ class ApiClient:
         result = await self._make_request("POST", f"invitations/committee/{invitation_id}/decline")
         return result
 
-    async def get_user_invitations(self, user_id: int, type: str = "all") -> List[Dict[str, Any]]:
+    async def get_user_invitations(self, user_id: int, type: str = "all") -> Tuple[Invitation, ...]:
         """
         Получение приглашений пользователя
 
@@ -260,8 +670,11 @@ class ApiClient:
 
         Returns:
             Список приглашений
+
+        Raises:
+            ApiError: Если API вернуло ошибку
         """
-        return await self._make_request("GET", f"users/{user_id}/invitations", {"type": type})
+        return await self._fetch(f"users/{user_id}/invitations", Invitation.parse_list, {"type": type})
 
     async def decline_match(self, match_id: int, team_id: int, reason: str) -> Dict[str, Any]:
         """
@@ -283,4 +696,22 @@ class ApiClient:
             })
         except Exception as e:
             logger.error(f"Ошибка при отклонении участия в матче {match_id}: {e}")
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return {"success": False, "error": str(e)}
+
+
+_default_client: Optional[ApiClient] = None
+
+
+def get_api_client() -> ApiClient:
+    """
+    Общий клиент API для обработчиков основного процесса
+
+    Клиент создается при первом обращении; его HTTP-сессия - при первом запросе.
+
+    Returns:
+        Клиент API
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = ApiClient()
+    return _default_client
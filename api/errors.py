@@ -0,0 +1,25 @@
+from typing import Any, Dict, Optional
+
+
+class ApiError(Exception):
+    """
+    Ошибка при получении данных из API основного приложения
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "ApiError":
+        """
+        Создание исключения из словаря с ошибкой, который возвращает ApiClient
+
+        Args:
+            result: Словарь вида {"error": ..., "status": ...}
+
+        Returns:
+            Исключение ApiError
+        """
+        return cls(str(result.get("error", "")), result.get("status"))
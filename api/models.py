@@ -0,0 +1,270 @@
+""" Типизированные модели данных API основного приложения """
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ModelValidationError(ValueError):
+    """Ответ API не соответствует ожидаемой структуре"""
+
+
+def _require_dict(data: Any, model: str) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        raise ModelValidationError(f"{model}: ожидался объект, получено {type(data).__name__}")
+    return data
+
+
+def _str(data: Dict[str, Any], key: str, default: str = "") -> str:
+    value = data.get(key)
+    if value is None:
+        return default
+    return str(value)
+
+
+def _int(data: Dict[str, Any], *keys: str) -> Optional[int]:
+    for key in keys:
+        value = data.get(key)
+        if value is None or value == "":
+            continue
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ModelValidationError(f"Поле {key} должно быть целым числом, получено {value!r}")
+    return None
+
+
+def _bool(data: Dict[str, Any], key: str) -> bool:
+    return bool(data.get(key, False))
+
+
+def _datetime(data: Dict[str, Any], key: str) -> Optional[datetime]:
+    value = data.get(key)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ModelValidationError(f"Поле {key} должно быть датой в формате ISO, получено {value!r}")
+
+
+def parse_list(factory: Callable[[Dict[str, Any]], T], data: Any) -> Tuple[T, ...]:
+    """
+    Разбор списка объектов из ответа API
+
+    Некорректные элементы пропускаются с предупреждением в логе.
+
+    Args:
+        factory: Функция создания модели из словаря
+        data: Декодированный ответ API
+
+    Returns:
+        Кортеж моделей
+
+    Raises:
+        ModelValidationError: Если ответ не является списком
+    """
+    if not isinstance(data, list):
+        raise ModelValidationError(f"Ожидался список, получено {type(data).__name__}")
+
+    items = []
+    for item in data:
+        try:
+            items.append(factory(item))
+        except ModelValidationError as e:
+            logger.warning(f"Пропущен некорректный элемент ответа API: {e}")
+    return tuple(items)
+
+
+@dataclass(frozen=True, slots=True)
+class Match:
+    """Матч"""
+    id: Optional[int]
+    tournament_name: str
+    opponent_name: str
+    date: str
+    time: str
+    date_time: Optional[datetime]
+    location_name: str
+    location_address: str
+    team1_id: Optional[int]
+    team2_id: Optional[int]
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Match":
+        data = _require_dict(data, "Match")
+        return cls(
+            id=_int(data, "id", "match_id"),
+            tournament_name=_str(data, "tournament_name"),
+            opponent_name=_str(data, "opponent_name"),
+            date=_str(data, "date").split("T")[0],
+            time=_str(data, "time"),
+            date_time=_datetime(data, "date_time"),
+            location_name=_str(data, "location_name"),
+            location_address=_str(data, "location_address"),
+            team1_id=_int(data, "team1_id"),
+            team2_id=_int(data, "team2_id"),
+        )
+
+    @classmethod
+    def parse_list(cls, data: Any) -> Tuple["Match", ...]:
+        return parse_list(cls.from_dict, data)
+
+
+@dataclass(frozen=True, slots=True)
+class TeamMember:
+    """Участник команды"""
+    user_id: Optional[int]
+    first_name: str
+    last_name: str
+    is_captain: bool
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "TeamMember":
+        data = _require_dict(data, "TeamMember")
+        return cls(
+            user_id=_int(data, "user_id"),
+            first_name=_str(data, "first_name"),
+            last_name=_str(data, "last_name"),
+            is_captain=_bool(data, "is_captain"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Team:
+    """Команда"""
+    id: Optional[int]
+    name: str
+    sport: str
+    count_member: int
+    wins: int
+    loss: int
+    is_captain: bool
+    members: Tuple[TeamMember, ...]
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Team":
+        data = _require_dict(data, "Team")
+        members = data.get("members") or []
+        return cls(
+            id=_int(data, "id", "team_id"),
+            name=_str(data, "name"),
+            sport=_str(data, "sport"),
+            count_member=_int(data, "count_member") or 0,
+            wins=_int(data, "wins") or 0,
+            loss=_int(data, "loss") or 0,
+            is_captain=_bool(data, "is_captain"),
+            members=parse_list(TeamMember.from_dict, members),
+        )
+
+    @classmethod
+    def parse_list(cls, data: Any) -> Tuple["Team", ...]:
+        return parse_list(cls.from_dict, data)
+
+
+@dataclass(frozen=True, slots=True)
+class Stage:
+    """Этап чемпионата"""
+    name: str
+    is_published: bool
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Stage":
+        data = _require_dict(data, "Stage")
+        return cls(name=_str(data, "name"), is_published=_bool(data, "is_published"))
+
+
+@dataclass(frozen=True, slots=True)
+class Championship:
+    """Чемпионат"""
+    id: Optional[int]
+    name: str
+    sport: str
+    city: str
+    status: str
+    position: Optional[int]
+    team_members_count: Optional[int]
+    application_deadline: str
+    description: str
+    org_name: str
+    is_stopped: bool
+    stages: Tuple[Stage, ...]
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Championship":
+        data = _require_dict(data, "Championship")
+        return cls(
+            id=_int(data, "tournament_id", "id"),
+            name=_str(data, "name"),
+            sport=_str(data, "sport"),
+            city=_str(data, "city"),
+            status=_str(data, "status"),
+            position=_int(data, "position"),
+            team_members_count=_int(data, "team_members_count"),
+            application_deadline=_str(data, "application_deadline"),
+            description=_str(data, "description"),
+            org_name=_str(data, "org_name"),
+            is_stopped=_bool(data, "is_stopped"),
+            stages=parse_list(Stage.from_dict, data.get("stages") or []),
+        )
+
+    @classmethod
+    def parse_list(cls, data: Any) -> Tuple["Championship", ...]:
+        return parse_list(cls.from_dict, data)
+
+
+@dataclass(frozen=True, slots=True)
+class Invitation:
+    """Приглашение в команду или оргкомитет"""
+    invitation_id: int
+    type: str
+    team_name: str
+    sport: str
+    committee_name: str
+    inviter_name: str
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Invitation":
+        data = _require_dict(data, "Invitation")
+        invitation_id = _int(data, "invitation_id")
+        invitation_type = _str(data, "type")
+        if invitation_id is None:
+            raise ModelValidationError("Invitation: отсутствует invitation_id")
+        if invitation_type not in ("team", "committee"):
+            raise ModelValidationError(f"Invitation: неизвестный тип приглашения {invitation_type!r}")
+        return cls(
+            invitation_id=invitation_id,
+            type=invitation_type,
+            team_name=_str(data, "team_name"),
+            sport=_str(data, "sport"),
+            committee_name=_str(data, "committee_name"),
+            inviter_name=_str(data, "inviter_name"),
+        )
+
+    @classmethod
+    def parse_list(cls, data: Any) -> Tuple["Invitation", ...]:
+        return parse_list(cls.from_dict, data)
+
+
+@dataclass(frozen=True, slots=True)
+class UserProfile:
+    """Профиль пользователя платформы"""
+    id: Optional[int]
+    first_name: str
+    last_name: str
+    phone_number: str
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "UserProfile":
+        data = _require_dict(data, "UserProfile")
+        return cls(
+            id=_int(data, "id", "user_id"),
+            first_name=_str(data, "first_name", "Пользователь"),
+            last_name=_str(data, "last_name"),
+            phone_number=_str(data, "phone_number"),
+        )
@@ -0,0 +1,123 @@
+import random
+import re
+import time
+
+from config.config import (
+    API_TIMEOUT,
+    API_ENDPOINT_TIMEOUTS,
+    API_RETRY_BASE_DELAY,
+    API_RETRY_MAX_DELAY,
+)
+
+_ID_SEGMENT = re.compile(r"(?<=/)\d+(?=/|$)")
+
+# Статусы, при которых запрос можно повторить и которые говорят о сбое API
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TransientApiError(Exception):
+    """Временная ошибка API: сетевой сбой, таймаут или ответ 5xx/429"""
+
+
+def route_for(endpoint: str) -> str:
+    """
+    Шаблон конечной точки без конкретных идентификаторов
+
+    Args:
+        endpoint: Конечная точка API, например "users/15/matches"
+
+    Returns:
+        Шаблон, например "users/{id}/matches"
+    """
+    return _ID_SEGMENT.sub("{id}", endpoint.strip("/"))
+
+
+def timeout_for(route: str) -> float:
+    """
+    Бюджет времени на запрос к конечной точке с учетом повторов
+
+    Args:
+        route: Шаблон конечной точки
+
+    Returns:
+        Бюджет в секундах
+    """
+    return API_ENDPOINT_TIMEOUTS.get(route, float(API_TIMEOUT))
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Задержка перед повтором: экспоненциальная, со случайным разбросом (full jitter)
+
+    Args:
+        attempt: Номер неудачной попытки, начиная с 0
+
+    Returns:
+        Задержка в секундах
+    """
+    return random.uniform(0, min(API_RETRY_MAX_DELAY, API_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Автоматический выключатель для запросов к API.
+
+    После failure_threshold последовательных сбоев переходит в открытое
+    состояние и сразу отклоняет запросы. Через reset_timeout пропускает
+    одну пробную попытку: при успехе закрывается, при сбое снова открывается.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started_at = None
+
+    def allow_request(self) -> bool:
+        """
+        Можно ли выполнять запрос к API
+
+        Returns:
+            True, если запрос разрешен, иначе False
+        """
+        if self.state == self.CLOSED:
+            return True
+
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_started_at = None
+
+        # Полуоткрытое состояние: одна пробная попытка за раз. Если пробный
+        # запрос потерялся (например, был отменен), через reset_timeout
+        # разрешается новый.
+        if self._trial_started_at is not None and now - self._trial_started_at < self.reset_timeout:
+            return False
+        self._trial_started_at = now
+        return True
+
+    def record_success(self):
+        """
+        Регистрация успешного обращения к API
+        """
+        self.state = self.CLOSED
+        self._failures = 0
+        self._trial_started_at = None
+
+    def record_failure(self):
+        """
+        Регистрация сбоя при обращении к API
+        """
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_started_at = None
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Объединение одновременных одинаковых запросов.
+
+    Пока вызов с некоторым ключом выполняется, все остальные вызовы
+    с тем же ключом не порождают новых запросов, а ожидают результата
+    уже идущего. Результат (или исключение) получают все ожидающие.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнение вызова с объединением по ключу
+
+        Args:
+            key: Ключ запроса (одинаковые ключи объединяются)
+            func: Функция, возвращающая корутину с реальным вызовом
+
+        Returns:
+            Результат вызова, общий для всех ожидающих
+        """
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+
+        # shield: отмена одного ожидающего не должна отменять общий запрос
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Исключение уже передано ожидающим, помечаем его как полученное
+            task.exception()
+
+    def in_flight(self) -> int:
+        """
+        Количество выполняющихся в данный момент запросов
+        """
+        return len(self._calls)
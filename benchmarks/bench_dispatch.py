@@ -0,0 +1,295 @@
+"""
+Сквозной замер рассылки уведомлений.
+
+Запуск:
+    python -m benchmarks.bench_dispatch [--users 1000] [--notifications 10000]
+        [--matches 20] [--max-rps 10000] [--telegram-latency lognormal:30:0.5]
+        [--api-latency fixed:5] [--blocked-rate 0.01] [--output results.json]
+
+Бенчмарк заполняет базу пользователями и уведомлениями всех типов
+(NotificationType), создает напоминания о матчах задачей
+create_match_reminder_notifications через эмулятор API основного приложения
+(benchmarks.fake_platform) и рассылает очередь функцией
+process_pending_notifications через эмулятор Telegram Bot API
+(benchmarks.fake_telegram).
+
+Результат выводится в JSON, чтобы сравнивать прогоны на разных коммитах:
+- messages_per_second: отправленные в Telegram сообщения в секунду;
+- latency_ms: p50/p95/p99 времени от постановки уведомления в очередь
+  (created_at) до отметки об отправке (sent_at);
+- queries_per_message: SQL-запросы при рассылке (вместе с передачей
+  подтверждений доставки) в расчете на уведомление;
+- peak_rss_mib: пиковый объем памяти процесса за весь прогон.
+
+По умолчанию используется временная база SQLite; для замеров на PostgreSQL
+укажите --database-url. Бенчмарк очищает таблицы users и notifications
+выбранной базы, поэтому не запускайте его на рабочей базе.
+
+Переменные окружения DATABASE_URL и API_BASE_URL задаются до импорта
+конфигурации, поэтому модули бота импортируются внутри функций.
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+HOST = "127.0.0.1"
+
+
+def free_port() -> int:
+    """
+    Свободный локальный порт для эмулятора
+    """
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_mib() -> float:
+    """
+    Пиковый объем памяти процесса (ru_maxrss в Linux - КиБ, в macOS - байты)
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+
+def percentiles(values, points=(50, 95, 99)) -> dict:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {f"p{point}": round(value, 2) for point in points}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{point}": round(cuts[point - 1], 2) for point in points}
+
+
+def seed(users: int, notifications: int):
+    """
+    Очистка таблиц и заполнение базы пользователями и уведомлениями всех типов
+    """
+    from config.config import NOTIFICATION_PRERENDER
+    from database.connection import get_db_session
+    from database.models import DeliveryReceipt, Notification, NotificationType, User
+    from database.repositories.notification_repository import NotificationRepository
+    from utils import json_codec
+
+    types = list(NotificationType)
+    metadata = {
+        "team_name": "Спартак-2",
+        "championship_name": "Любительская лига",
+        "opponent_name": "Динамо",
+        "match_date": "2024-06-01",
+        "match_time": "19:30",
+        "venue": "Стадион «Труд»",
+        "address": "ул. Спортивная, 1",
+        "invitation_id": 1,
+    }
+    rendered = {
+        notification_type: NotificationRepository._render(
+            notification_type, "Уведомление", "Текст уведомления", metadata
+        ) if NOTIFICATION_PRERENDER else {}
+        for notification_type in types
+    }
+    metadata_json = json_codec.dumps(metadata)
+
+    with get_db_session() as session:
+        session.query(DeliveryReceipt).delete()
+        session.query(Notification).delete()
+        session.query(User).delete()
+
+    with get_db_session() as session:
+        session.bulk_save_objects([
+            User(
+                id=index + 1,
+                phone_number=f"7900{index:07d}",
+                telegram_id=str(100000 + index),
+                first_name="Иван",
+                last_name="Петров",
+                is_active=True
+            )
+            for index in range(users)
+        ])
+
+    # Время создания задается явно и различается на микросекунду, чтобы порядок
+    # очереди был однозначным и одинаковым в SQLite и PostgreSQL
+    enqueued_at = datetime.now()
+    with get_db_session() as session:
+        session.bulk_save_objects([
+            Notification(
+                user_id=index % users + 1,
+                type=types[index % len(types)],
+                title="Уведомление",
+                content="Текст уведомления",
+                metadata_json=metadata_json,
+                created_at=enqueued_at + timedelta(microseconds=index),
+                **rendered[types[index % len(types)]]
+            )
+            for index in range(notifications)
+        ])
+
+
+def delivery_latencies(since: datetime):
+    """
+    Время от постановки в очередь до отметки об отправке (мс) для уведомлений,
+    отправленных начиная с since
+    """
+    from database.connection import get_db_session
+    from database.models import Notification
+
+    with get_db_session() as session:
+        rows = session.query(Notification.created_at, Notification.sent_at).filter(
+            Notification.is_sent == True,
+            Notification.sent_at >= since
+        ).all()
+    return [(sent_at - created_at).total_seconds() * 1000 for created_at, sent_at in rows]
+
+
+async def run(args) -> dict:
+    from aiogram import Bot
+
+    from benchmarks.fake_platform import FakePlatformServer
+    from benchmarks.fake_telegram import FakeTelegramServer
+    from benchmarks.query_budget import QueryCounter
+    from api.client import get_api_client
+    from bot.handlers.notification import process_pending_notifications
+    from bot.receipts import ReceiptOutbox
+    from bot.telegram_api import get_api_server
+    from database.connection import get_engine
+    from database.migrations import upgrade
+    from database.repositories.notification_repository import NotificationRepository
+
+    telegram = FakeTelegramServer(
+        latency=args.telegram_latency,
+        retry_after_rate=args.retry_after_rate,
+        blocked_rate=args.blocked_rate,
+        chat_not_found_rate=args.chat_not_found_rate,
+        seed=args.seed
+    )
+    platform = FakePlatformServer(
+        latency=args.api_latency,
+        users=args.users,
+        matches=args.matches,
+        team_size=args.team_size,
+        seed=args.seed
+    )
+    telegram_url = await telegram.start(HOST, args.telegram_port)
+    await platform.start(HOST, args.api_port)
+
+    upgrade()
+    engine = get_engine()
+    counter = QueryCounter(engine)
+
+    started_at = time.perf_counter()
+    await asyncio.to_thread(seed, args.users, args.notifications)
+    seed_seconds = time.perf_counter() - started_at
+
+    counter.reset()
+    started_at = time.perf_counter()
+    reminders = await asyncio.to_thread(NotificationRepository.create_match_reminder_notifications)
+    reminder_seconds = time.perf_counter() - started_at
+    reminder_queries = counter.reset()
+
+    bot = Bot(token="123456:bench", server=get_api_server(telegram_url))
+    outbox = ReceiptOutbox(get_api_client())
+    try:
+        dispatch_started_at = datetime.now()
+        started_at = time.perf_counter()
+        outbox.start()
+        await process_pending_notifications(bot, max_rps=args.max_rps, outbox=outbox)
+        dispatch_seconds = time.perf_counter() - started_at
+        # Остаток подтверждений передается при остановке, как при завершении бота
+        await outbox.stop()
+        dispatch_queries = counter.reset()
+    finally:
+        await get_api_client().close()
+        await (await bot.get_session()).close()
+        await telegram.stop()
+        await platform.stop()
+
+    latencies = await asyncio.to_thread(delivery_latencies, dispatch_started_at)
+    processed = len(latencies)
+    delivered = len(telegram.sent)
+
+    return {
+        "label": args.label,
+        "database": engine.dialect.name,
+        "users": args.users,
+        "notifications": args.notifications,
+        "match_reminders": reminders,
+        "seed_seconds": round(seed_seconds, 3),
+        "reminder_seconds": round(reminder_seconds, 3),
+        "reminder_queries": reminder_queries,
+        "dispatch_seconds": round(dispatch_seconds, 3),
+        "processed": processed,
+        "delivered": delivered,
+        "messages_per_second": round(delivered / dispatch_seconds, 1) if dispatch_seconds else 0.0,
+        "latency_ms": percentiles(latencies),
+        "queries": dispatch_queries,
+        "queries_per_message": round(dispatch_queries / processed, 2) if processed else 0.0,
+        "peak_rss_mib": round(peak_rss_mib(), 1),
+        "telegram": telegram.stats(),
+        "platform": platform.stats(),
+        "receipt_requests": (
+            platform.calls.get("/api/notifications/confirm-delivery", 0)
+            + platform.calls.get("/api/notifications/confirm-delivery/batch", 0)
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сквозной замер рассылки уведомлений")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--notifications", type=int, default=10000)
+    parser.add_argument("--matches", type=int, default=20, help="Матчей на завтра в эмуляторе API")
+    parser.add_argument("--team-size", type=int, default=11)
+    parser.add_argument("--max-rps", type=float, default=10000)
+    parser.add_argument("--telegram-latency", default="fixed:0")
+    parser.add_argument("--api-latency", default="fixed:0")
+    parser.add_argument("--retry-after-rate", type=float, default=0.0)
+    parser.add_argument("--blocked-rate", type=float, default=0.0)
+    parser.add_argument("--chat-not-found-rate", type=float, default=0.0)
+    parser.add_argument("--database-url", default=None, help="По умолчанию - временная база SQLite")
+    parser.add_argument("--telegram-port", type=int, default=0)
+    parser.add_argument("--api-port", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default="", help="Метка прогона, например хеш коммита")
+    parser.add_argument("--output", default=None, help="Файл для результатов (по умолчанию - stdout)")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.database_url is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_dispatch.db')}"
+    args.api_port = args.api_port or free_port()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["API_BASE_URL"] = f"http://{HOST}:{args.api_port}/api"
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:bench")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from utils.logger import setup_logger
+    from utils import json_codec
+
+    setup_logger()
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    output = json_codec.dumps(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Сравнение библиотек JSON на реалистичных данных бота.
+
+Запуск:
+    python -m benchmarks.bench_json_codec [--repeat 5] [--number 2000]
+
+Для каждой установленной библиотеки (orjson, msgspec, json) измеряется время:
+- разбора metadata_json при отправке уведомления;
+- сериализации метаданных при создании уведомления;
+- разбора списка матчей на два дня (формирование напоминаний).
+
+В конце выводится экономия процессорного времени на 1000 отправок
+по сравнению со стандартной библиотекой json.
+"""
+
+import argparse
+import timeit
+
+from utils.json_codec import available_backends
+
+DISPATCHES = 1000
+
+METADATA_SAMPLES = [
+    {
+        "championship_name": "Любительская лига Москвы по мини-футболу 2024",
+        "opponent_name": "ФК Северное Бутово",
+        "match_date": "2024-05-18",
+        "match_time": "19:30",
+        "venue": "Спорткомплекс «Олимп»",
+        "address": "г. Москва, ул. Академика Королева, д. 12, стр. 3",
+    },
+    {
+        "team_name": "Динамо Лефортово",
+        "sport_type": "Баскетбол",
+        "captain_name": "Александр Смирнов",
+        "invitation_id": 48213,
+    },
+    {
+        "championship_name": "Кубок района по волейболу",
+        "opponent_name": "Спартак-2",
+        "new_date": "2024-06-02",
+        "new_time": "11:00",
+        "new_venue": "Школа №1520",
+        "new_address": "г. Москва, Ленинский проспект, д. 33",
+        "old_date": "2024-05-26",
+        "old_time": "12:00",
+    },
+]
+
+
+def build_match_list(count: int = 150):
+    """
+    Список предстоящих матчей в формате ответа matches/upcoming
+    """
+    return [
+        {
+            "id": 10000 + i,
+            "team1_id": 2 * i + 1,
+            "team2_id": 2 * i + 2,
+            "tournament_name": f"Любительская лига по мини-футболу, дивизион {i % 7 + 1}",
+            "date_time": f"2024-05-{18 + i % 2:02d}T{10 + i % 12:02d}:30:00",
+            "date": f"2024-05-{18 + i % 2:02d}",
+            "time": f"{10 + i % 12:02d}:30",
+            "location_name": f"Спорткомплекс «Олимп», поле {i % 4 + 1}",
+            "location_address": "г. Москва, ул. Академика Королева, д. 12, стр. 3",
+            "status": "scheduled",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(func, repeat: int, number: int) -> float:
+    """
+    Лучшее время одного вызова в микросекундах
+    """
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение библиотек JSON")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    matches = build_match_list()
+
+    results = {}
+    for name, backend in backends.items():
+        encoded_metadata = [backend.dumps(sample) for sample in METADATA_SAMPLES]
+        encoded_matches = backend.dumps_bytes(matches)
+
+        metadata_loads = measure(
+            lambda: [backend.loads(item) for item in encoded_metadata], args.repeat, args.number
+        ) / len(encoded_metadata)
+        metadata_dumps = measure(
+            lambda: [backend.dumps(item) for item in METADATA_SAMPLES], args.repeat, args.number
+        ) / len(METADATA_SAMPLES)
+        matches_loads = measure(
+            lambda: backend.loads(encoded_matches), args.repeat, max(args.number // 20, 1)
+        )
+
+        results[name] = (metadata_loads, metadata_dumps, matches_loads)
+
+    print(f"{'backend':<10}{'metadata loads, us':>22}{'metadata dumps, us':>22}{'150 matches loads, us':>25}")
+    for name, (m_loads, m_dumps, l_loads) in results.items():
+        print(f"{name:<10}{m_loads:>22.2f}{m_dumps:>22.2f}{l_loads:>25.1f}")
+
+    baseline = results.get("json")
+    if baseline is None:
+        return
+
+    print()
+    print(f"Экономия CPU на {DISPATCHES} отправок (создание + разбор метаданных) относительно json:")
+    for name, (m_loads, m_dumps, _) in results.items():
+        if name == "json":
+            continue
+        saved_us = (baseline[0] + baseline[1]) - (m_loads + m_dumps)
+        print(f"  {name}: {saved_us * DISPATCHES / 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
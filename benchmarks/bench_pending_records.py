@@ -0,0 +1,172 @@
+"""
+Память и скорость выборки очереди уведомлений: ORM-объекты со словарями
+против компактных записей PendingNotification.
+
+Запуск:
+    python -m benchmarks.bench_pending_records [--rows 10000] [--repeat 3]
+
+Бенчмарк создает временную базу SQLite, заполняет ее уведомлениями и
+сравнивает путь от запроса к базе до объектов, которые получает диспетчер:
+- legacy: query(Notification, User), два вложенных словаря на строку и
+  классы-обертки, объявляемые заново для каждой строки (прежняя реализация);
+- records: выборка только нужных столбцов сразу в PendingNotification.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, and_
+from sqlalchemy.orm import sessionmaker
+
+from database.connection import Base
+from database.models import Notification, NotificationType, User
+from database.records import PendingNotification, PENDING_NOTIFICATION_COLUMNS
+
+
+def seed(session_factory, rows: int):
+    """
+    Заполнение базы пользователями и неотправленными уведомлениями
+    """
+    session = session_factory()
+    users = [
+        User(
+            id=i + 1,
+            phone_number=f"7900{i:07d}",
+            telegram_id=str(100000 + i),
+            first_name="Иван",
+            last_name="Петров",
+            is_active=True
+        )
+        for i in range(max(rows // 10, 1))
+    ]
+    session.add_all(users)
+    types = list(NotificationType)
+    session.add_all(
+        Notification(
+            user_id=users[i % len(users)].id,
+            type=types[i % len(types)],
+            title="Напоминание о матче",
+            content="Завтра у вашей команды матч в 19:30",
+            metadata_json='{"championship_name":"Любительская лига","opponent_name":"Спартак-2"}',
+            rendered_text="⏰ Напоминание о матче!\n\nЗавтра у вашей команды матч",
+            parse_mode="HTML",
+            template_version=1
+        )
+        for i in range(rows)
+    )
+    session.commit()
+    session.close()
+
+
+def _pending_filter():
+    return and_(
+        Notification.is_sent == False,
+        User.telegram_id.isnot(None),
+        User.is_active == True,
+        Notification.scheduled_for.is_(None)
+    )
+
+
+def fetch_legacy(session_factory, limit: int):
+    session = session_factory()
+    results = session.query(Notification, User).join(
+        User, Notification.user_id == User.id
+    ).filter(_pending_filter()).order_by(Notification.created_at).limit(limit).all()
+
+    items = []
+    for notification, user in results:
+        items.append({
+            'notification': {
+                'id': notification.id,
+                'user_id': notification.user_id,
+                'type': notification.type,
+                'title': notification.title,
+                'content': notification.content,
+                'metadata_json': notification.metadata_json,
+                'rendered_text': notification.rendered_text,
+                'parse_mode': notification.parse_mode,
+                'reply_markup_json': notification.reply_markup_json,
+                'template_version': notification.template_version,
+                'created_at': notification.created_at,
+                'scheduled_for': notification.scheduled_for
+            },
+            'user': {
+                'id': user.id,
+                'telegram_id': user.telegram_id,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'is_active': user.is_active
+            }
+        })
+    session.close()
+
+    dispatched = []
+    for item in items:
+        class MockNotification:
+            def __init__(self, data):
+                self.__dict__.update(data)
+
+        class MockUser:
+            def __init__(self, data):
+                self.__dict__.update(data)
+
+        dispatched.append((MockNotification(item['notification']), MockUser(item['user'])))
+    return dispatched
+
+
+def fetch_records(session_factory, limit: int):
+    session = session_factory()
+    rows = session.query(*PENDING_NOTIFICATION_COLUMNS).join(
+        User, Notification.user_id == User.id
+    ).filter(_pending_filter()).order_by(Notification.created_at).limit(limit).all()
+    records = [PendingNotification(*row) for row in rows]
+    session.close()
+    return records
+
+
+def run(func, session_factory, rows: int, repeat: int):
+    """
+    Лучшее время и пиковая память выборки
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(session_factory, rows)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func(session_factory, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(result) == rows
+    return best, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк выборки очереди уведомлений")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        seed(session_factory, args.rows)
+
+        print(f"{'variant':<10}{'time, ms':>12}{'rows/s':>14}{'peak, MiB':>12}{'retained, MiB':>16}")
+        for name, func in (("legacy", fetch_legacy), ("records", fetch_records)):
+            best, peak, retained = run(func, session_factory, args.rows, args.repeat)
+            print(
+                f"{name:<10}{best * 1000:>12.1f}{args.rows / best:>14.0f}"
+                f"{peak / 2 ** 20:>12.2f}{retained / 2 ** 20:>16.2f}"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Микробенчмарки методов репозиториев с проверкой бюджета SQL-запросов.
+
+Запуск:
+    python -m benchmarks.bench_repositories [--sizes 1000,10000,50000] [--repeat 50]
+        [--database-url postgresql://...] [--output repositories.json]
+
+Для каждого размера таблицы notifications (пользователей в десять раз
+меньше) база очищается и заполняется заново, после чего каждый метод
+UserRepository, NotificationRepository и FsmRepository вызывается --repeat
+раз. Для каждого метода выводится медиана и p95 времени вызова и
+наибольшее число SQL-запросов за вызов.
+
+У каждого метода есть бюджет запросов (второй аргумент Case в build_cases). Если хотя
+бы один вызов превысил бюджет, выводятся выполненные запросы и скрипт
+завершается с кодом 1, поэтому его можно запускать в CI.
+
+По умолчанию используется временная база SQLite; --database-url позволяет
+замерить одноразовую базу PostgreSQL (таблицы users, notifications и
+fsm_states очищаются). create_match_reminder_notifications обращается к
+эмулятору API основного приложения (benchmarks.fake_platform), который
+запускается в отдельном потоке.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.bench_dispatch import HOST, free_port, percentiles, seed
+from benchmarks.query_budget import QueryBudgetExceeded, QueryCounter
+
+STREAM_PAGE_SIZE = 200
+STREAM_PAGES = 5
+
+
+@dataclass(slots=True)
+class Context:
+    """Данные заполненной базы, из которых строятся аргументы вызовов"""
+    users: int
+    first_notification_id: int
+    last_notification_id: int
+    rng: random.Random
+    sequence: Any
+
+    def user_id(self) -> int:
+        return self.rng.randint(1, self.users)
+
+    def notification_id(self) -> int:
+        return self.rng.randint(self.first_notification_id, self.last_notification_id)
+
+
+@dataclass(frozen=True, slots=True)
+class Case:
+    """Проверяемый метод репозитория"""
+    name: str
+    budget: int
+    call: Callable[[Context], Any]
+
+
+def _consume_stream(shard=None) -> int:
+    """
+    Чтение первых STREAM_PAGES страниц потока неотправленных уведомлений
+    """
+    from database.repositories.notification_repository import NotificationRepository
+
+    async def consume():
+        stream = NotificationRepository.stream_pending_notifications(page_size=STREAM_PAGE_SIZE, shard=shard)
+        count = 0
+        try:
+            async for _ in stream:
+                count += 1
+                if count >= STREAM_PAGE_SIZE * STREAM_PAGES:
+                    break
+        finally:
+            await stream.aclose()
+        return count
+
+    return asyncio.run(consume())
+
+
+def build_cases() -> List[Case]:
+    from database.models import NotificationType
+    from database.records import Shard
+    from database.repositories.fsm_repository import FsmRepository
+    from database.repositories.notification_repository import NotificationRepository
+    from database.repositories.receipt_repository import ReceiptRepository
+    from database.repositories.user_repository import UserRepository
+
+    def pending_after(ctx: Context):
+        page = NotificationRepository.get_pending_notifications(limit=STREAM_PAGE_SIZE)
+        if page:
+            last = page[-1]
+            NotificationRepository.get_pending_notifications(
+                limit=STREAM_PAGE_SIZE, after=(last.scheduled_for or last.created_at, last.id)
+            )
+
+    return [
+        Case("UserRepository.get_by_id", 1,
+             lambda ctx: UserRepository.get_by_id(ctx.user_id())),
+        Case("UserRepository.get_by_phone", 1,
+             lambda ctx: UserRepository.get_by_phone(f"7900{ctx.user_id() - 1:07d}")),
+        Case("UserRepository.get_by_telegram_id", 1,
+             lambda ctx: UserRepository.get_by_telegram_id(str(100000 + ctx.user_id() - 1))),
+        Case("UserRepository.update_telegram_id", 4,
+             lambda ctx: UserRepository.update_telegram_id(
+                 f"7900{ctx.user_id() - 1:07d}", str(100000 + ctx.user_id() - 1))),
+        Case("UserRepository.get_all_active_with_telegram", 1,
+             lambda ctx: UserRepository.get_all_active_with_telegram()),
+        Case("UserRepository.mark_unreachable", 1,
+             lambda ctx: UserRepository.mark_unreachable(ctx.user_id(), "blocked")),
+        Case("UserRepository.clear_unreachable", 1,
+             lambda ctx: UserRepository.clear_unreachable(str(100000 + ctx.user_id() - 1))),
+        Case("UserRepository.create", 2,
+             lambda ctx: UserRepository.create(
+                 f"7999{next(ctx.sequence):07d}", "Иван", "Петров", str(900000000 + next(ctx.sequence)))),
+        Case("NotificationRepository.create", 1,
+             lambda ctx: NotificationRepository.create(
+                 ctx.user_id(), NotificationType.NEW_MATCH, "Новый матч", "Матч назначен", {"venue": "Стадион"})),
+        Case("NotificationRepository.get_pending_notifications", 1,
+             lambda ctx: NotificationRepository.get_pending_notifications(limit=STREAM_PAGE_SIZE)),
+        Case("NotificationRepository.get_pending_notifications(after)", 2, pending_after),
+        Case("NotificationRepository.get_pending_notifications(shard)", 1,
+             lambda ctx: NotificationRepository.get_pending_notifications(
+                 limit=STREAM_PAGE_SIZE, shard=Shard(ctx.rng.randrange(4), 4))),
+        Case("NotificationRepository.stream_pending_notifications", STREAM_PAGES,
+             lambda ctx: _consume_stream()),
+        Case("NotificationRepository.get_queue_stats", 1,
+             lambda ctx: NotificationRepository.get_queue_stats()),
+        Case("NotificationRepository.mark_as_sent", 2,
+             lambda ctx: NotificationRepository.mark_as_sent(ctx.notification_id())),
+        Case("NotificationRepository.delete_old_sent_notifications", 1,
+             lambda ctx: NotificationRepository.delete_old_sent_notifications(days=30)),
+        Case("NotificationRepository.create_match_reminder_notifications", 2,
+             lambda ctx: NotificationRepository.create_match_reminder_notifications()),
+        Case("ReceiptRepository.get_batch", 1,
+             lambda ctx: ReceiptRepository.get_batch(100)),
+        Case("ReceiptRepository.get_batch(shard)", 1,
+             lambda ctx: ReceiptRepository.get_batch(100, Shard(ctx.rng.randrange(4), 4))),
+        Case("ReceiptRepository.delete", 1,
+             lambda ctx: ReceiptRepository.delete(list(range(ctx.notification_id(), ctx.notification_id() + 10)))),
+        Case("ReceiptRepository.delete_expired", 1,
+             lambda ctx: ReceiptRepository.delete_expired(7 * 24 * 3600)),
+        Case("FsmRepository.save", 2,
+             lambda ctx: FsmRepository.save(
+                 str(ctx.user_id()), str(ctx.user_id()), {"state": "Form:name", "data": "{}"}, 3600)),
+        Case("FsmRepository.get", 1,
+             lambda ctx: FsmRepository.get(str(ctx.user_id()), str(ctx.user_id()))),
+        Case("FsmRepository.delete_expired", 1,
+             lambda ctx: FsmRepository.delete_expired()),
+    ]
+
+
+def prepare(size: int, rng_seed: int) -> Context:
+    """
+    Заполнение базы для заданного размера таблицы уведомлений
+    """
+    from sqlalchemy import func
+
+    from database.connection import get_db_session
+    from database.models import FsmState, Notification
+
+    users = max(size // 10, 1)
+    with get_db_session() as session:
+        session.query(FsmState).delete()
+    seed(users, size)
+
+    with get_db_session() as session:
+        first, last = session.query(func.min(Notification.id), func.max(Notification.id)).one()
+
+    return Context(
+        users=users,
+        first_notification_id=first or 0,
+        last_notification_id=last or 0,
+        rng=random.Random(rng_seed),
+        sequence=itertools.count(size * 10)
+    )
+
+
+def run_case(
+        case: Case,
+        ctx: Context,
+        repeat: int,
+        counter: QueryCounter
+) -> Tuple[Dict[str, Any], Optional[QueryBudgetExceeded]]:
+    """
+    Многократный вызов метода с замером времени и числа запросов
+
+    Returns:
+        Результаты замера и первое превышение бюджета (если было)
+    """
+    timings = []
+    max_queries = 0
+    violation = None
+    for _ in range(repeat):
+        counter.reset()
+        started_at = time.perf_counter()
+        case.call(ctx)
+        timings.append((time.perf_counter() - started_at) * 1000)
+        max_queries = max(max_queries, counter.count)
+        if counter.count > case.budget and violation is None:
+            violation = QueryBudgetExceeded(case.name, case.budget, counter.statements)
+
+    result = {
+        "method": case.name,
+        "budget": case.budget,
+        "queries": max_queries,
+        "median_ms": round(statistics.median(timings), 3),
+        **{f"{key}_ms": value for key, value in percentiles(timings, (95,)).items()},
+    }
+    return result, violation
+
+
+def start_platform(users: int, port: int):
+    """
+    Запуск эмулятора API основного приложения в отдельном потоке
+    """
+    from benchmarks.fake_platform import FakePlatformServer
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = FakePlatformServer(users=users, matches=10)
+    asyncio.run_coroutine_threadsafe(server.start(HOST, port), loop).result()
+    return server, loop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Микробенчмарки методов репозиториев")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="Размеры таблицы уведомлений через запятую")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--database-url", default=None, help="По умолчанию - временная база SQLite")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Файл для результатов в JSON")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.database_url is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_repositories.db')}"
+    api_port = free_port()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["API_BASE_URL"] = f"http://{HOST}:{api_port}/api"
+    os.environ.setdefault("TELEGRAM_BOT_TOKEN", "123456:bench")
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+    from database.connection import get_engine
+    from database.migrations import upgrade
+    from utils import json_codec
+    from utils.logger import setup_logger
+
+    setup_logger()
+    upgrade()
+    engine = get_engine()
+    counter = QueryCounter(engine, keep_statements=True)
+    platform, platform_loop = start_platform(1, api_port)
+    cases = build_cases()
+
+    results = []
+    violations = []
+    try:
+        for size in (int(value) for value in args.sizes.split(",")):
+            ctx = prepare(size, args.seed)
+            platform.users = ctx.users
+            print(f"\nУведомлений: {size}, пользователей: {ctx.users}")
+            print(f"{'метод':<62} {'медиана, мс':>12} {'p95, мс':>10} {'запросы':>8}")
+            for case in cases:
+                result, violation = run_case(case, ctx, args.repeat, counter)
+                result["size"] = size
+                results.append(result)
+                mark = "  ПРЕВЫШЕН БЮДЖЕТ" if violation else ""
+                print(
+                    f"{case.name:<62} {result['median_ms']:>12.3f} {result['p95_ms']:>10.3f} "
+                    f"{result['queries']:>4}/{case.budget:<3}{mark}"
+                )
+                if violation:
+                    violations.append(violation)
+    finally:
+        asyncio.run_coroutine_threadsafe(platform.stop(), platform_loop).result()
+        platform_loop.call_soon_threadsafe(platform_loop.stop)
+        counter.close()
+        engine.dispose()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(json_codec.dumps({"database": engine.dialect.name, "results": results}) + "\n")
+
+    for violation in violations:
+        print(f"\n{violation}", file=sys.stderr)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
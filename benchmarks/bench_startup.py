@@ -0,0 +1,138 @@
+"""
+Время импорта и запуска бота.
+
+Запуск:
+    python -m benchmarks.bench_startup [--runs 10] [--database-url postgresql://...]
+
+Каждый замер выполняется в отдельном процессе, чтобы учитывать холодный
+старт (загрузку модулей, создание движка и первое соединение с базой):
+- import_ms: импорт bot.main (создание бота, диспетчера и регистрация
+  обработчиков) без времени запуска самого интерпретатора;
+- schema_check_ms: проверка версии схемы при запуске (check_schema);
+- legacy_init_ms: прежняя инициализация базы при каждом запуске
+  (create_all, чтение столбцов всех таблиц и CREATE INDEX IF NOT EXISTS).
+
+Перед замерами схема базы обновляется миграциями. По умолчанию
+используется временная база SQLite. Результат выводится в JSON.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ("interpreter", "import", "schema_check", "legacy_init")
+RESULT_PREFIX = "phase_ms="
+
+
+def legacy_init_db():
+    """
+    Инициализация базы, которую бот выполнял при каждом запуске до перехода на миграции
+    """
+    from sqlalchemy import inspect
+    from sqlalchemy.schema import CreateIndex
+
+    from database.connection import Base, get_engine
+    import database.models  # noqa: F401 - регистрация моделей
+
+    engine = get_engine()
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if inspector.has_table(table.name):
+            inspector.get_columns(table.name)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def run_phase(phase: str) -> float:
+    """
+    Замер одной фазы в текущем (новом) процессе
+
+    Returns:
+        Время фазы в миллисекундах
+    """
+    if phase == "import":
+        started_at = time.perf_counter()
+        import bot.main  # noqa: F401
+        return (time.perf_counter() - started_at) * 1000
+
+    # При запуске бота модели уже загружены импортом bot.main
+    from database.migrations import check_schema
+    import database.models  # noqa: F401
+
+    started_at = time.perf_counter()
+    if phase == "schema_check":
+        check_schema()
+    elif phase == "legacy_init":
+        legacy_init_db()
+    return (time.perf_counter() - started_at) * 1000
+
+
+def measure(phase: str, runs: int, env: dict) -> list:
+    """
+    Многократный замер фазы в отдельных процессах
+    """
+    timings = []
+    for _ in range(runs):
+        if phase == "interpreter":
+            started_at = time.perf_counter()
+            subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+            timings.append((time.perf_counter() - started_at) * 1000)
+            continue
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--phase", phase],
+            env=env, check=True, capture_output=True, text=True
+        ).stdout
+        # Вывод логов бота может идти после результата, поэтому он помечен
+        line = next(line for line in output.splitlines() if line.startswith(RESULT_PREFIX))
+        timings.append(float(line[len(RESULT_PREFIX):]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта и запуска бота")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", default=None, help="По умолчанию - временная база SQLite")
+    parser.add_argument("--phase", choices=PHASES, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        print(f"{RESULT_PREFIX}{run_phase(args.phase):.3f}", flush=True)
+        return
+
+    temp_dir = None
+    if args.database_url is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        args.database_url = f"sqlite:///{os.path.join(temp_dir.name, 'bench_startup.db')}"
+
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url
+    env.setdefault("TELEGRAM_BOT_TOKEN", "123456:bench")
+    env.setdefault("LOG_LEVEL", "WARNING")
+    env.setdefault("FSM_STORAGE", "memory")
+
+    try:
+        subprocess.run([sys.executable, "-m", "database.migrations"], env=env, check=True, capture_output=True)
+        result = {}
+        for phase in PHASES:
+            timings = measure(phase, args.runs, env)
+            result[f"{phase}_ms"] = round(statistics.median(timings), 1)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    result["boot_ms"] = round(result["import_ms"] + result["schema_check_ms"], 1)
+    result["legacy_boot_ms"] = round(result["import_ms"] + result["legacy_init_ms"], 1)
+
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Время выбора обработчика текстового сообщения в зависимости от числа обработчиков.
+
+Запуск:
+    python -m benchmarks.bench_text_router [--handlers 8,32,128,512] [--messages 2000] [--runs 5]
+
+Для каждого числа обработчиков диспетчер Aiogram собирается двумя способами:
+- filters: каждый обработчик зарегистрирован со своим фильтром-лямбдой
+  (message.text == "..." для кнопок и startswith для команд с ID), как
+  обработчики бота до перехода на TextRouter;
+- router: те же маршруты в TextRouter (bot/router.py), зарегистрированном
+  в диспетчере одним обработчиком.
+
+Половина маршрутов - кнопки, половина - префиксы команд с ID. Сообщения
+равномерно выбираются из всех маршрутов, каждое десятое не подходит ни к
+одному. Обработчики ничего не делают, поэтому измеряется только время
+dp.process_update на сообщение (медиана по --runs прогонам, в микросекундах).
+Результат выводится в JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import List
+
+from aiogram import Bot, Dispatcher, types
+
+from bot.router import get_text_router
+
+
+def route_texts(count: int):
+    """
+    Тексты кнопок и префиксы команд для count маршрутов
+    """
+    buttons = [f"Кнопка {i}" for i in range(count - count // 2)]
+    prefixes = [f"/item{i}_" for i in range(count // 2)]
+    return buttons, prefixes
+
+
+def make_updates(count: int, messages: int, seed: int) -> List[types.Update]:
+    """
+    Сообщения, равномерно распределенные по маршрутам, и 10% неподходящих
+    """
+    rng = random.Random(seed)
+    buttons, prefixes = route_texts(count)
+    updates = []
+    for update_id in range(1, messages + 1):
+        if update_id % 10 == 0:
+            text = "Произвольный текст"
+        elif rng.random() < len(buttons) / count:
+            text = rng.choice(buttons)
+        else:
+            text = f"{rng.choice(prefixes)}{rng.randrange(1, 100000)}"
+        updates.append(types.Update(**{
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": 42, "type": "private"},
+                "from": {"id": 42, "is_bot": False, "first_name": "Иван"},
+                "text": text
+            }
+        }))
+    return updates
+
+
+async def handle(message: types.Message):
+    return None
+
+
+def build_filters_dispatcher(bot: Bot, count: int) -> Dispatcher:
+    dp = Dispatcher(bot)
+    buttons, prefixes = route_texts(count)
+    for button in buttons:
+        dp.register_message_handler(handle, lambda message, button=button: message.text == button)
+    for prefix in prefixes:
+        dp.register_message_handler(handle, lambda message, prefix=prefix: message.text.startswith(prefix))
+    return dp
+
+
+def build_router_dispatcher(bot: Bot, count: int) -> Dispatcher:
+    dp = Dispatcher(bot)
+    router = get_text_router(dp)
+    buttons, prefixes = route_texts(count)
+    router.text(*buttons)(handle)
+    router.prefix(*prefixes)(handle)
+    return dp
+
+
+async def measure(dp: Dispatcher, updates: List[types.Update], runs: int) -> float:
+    """
+    Медианное время обработки одного сообщения в микросекундах
+    """
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        for update in updates:
+            await dp.process_update(update)
+        timings.append((time.perf_counter() - started_at) / len(updates) * 1e6)
+    return round(statistics.median(timings), 2)
+
+
+async def run(handler_counts: List[int], messages: int, runs: int, seed: int) -> list:
+    bot = Bot(token="123456:bench")
+    Bot.set_current(bot)
+    results = []
+    try:
+        for count in handler_counts:
+            updates = make_updates(count, messages, seed)
+            filters_us = await measure(build_filters_dispatcher(bot, count), updates, runs)
+            router_us = await measure(build_router_dispatcher(bot, count), updates, runs)
+            results.append({
+                "handlers": count,
+                "filters_us": filters_us,
+                "router_us": router_us,
+                "speedup": round(filters_us / router_us, 1)
+            })
+    finally:
+        await (await bot.get_session()).close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время выбора обработчика текстового сообщения")
+    parser.add_argument("--handlers", default="8,32,128,512", help="Числа обработчиков через запятую")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    handler_counts = [int(value) for value in args.handlers.split(",")]
+    print(json.dumps(asyncio.run(run(handler_counts, args.messages, args.runs, args.seed))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Нагрузочная проверка приема обновлений через webhook.
+
+Запуск:
+    python -m benchmarks.bench_webhook [--updates 2000] [--concurrency 50] [--handler-ms 5]
+    python -m benchmarks.bench_webhook --url http://localhost:8081/webhook
+
+Скрипт отправляет POST-запросами синтетические обновления Telegram (текстовые
+сообщения от разных пользователей) с заголовком секретного токена
+WEBHOOK_SECRET и измеряет время ответа на каждое обновление и пропускную
+способность.
+
+Без --url поднимается локальный сервер с SecureWebhookRequestHandler и
+диспетчером, обработчик которого ждет --handler-ms миллисекунд и отвечает
+через ответ webhook, не обращаясь к Telegram; если --secret и WEBHOOK_SECRET
+не заданы, для него создается случайный секретный токен. С --url запросы отправляются
+запущенному боту (BOT_MODE=webhook).
+"""
+
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.dispatcher.webhook import BOT_DISPATCHER_KEY, SendMessage
+from aiohttp import ClientSession, web
+
+from config.config import WEBHOOK_SECRET
+from bot.webhook import SECRET_TOKEN_HEADER, WEBHOOK_SECRET_KEY, SecureWebhookRequestHandler
+from utils import json_codec
+
+WEBHOOK_PATH = "/webhook"
+
+
+def make_update(update_id: int, text: str) -> bytes:
+    """
+    Синтетическое обновление с текстовым сообщением
+    """
+    user_id = 100000 + update_id % 1000
+    return json_codec.dumps_bytes({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": "Иван"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Иван"},
+            "text": text
+        }
+    })
+
+
+async def start_local_server(port: int, handler_ms: float, secret: str) -> web.AppRunner:
+    """
+    Локальный сервер webhook с синтетическим обработчиком
+    """
+    bot = Bot(token="123456:bench")
+    dp = Dispatcher(bot)
+
+    @dp.message_handler()
+    async def echo(message: types.Message):
+        await asyncio.sleep(handler_ms / 1000)
+        return SendMessage(message.chat.id, message.text)
+
+    app = web.Application()
+    app[BOT_DISPATCHER_KEY] = dp
+    app[WEBHOOK_SECRET_KEY] = secret
+    app.router.add_route("*", WEBHOOK_PATH, SecureWebhookRequestHandler)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+async def run_load(url: str, updates: int, concurrency: int, text: str, secret: str):
+    """
+    Отправка обновлений с заданным числом одновременных запросов
+
+    Returns:
+        Список задержек (в секундах), число ошибок и общее время
+    """
+    headers = {"Content-Type": "application/json"}
+    if secret:
+        headers[SECRET_TOKEN_HEADER] = secret
+
+    latencies = []
+    errors = 0
+    counter = iter(range(1, updates + 1))
+
+    async def worker(session: ClientSession):
+        nonlocal errors
+        for update_id in counter:
+            body = make_update(update_id, text)
+            start = time.perf_counter()
+            async with session.post(url, data=body, headers=headers) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+                    continue
+            latencies.append(time.perf_counter() - start)
+
+    async with ClientSession() as session:
+        # Проверка отказа при неверном секретном токене
+        if secret:
+            async with session.post(
+                    url, data=make_update(0, text), headers={SECRET_TOKEN_HEADER: "wrong"}
+            ) as response:
+                print(f"Запрос с неверным токеном: HTTP {response.status}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, errors, elapsed
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def main_async(args):
+    runner = None
+    url = args.url
+    if url is None:
+        if not args.secret:
+            args.secret = secrets.token_urlsafe(32)
+        runner = await start_local_server(args.port, args.handler_ms, args.secret)
+        url = f"http://127.0.0.1:{args.port}{WEBHOOK_PATH}"
+
+    try:
+        latencies, errors, elapsed = await run_load(
+            url, args.updates, args.concurrency, args.text, args.secret
+        )
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    print(f"Обновлений: {len(latencies)}, ошибок: {errors}, время: {elapsed:.2f} с")
+    if latencies:
+        print(f"Пропускная способность: {len(latencies) / elapsed:.0f} обновлений/с")
+        print(
+            f"Задержка, мс: p50={percentile(latencies, 0.5) * 1000:.1f} "
+            f"p95={percentile(latencies, 0.95) * 1000:.1f} "
+            f"p99={percentile(latencies, 0.99) * 1000:.1f} "
+            f"среднее={statistics.mean(latencies) * 1000:.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочная проверка webhook")
+    parser.add_argument("--url", default=None, help="Адрес webhook запущенного бота")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--handler-ms", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--text", default="Мои матчи")
+    parser.add_argument("--secret", default=WEBHOOK_SECRET)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
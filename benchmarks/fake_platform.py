@@ -0,0 +1,187 @@
+"""
+Локальный эмулятор API основного приложения для нагрузочных тестов.
+
+Запуск:
+    python -m benchmarks.fake_platform [--port 8082] [--latency fixed:5]
+        [--users 1000] [--matches 20] [--team-size 11]
+
+Бот направляется на эмулятор переменной окружения
+API_BASE_URL=http://127.0.0.1:8082/api.
+
+Эмулятор отдает синтетические данные для задач, которые порождают
+уведомления:
+    GET  /api/matches/upcoming              - матчи на завтра
+    GET  /api/teams/{id}                    - команда с участниками
+    POST /api/notifications/confirm-delivery - подтверждение доставки
+    POST /api/notifications/confirm-delivery/batch - пачка подтверждений
+Участники команд - пользователи с ID от 1 до --users, поэтому напоминания
+о матчах создаются для пользователей, заведенных в базе бенчмарком.
+
+Задержка ответа задается так же, как в benchmarks.fake_telegram.
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from aiohttp import web
+
+from utils import json_codec
+from benchmarks.fake_telegram import parse_latency
+
+
+class FakePlatformServer:
+    """
+    Эмулятор API основного приложения
+
+    Args:
+        latency: Строка распределения задержки ответа
+        users: Число пользователей, из которых набираются команды
+        matches: Число матчей на завтра
+        team_size: Число участников в команде
+        seed: Начальное значение генератора случайных чисел
+    """
+
+    def __init__(
+            self,
+            latency: str = "fixed:0",
+            users: int = 1000,
+            matches: int = 20,
+            team_size: int = 11,
+            seed: Optional[int] = None
+    ):
+        self.latency = parse_latency(latency)
+        self.users = max(users, 1)
+        self.matches = matches
+        self.team_size = team_size
+        self.rng = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.confirmed = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    def create_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._latency_middleware])
+        app.router.add_get("/api/matches/upcoming", self.upcoming_matches)
+        app.router.add_get("/api/teams/{team_id}", self.team_details)
+        app.router.add_post("/api/notifications/confirm-delivery", self.confirm_delivery)
+        app.router.add_post("/api/notifications/confirm-delivery/batch", self.confirm_delivery_batch)
+        app.router.add_get("/_stats", self.stats_handler)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8082) -> str:
+        """
+        Запуск эмулятора
+
+        Args:
+            host: Адрес сервера
+            port: Порт сервера (0 - любой свободный)
+
+        Returns:
+            Базовый адрес для API_BASE_URL
+        """
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}/api"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> dict:
+        return {"calls": dict(self.calls), "confirmed": self.confirmed}
+
+    @web.middleware
+    async def _latency_middleware(self, request: web.Request, handler):
+        if request.path.startswith("/api/"):
+            self.calls[request.match_info.route.resource.canonical] += 1
+            delay = self.latency(self.rng)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return await handler(request)
+
+    async def upcoming_matches(self, request: web.Request) -> web.Response:
+        tomorrow = (datetime.now() + timedelta(days=1)).replace(hour=19, minute=30, second=0, microsecond=0)
+        matches = [
+            {
+                "id": index + 1,
+                "tournament_name": "Любительская лига",
+                "opponent_name": f"Команда {2 * index + 2}",
+                "date": tomorrow.date().isoformat(),
+                "time": tomorrow.strftime("%H:%M"),
+                "date_time": tomorrow.isoformat(),
+                "location_name": "Стадион «Труд»",
+                "location_address": "ул. Спортивная, 1",
+                "team1_id": 2 * index + 1,
+                "team2_id": 2 * index + 2,
+            }
+            for index in range(self.matches)
+        ]
+        return web.json_response(matches, dumps=json_codec.dumps)
+
+    async def team_details(self, request: web.Request) -> web.Response:
+        team_id = int(request.match_info["team_id"])
+        first = (team_id - 1) * self.team_size
+        members = [
+            {
+                "user_id": (first + position) % self.users + 1,
+                "first_name": "Иван",
+                "last_name": "Петров",
+                "is_captain": position == 0,
+            }
+            for position in range(self.team_size)
+        ]
+        return web.json_response({
+            "id": team_id,
+            "name": f"Команда {team_id}",
+            "sport": "Футбол",
+            "count_member": self.team_size,
+            "wins": 0,
+            "loss": 0,
+            "is_captain": False,
+            "members": members,
+        }, dumps=json_codec.dumps)
+
+    async def confirm_delivery(self, request: web.Request) -> web.Response:
+        json_codec.loads(await request.read())
+        self.confirmed += 1
+        return web.json_response({"status": "ok"}, dumps=json_codec.dumps)
+
+    async def confirm_delivery_batch(self, request: web.Request) -> web.Response:
+        payload = json_codec.loads(await request.read())
+        self.confirmed += len(payload["receipts"])
+        return web.json_response({"status": "ok"}, dumps=json_codec.dumps)
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats(), dumps=json_codec.dumps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Эмулятор API основного приложения")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--matches", type=int, default=20)
+    parser.add_argument("--team-size", type=int, default=11)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakePlatformServer(
+        latency=args.latency,
+        users=args.users,
+        matches=args.matches,
+        team_size=args.team_size,
+        seed=args.seed
+    )
+    print(f"Эмулятор API: http://{args.host}:{args.port}/api")
+    web.run_app(server.create_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
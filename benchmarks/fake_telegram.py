@@ -0,0 +1,336 @@
+"""
+Локальный эмулятор Telegram Bot API для нагрузочных тестов.
+
+Запуск:
+    python -m benchmarks.fake_telegram [--port 8081] [--latency lognormal:40:0.5]
+        [--retry-after-rate 0.01] [--blocked-rate 0.005] [--chat-not-found-rate 0.001]
+
+Бот направляется на эмулятор переменной окружения
+TELEGRAM_API_URL=http://127.0.0.1:8081.
+
+Поддерживаются методы getMe, sendMessage, editMessageText,
+editMessageReplyMarkup, answerCallbackQuery, getUpdates, а также setWebhook, deleteWebhook и
+getWebhookInfo (как заглушки). Ответы имеют формат настоящего Bot API,
+поэтому aiogram разбирает их и поднимает те же исключения: RetryAfter
+(429), BotBlocked (403) и ChatNotFound (400).
+
+Задержка ответа задается строкой распределения (миллисекунды):
+    fixed:MS                фиксированная
+    uniform:MIN:MAX         равномерная
+    lognormal:MEDIAN:SIGMA  логнормальная с медианой MEDIAN
+    exp:MEAN                экспоненциальная со средним MEAN
+
+Служебные адреса:
+    POST /_updates  - добавить обновления для getUpdates (объект или список)
+    GET  /_stats    - число вызовов методов и внедренных ошибок
+
+Эмулятор можно запускать и внутри процесса через FakeTelegramServer.
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+from aiohttp import web
+
+from utils import json_codec
+
+BOT_ID = 123456
+LONG_POLL_LIMIT = 50
+
+ERROR_RETRY_AFTER = "retry_after"
+ERROR_BLOCKED = "blocked"
+ERROR_CHAT_NOT_FOUND = "chat_not_found"
+
+# Методы, для которых внедряются ошибки
+FAULTY_METHODS = frozenset({"sendmessage", "editmessagetext"})
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Разбор строки распределения задержки
+
+    Args:
+        spec: Строка вида fixed:MS, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA или exp:MEAN
+
+    Returns:
+        Функция, возвращающая задержку в секундах для заданного генератора
+
+    Raises:
+        ValueError: Если строка не соответствует ни одному распределению
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        params = [float(value) for value in args.split(":")] if args else []
+    except ValueError:
+        raise ValueError(f"Некорректные параметры задержки: {spec}")
+
+    if kind == "fixed" and len(params) == 1:
+        return lambda rng: params[0] / 1000
+    if kind == "uniform" and len(params) == 2:
+        return lambda rng: rng.uniform(params[0], params[1]) / 1000
+    if kind == "lognormal" and len(params) == 2 and params[0] > 0:
+        mu = math.log(params[0])
+        return lambda rng: rng.lognormvariate(mu, params[1]) / 1000
+    if kind == "exp" and len(params) == 1 and params[0] > 0:
+        return lambda rng: rng.expovariate(1 / params[0]) / 1000
+    raise ValueError(f"Неизвестное распределение задержки: {spec}")
+
+
+def api_error(status: int, description: str, parameters: Optional[dict] = None) -> web.Response:
+    """
+    Ответ с ошибкой в формате Bot API
+    """
+    payload = {"ok": False, "error_code": status, "description": description}
+    if parameters:
+        payload["parameters"] = parameters
+    return web.json_response(payload, status=status, dumps=json_codec.dumps)
+
+
+def api_result(result) -> web.Response:
+    """
+    Успешный ответ в формате Bot API
+    """
+    return web.json_response({"ok": True, "result": result}, dumps=json_codec.dumps)
+
+
+class FakeTelegramServer:
+    """
+    Эмулятор Telegram Bot API
+
+    Args:
+        latency: Строка распределения задержки ответа
+        retry_after_rate: Доля запросов отправки, отклоняемых с 429
+        retry_after: Значение retry_after в ответах 429 (секунды)
+        blocked_rate: Доля запросов отправки с ошибкой "bot was blocked by the user"
+        chat_not_found_rate: Доля запросов отправки с ошибкой "chat not found"
+        blocked_chats: Чаты, которые всегда заблокировали бота
+        seed: Начальное значение генератора случайных чисел
+    """
+
+    def __init__(
+            self,
+            latency: str = "fixed:0",
+            retry_after_rate: float = 0.0,
+            retry_after: int = 1,
+            blocked_rate: float = 0.0,
+            chat_not_found_rate: float = 0.0,
+            blocked_chats: Optional[List[int]] = None,
+            seed: Optional[int] = None
+    ):
+        self.latency = parse_latency(latency)
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+        self.blocked_rate = blocked_rate
+        self.chat_not_found_rate = chat_not_found_rate
+        self.blocked_chats = set(blocked_chats or [])
+        self.rng = random.Random(seed)
+
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.sent: List[dict] = []
+        self._message_ids = itertools.count(1)
+        self._updates: List[dict] = []
+        self._update_ids = itertools.count(1)
+        self._new_updates = asyncio.Event()
+        self._runner: Optional[web.AppRunner] = None
+
+        self._methods = {
+            "getme": self.get_me,
+            "sendmessage": self.send_message,
+            "editmessagetext": self.edit_message_text,
+            "editmessagereplymarkup": self.edit_message_text,
+            "answercallbackquery": self.answer_callback_query,
+            "getupdates": self.get_updates,
+            "setwebhook": self.stub_true,
+            "deletewebhook": self.stub_true,
+            "getwebhookinfo": self.get_webhook_info,
+        }
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/_updates", self.push_updates_handler)
+        app.router.add_get("/_stats", self.stats_handler)
+        app.router.add_route("*", "/bot{token}/{method}", self.method_handler)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> str:
+        """
+        Запуск эмулятора
+
+        Args:
+            host: Адрес сервера
+            port: Порт сервера (0 - любой свободный)
+
+        Returns:
+            Базовый адрес для TELEGRAM_API_URL
+        """
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def push_update(self, update: dict) -> dict:
+        """
+        Добавление обновления в очередь getUpdates; update_id назначается, если не задан
+        """
+        update = dict(update)
+        update.setdefault("update_id", next(self._update_ids))
+        self._updates.append(update)
+        self._new_updates.set()
+        return update
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {"calls": dict(self.calls), "errors": dict(self.errors)}
+
+    async def method_handler(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        self.calls[method] += 1
+
+        handler = self._methods.get(method)
+        if handler is None:
+            return api_error(404, "Not Found: method not found")
+
+        params = dict(await request.post())
+        if not params and request.can_read_body:
+            params = json_codec.loads(await request.read())
+
+        delay = self.latency(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if method in FAULTY_METHODS:
+            error = self._inject_error(params)
+            if error is not None:
+                return error
+        return await handler(params)
+
+    def _inject_error(self, params: dict) -> Optional[web.Response]:
+        """
+        Внедрение ошибки отправки с настроенными вероятностями
+        """
+        chat_id = int(params.get("chat_id", 0))
+        roll = self.rng.random()
+
+        if roll < self.retry_after_rate:
+            self.errors[ERROR_RETRY_AFTER] += 1
+            return api_error(
+                429,
+                f"Too Many Requests: retry after {self.retry_after}",
+                {"retry_after": self.retry_after}
+            )
+        roll -= self.retry_after_rate
+
+        if chat_id in self.blocked_chats or roll < self.blocked_rate:
+            self.errors[ERROR_BLOCKED] += 1
+            return api_error(403, "Forbidden: bot was blocked by the user")
+        roll -= self.blocked_rate
+
+        if roll < self.chat_not_found_rate:
+            self.errors[ERROR_CHAT_NOT_FOUND] += 1
+            return api_error(400, "Bad Request: chat not found")
+        return None
+
+    def _message(self, params: dict, message_id: Optional[int] = None) -> dict:
+        message = {
+            "message_id": message_id or next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": int(params["chat_id"]), "type": "private"},
+            "from": {"id": BOT_ID, "is_bot": True, "first_name": "Fake", "username": "fake_bot"},
+            "text": params.get("text", ""),
+        }
+        if params.get("reply_markup"):
+            markup = params["reply_markup"]
+            message["reply_markup"] = json_codec.loads(markup) if isinstance(markup, str) else markup
+        return message
+
+    async def get_me(self, params: dict) -> web.Response:
+        return api_result({"id": BOT_ID, "is_bot": True, "first_name": "Fake", "username": "fake_bot"})
+
+    async def send_message(self, params: dict) -> web.Response:
+        if "chat_id" not in params or "text" not in params:
+            return api_error(400, "Bad Request: message text is empty")
+        message = self._message(params)
+        self.sent.append(message)
+        return api_result(message)
+
+    async def edit_message_text(self, params: dict) -> web.Response:
+        if "inline_message_id" in params:
+            return api_result(True)
+        if "chat_id" not in params or "message_id" not in params:
+            return api_error(400, "Bad Request: message to edit not found")
+        return api_result(self._message(params, int(params["message_id"])))
+
+    async def answer_callback_query(self, params: dict) -> web.Response:
+        if "callback_query_id" not in params:
+            return api_error(400, "Bad Request: query is too old and response timeout expired or query ID is invalid")
+        return api_result(True)
+
+    async def get_updates(self, params: dict) -> web.Response:
+        offset = int(params.get("offset", 0))
+        limit = min(int(params.get("limit", 100)), 100)
+        timeout = min(float(params.get("timeout", 0)), LONG_POLL_LIMIT)
+
+        # Подтвержденные обновления (update_id < offset) удаляются, как в Bot API
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates and timeout > 0:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return api_result(self._updates[:limit])
+
+    async def stub_true(self, params: dict) -> web.Response:
+        return api_result(True)
+
+    async def get_webhook_info(self, params: dict) -> web.Response:
+        return api_result({"url": "", "has_custom_certificate": False, "pending_update_count": len(self._updates)})
+
+    async def push_updates_handler(self, request: web.Request) -> web.Response:
+        payload = json_codec.loads(await request.read())
+        updates = payload if isinstance(payload, list) else [payload]
+        pushed = [self.push_update(update) for update in updates]
+        return api_result([update["update_id"] for update in pushed])
+
+    async def stats_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats(), dumps=json_codec.dumps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Эмулятор Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", default="fixed:0", help="Распределение задержки, например lognormal:40:0.5")
+    parser.add_argument("--retry-after-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--blocked-rate", type=float, default=0.0)
+    parser.add_argument("--chat-not-found-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(
+        latency=args.latency,
+        retry_after_rate=args.retry_after_rate,
+        retry_after=args.retry_after,
+        blocked_rate=args.blocked_rate,
+        chat_not_found_rate=args.chat_not_found_rate,
+        seed=args.seed
+    )
+    print(f"Эмулятор Telegram Bot API: http://{args.host}:{args.port}")
+    web.run_app(server.create_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
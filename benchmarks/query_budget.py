@@ -0,0 +1,110 @@
+"""
+Подсчет SQL-запросов и проверка бюджета запросов.
+
+Счетчик подписывается на событие before_cursor_execute движка SQLAlchemy и
+учитывает каждый запрос, отправленный в базу (executemany - один запрос).
+Бюджет - максимальное число запросов на один вызов метода; превышение
+означает, например, запрос в цикле (N+1).
+
+Пример:
+    with query_budget(1, "UserRepository.get_by_id"):
+        UserRepository.get_by_id(1)
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Метод выполнил больше SQL-запросов, чем ему разрешено
+    """
+
+    def __init__(self, label: str, budget: int, statements: List[str]):
+        self.label = label
+        self.budget = budget
+        self.statements = statements
+        listing = "\n".join(f"  {index + 1}. {statement}" for index, statement in enumerate(statements))
+        super().__init__(
+            f"{label}: {len(statements)} SQL-запросов при бюджете {budget}:\n{listing}"
+        )
+
+
+class QueryCounter:
+    """
+    Счетчик SQL-запросов, выполненных через движок
+
+    Args:
+        engine: Движок SQLAlchemy
+        keep_statements: Сохранять текст запросов для отчета о превышении бюджета
+    """
+
+    def __init__(self, engine: Engine, keep_statements: bool = False):
+        self.engine = engine
+        self.keep_statements = keep_statements
+        self.count = 0
+        self.statements: List[str] = []
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        if self.keep_statements:
+            self.statements.append(" ".join(statement.split()))
+
+    def reset(self) -> int:
+        """
+        Сброс счетчика
+
+        Returns:
+            Число запросов с прошлого сброса
+        """
+        count, self.count = self.count, 0
+        self.statements = []
+        return count
+
+    def close(self):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def count_queries(engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """
+    Подсчет SQL-запросов внутри блока
+
+    Args:
+        engine: Движок SQLAlchemy (по умолчанию - движок бота)
+
+    Yields:
+        Счетчик; после выхода из блока count содержит число запросов
+    """
+    if engine is None:
+        from database.connection import get_engine
+        engine = get_engine()
+
+    counter = QueryCounter(engine, keep_statements=True)
+    try:
+        yield counter
+    finally:
+        counter.close()
+
+
+@contextmanager
+def query_budget(budget: int, label: str, engine: Optional[Engine] = None) -> Iterator[QueryCounter]:
+    """
+    Проверка, что блок выполняет не больше budget SQL-запросов
+
+    Args:
+        budget: Допустимое число запросов
+        label: Название проверяемого метода для сообщения об ошибке
+        engine: Движок SQLAlchemy (по умолчанию - движок бота)
+
+    Raises:
+        QueryBudgetExceeded: Если запросов больше, чем budget
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > budget:
+        raise QueryBudgetExceeded(label, budget, counter.statements)
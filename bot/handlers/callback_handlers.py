@@ -1,13 +1,36 @@
 import logging
+from html import escape
+
 from aiogram import Dispatcher, types
+from aiogram.dispatcher.storage import BaseStorage
 
 from utils.logger import get_logger
-from api.client import ApiClient
+from api.client import get_api_client
+from bot.pagination import update_item
 
 logger = get_logger("callback_handlers")
 api_client = None
 
 
+async def _show_invitation_result(callback_query: types.CallbackQuery, storage: BaseStorage, status: str):
+    """
+    Вывод результата ответа на приглашение вместо кнопок приглашения
+
+    В списке приглашений меняется только приглашение, на которое ответил
+    пользователь; в отдельном сообщении (уведомлении) к тексту добавляется
+    результат, а кнопки удаляются.
+
+    Args:
+        callback_query: Запрос от кнопки приглашения
+        storage: Хранилище состояний диалогов
+        status: Результат ответа (обычный текст)
+    """
+    if await update_item(callback_query, storage, status):
+        return
+    message = callback_query.message
+    await message.edit_text(f"{message.html_text}\n\n{escape(status)}", parse_mode="HTML", reply_markup=None)
+
+
 def register_callback_handlers(dp: Dispatcher):
     """
     Регистрация обработчиков для колбэков инлайн-кнопок
@@ -16,7 +39,7 @@ def register_callback_handlers(dp: Dispatcher):
         dp: Диспетчер Aiogram
     """
     global api_client
-    api_client = ApiClient()
+    api_client = get_api_client()
 
     @dp.callback_query_handler(lambda c: c.data == 'about')
     async def help_about_callback(callback_query: types.CallbackQuery):
@@ -80,21 +103,21 @@ def register_callback_handlers(dp: Dispatcher):
             result = await api_client.accept_team_invitation(invitation_id)
 
             if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n✅ Вы приняли приглашение! Вы теперь участник команды {result.get('team_name', '')}.",
-                    reply_markup=None
+                await _show_invitation_result(
+                    callback_query, dp.storage,
+                    f"✅ Вы приняли приглашение! Вы теперь участник команды {result.get('team_name', '')}."
                 )
             else:
                 error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось принять приглашение: {error_msg}",
-                    reply_markup=None
+                await _show_invitation_result(
+                    callback_query, dp.storage,
+                    f"❌ Не удалось принять приглашение: {error_msg}"
                 )
         except Exception as e:
             logger.error(f"Ошибка при обработке принятия приглашения в команду: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
+            await _show_invitation_result(
+                callback_query, dp.storage,
+                "❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже."
             )
 
     @dp.callback_query_handler(lambda c: c.data and c.data.startswith('decline_team_'))
@@ -107,21 +130,18 @@ def register_callback_handlers(dp: Dispatcher):
             result = await api_client.decline_team_invitation(invitation_id)
 
             if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Вы отклонили приглашение.",
-                    reply_markup=None
-                )
+                await _show_invitation_result(callback_query, dp.storage, "❌ Вы отклонили приглашение.")
             else:
                 error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось отклонить приглашение: {error_msg}",
-                    reply_markup=None
+                await _show_invitation_result(
+                    callback_query, dp.storage,
+                    f"❌ Не удалось отклонить приглашение: {error_msg}"
                 )
         except Exception as e:
             logger.error(f"Ошибка при обработке отклонения приглашения в команду: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
+            await _show_invitation_result(
+                callback_query, dp.storage,
+                "❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже."
             )
 
     @dp.callback_query_handler(lambda c: c.data and c.data.startswith('accept_committee_'))
@@ -134,21 +154,21 @@ def register_callback_handlers(dp: Dispatcher):
             result = await api_client.accept_committee_invitation(invitation_id)
 
             if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n✅ Вы приняли приглашение! Вы теперь член оргкомитета {result.get('committee_name', '')}.",
-                    reply_markup=None
+                await _show_invitation_result(
+                    callback_query, dp.storage,
+                    f"✅ Вы приняли приглашение! Вы теперь член оргкомитета {result.get('committee_name', '')}."
                 )
             else:
                 error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось принять приглашение: {error_msg}",
-                    reply_markup=None
+                await _show_invitation_result(
+                    callback_query, dp.storage,
+                    f"❌ Не удалось принять приглашение: {error_msg}"
                 )
         except Exception as e:
             logger.error(f"Ошибка при обработке принятия приглашения в оргкомитет: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
+            await _show_invitation_result(
+                callback_query, dp.storage,
+                "❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже."
             )
 
     @dp.callback_query_handler(lambda c: c.data and c.data.startswith('decline_committee_'))
@@ -161,19 +181,16 @@ def register_callback_handlers(dp: Dispatcher):
             result = await api_client.decline_committee_invitation(invitation_id)
 
             if result and result.get('success'):
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Вы отклонили приглашение.",
-                    reply_markup=None
-                )
+                await _show_invitation_result(callback_query, dp.storage, "❌ Вы отклонили приглашение.")
             else:
                 error_msg = result.get('error', 'неизвестная ошибка') if result else 'нет ответа от API'
-                await callback_query.message.edit_text(
-                    f"{callback_query.message.text}\n\n❌ Не удалось отклонить приглашение: {error_msg}",
-                    reply_markup=None
+                await _show_invitation_result(
+                    callback_query, dp.storage,
+                    f"❌ Не удалось отклонить приглашение: {error_msg}"
                 )
         except Exception as e:
             logger.error(f"Ошибка при обработке отклонения приглашения в оргкомитет: {e}")
-            await callback_query.message.edit_text(
-                f"{callback_query.message.text}\n\n❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже.",
-                reply_markup=None
+            await _show_invitation_result(
+                callback_query, dp.storage,
+                "❌ Произошла ошибка при обработке приглашения. Пожалуйста, попробуйте позже."
             )
\ No newline at end of file
@@ -1,16 +1,40 @@
+from html import escape
+
 from aiogram import Dispatcher, types
 from aiogram.dispatcher import FSMContext
 
 from utils.logger import get_logger
 from database.repositories.user_repository import UserRepository
-from api.client import ApiClient
+from api.client import get_api_client
+from api.errors import ApiError
+from api.models import Championship
 from bot.keyboards.keyboards import get_championship_menu_keyboard, get_start_keyboard
+from bot.pagination import PageItem, send_paginated
+from bot.router import get_text_router
 
 logger = get_logger("championship_handler")
 
 api_client = None
 
 
+def _recommendation_item(championship: Championship) -> PageItem:
+    team_size = championship.team_members_count if championship.team_members_count is not None else '-'
+    description = championship.description
+    if len(description) > 200:
+        description = description[:197] + "..."
+
+    text = f"🏆 <b>{escape(championship.name)}</b>\n"
+    text += f"⚽ Вид спорта: {escape(championship.sport or 'Не указан')}\n"
+    text += f"🌆 Город: {escape(championship.city or 'Не указан')}\n"
+    text += f"👥 Размер команды: {team_size} участников\n"
+    text += f"📅 Дедлайн подачи заявок: {escape(championship.application_deadline or 'Не указан')}\n"
+    if description:
+        text += f"📝 {escape(description)}\n"
+    if championship.id:
+        text += f"Подробнее: /championship_{championship.id}\n"
+    return PageItem(text + "\n")
+
+
 def register_championship_handlers(dp: Dispatcher):
     """
     Регистрация обработчиков для чемпионатов
@@ -19,9 +43,10 @@ def register_championship_handlers(dp: Dispatcher):
         dp: Диспетчер Aiogram
     """
     global api_client
-    api_client = ApiClient()
+    api_client = get_api_client()
+    router = get_text_router(dp)
 
-    @dp.message_handler(lambda message: message.text == "Рекомендуемые чемпионаты")
+    @router.text("Рекомендуемые чемпионаты")
     async def recommended_championships(message: types.Message):
         """
         Обработчик запроса информации о рекомендуемых чемпионатах
@@ -47,14 +72,7 @@ def register_championship_handlers(dp: Dispatcher):
 
             championships = await api_client.get_recommended_championships(user_id)
 
-            if championships is None or not isinstance(championships, list) or len(championships) == 0:
-                await message.answer(
-                    "На данный момент у нас нет рекомендаций для вас. Пожалуйста, проверьте позже.",
-                    reply_markup=get_start_keyboard()
-                )
-                return
-
-            valid_championships = [c for c in championships if isinstance(c, dict) and c.get('name')]
+            valid_championships = [c for c in championships if c.name]
             if not valid_championships:
                 await message.answer(
                     "На данный момент у нас нет рекомендаций для вас. Пожалуйста, проверьте позже.",
@@ -62,80 +80,11 @@ def register_championship_handlers(dp: Dispatcher):
                 )
                 return
 
-            await message.answer(
-                "🏆 Вот чемпионаты, которые могут вас заинтересовать:",
-                reply_markup=get_start_keyboard()
+            await send_paginated(
+                message, dp.storage, [_recommendation_item(championship) for championship in valid_championships],
+                header="🏆 Вот чемпионаты, которые могут вас заинтересовать:\n\n"
             )
 
-            def escape_markdown(text):
-                if not text:
-                    return ""
-                special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.',
-                                 '!']
-                for char in special_chars:
-                    text = text.replace(char, '\\' + char)
-                return text
-
-            count_sent = 0
-            for championship in valid_championships:
-                try:
-                    name = escape_markdown(championship.get('name', 'Без названия'))
-                    sport = escape_markdown(championship.get('sport', 'Не указан'))
-                    city = escape_markdown(championship.get('city', 'Не указан'))
-                    team_size = championship.get('team_members_count', '-')
-                    deadline = escape_markdown(championship.get('application_deadline', 'Не указан'))
-
-                    description = championship.get('description', '')
-                    if len(description) > 200:
-                        description = description[:197] + "..."
-                    description = escape_markdown(description)
-
-                    response = f"🏆 <b>{name}</b>\n\n"
-                    response += f"⚽ Вид спорта: {sport}\n"
-                    response += f"🌆 Город: {city}\n"
-                    response += f"👥 Размер команды: {team_size} участников\n"
-                    response += f"📅 Дедлайн подачи заявок: {deadline}\n\n"
-
-                    if description:
-                        response += f"📝 <b>Описание:</b>\n{description}\n\n"
-
-                    tournament_id = championship.get('tournament_id', championship.get('id'))
-                    if tournament_id:
-                        response += f"Для получения подробной информации отправьте /championship_{tournament_id}"
-
-                    await message.answer(response, parse_mode="HTML")
-                    count_sent += 1
-                except Exception as e:
-                    logger.error(f"Ошибка при обработке информации о чемпионате: {e}")
-
-                    try:
-                        name = championship.get('name', 'Без названия')
-                        sport = championship.get('sport', 'Не указан')
-                        city = championship.get('city', 'Не указан')
-                        team_size = championship.get('team_members_count', '-')
-                        deadline = championship.get('application_deadline', 'Не указан')
-
-                        plain_response = f"🏆 {name}\n\n"
-                        plain_response += f"⚽ Вид спорта: {sport}\n"
-                        plain_response += f"🌆 Город: {city}\n"
-                        plain_response += f"👥 Размер команды: {team_size} участников\n"
-                        plain_response += f"📅 Дедлайн подачи заявок: {deadline}\n"
-
-                        tournament_id = championship.get('tournament_id', championship.get('id'))
-                        if tournament_id:
-                            plain_response += f"\nДля получения подробной информации отправьте /championship_{tournament_id}"
-
-                        await message.answer(plain_response)
-                        count_sent += 1
-                    except Exception as e2:
-                        logger.error(f"Не удалось отправить даже простое сообщение: {e2}")
-
-            if count_sent == 0:
-                await message.answer(
-                    "К сожалению, не удалось загрузить информацию о рекомендуемых чемпионатах. Пожалуйста, попробуйте позже.",
-                    reply_markup=get_start_keyboard()
-                )
-
         except Exception as e:
             user_id_for_log = "неизвестно"
             try:
@@ -152,7 +101,7 @@ def register_championship_handlers(dp: Dispatcher):
                 reply_markup=get_start_keyboard()
             )
 
-    @dp.message_handler(lambda message: message.text.startswith('/championship_'))
+    @router.prefix('/championship_')
     async def championship_details(message: types.Message):
         """
         Обработчик запроса информации о конкретном чемпионате
@@ -183,51 +132,39 @@ def register_championship_handlers(dp: Dispatcher):
             if user_id is None:
                 raise ValueError("Не удалось определить ID пользователя")
 
-            championship = await api_client.get_championship_details(championship_id)
-
-            if isinstance(championship, dict) and "error" in championship:
-                error_msg = championship["error"]
-
-                if "404" in error_msg or "not found" in error_msg.lower():
+            try:
+                championship = await api_client.get_championship_details(championship_id)
+            except ApiError as e:
+                if e.status == 404:
                     await message.answer(
                         f"❌ Чемпионат с ID {championship_id} не найден.\n\n"
                         f"Пожалуйста, проверьте правильность ID. Возможно, вы хотели посмотреть информацию о другом чемпионате?\n\n"
                         f"Попробуйте команду «Рекомендуемые чемпионаты» для получения актуального списка.",
                         reply_markup=get_start_keyboard()
                     )
-                elif "403" in error_msg or "access" in error_msg.lower():
+                elif e.status == 403:
                     await message.answer(
                         f"❌ У вас нет доступа к информации о чемпионате с ID {championship_id}.\n\n"
                         f"Возможно, этот чемпионат закрыт или предназначен для других участников.",
                         reply_markup=get_start_keyboard()
                     )
-                elif "401" in error_msg:
+                elif e.status == 401:
                     await message.answer("Требуется повторная авторизация. Отправьте команду /start.")
                 else:
                     await message.answer(
-                        f"❌ Ошибка при получении информации о чемпионате: {error_msg}\n\n"
+                        f"❌ Ошибка при получении информации о чемпионате: {e.message}\n\n"
                         f"Пожалуйста, попробуйте позже.",
                         reply_markup=get_start_keyboard()
                     )
                 return
 
-            if not championship or not isinstance(championship, dict):
-                await message.answer(
-                    f"❌ Чемпионат с ID {championship_id} не найден или у вас нет доступа к нему.\n\n"
-                    f"Проверьте правильность ID и попробуйте снова.",
-                    reply_markup=get_start_keyboard()
-                )
-                return
-
-            name = championship.get('name', f'Чемпионат #{championship_id}')
-            sport = championship.get('sport', 'Не указан')
-            city = championship.get('city', 'Не указан')
-            team_members_count = championship.get('team_members_count', '-')
-            application_deadline = championship.get('application_deadline', 'Не указан')
-            description = championship.get('description', '')
-            org_name = championship.get('org_name', 'Не указан')
-            is_stopped = championship.get('is_stopped', False)
-
+            name = championship.name or f'Чемпионат #{championship_id}'
+            sport = championship.sport or 'Не указан'
+            city = championship.city or 'Не указан'
+            team_members_count = championship.team_members_count if championship.team_members_count is not None else '-'
+            application_deadline = championship.application_deadline or 'Не указан'
+            description = championship.description
+            org_name = championship.org_name or 'Не указан'
 
             response = f"🏆 <b>{name}</b>\n\n"
             response += f"⚽ Вид спорта: {sport}\n"
@@ -235,11 +172,11 @@ def register_championship_handlers(dp: Dispatcher):
             response += f"👥 Размер команды: {team_members_count} участников\n"
             response += f"📅 Дедлайн подачи заявок: {application_deadline}\n\n"
 
-            if 'stages' in championship and championship['stages']:
+            if championship.stages:
                 response += f"📊 <b>Этапы чемпионата:</b>\n"
-                for stage in championship['stages']:
-                    status = "✅ Опубликован" if stage.get('is_published') else "⏳ Не опубликован"
-                    response += f"- {stage.get('name', 'Этап')}: {status}\n"
+                for stage in championship.stages:
+                    status = "✅ Опубликован" if stage.is_published else "⏳ Не опубликован"
+                    response += f"- {stage.name or 'Этап'}: {status}\n"
                 response += "\n"
 
             if description:
@@ -249,7 +186,7 @@ def register_championship_handlers(dp: Dispatcher):
 
             response += f"👔 Организатор: {org_name}\n"
 
-            if is_stopped:
+            if championship.is_stopped:
                 response += "⚠️ Чемпионат остановлен\n"
 
             await message.answer(response, parse_mode="HTML")
@@ -4,7 +4,7 @@ from aiogram.dispatcher.filters.state import State, StatesGroup
 
 from utils.logger import get_logger
 from database.repositories.user_repository import UserRepository
-from api.client import ApiClient
+from api.client import get_api_client
 from bot.keyboards.keyboards import get_start_keyboard
 
 logger = get_logger("match_handler")
@@ -27,7 +27,7 @@ def register_match_handlers(dp: Dispatcher):
         dp: Диспетчер Aiogram
     """
     global api_client
-    api_client = ApiClient()
+    api_client = get_api_client()
 
     @dp.callback_query_handler(lambda c: c.data and c.data.startswith('decline_match_'))
     async def decline_match_start(callback_query: types.CallbackQuery, state: FSMContext):
@@ -1,249 +1,204 @@
+import asyncio
 import logging
-import json
 import re
-from aiogram import Dispatcher, types
+import time
+from typing import Callable, Optional, Set
+from aiogram import Dispatcher
 from aiogram.utils.exceptions import BotBlocked, ChatNotFound, UserDeactivated, TelegramAPIError
 
-from config.config import MAX_RPS
+from config.config import MAX_RPS, NOTIFICATION_PAGE_SIZE
 from utils.logger import get_logger
-from database.models import NotificationType
+from utils import json_codec
+from utils.metrics import NOTIFICATION_SEND_SECONDS
+from database.records import PendingNotification, Shard
 from database.repositories.notification_repository import NotificationRepository
-from api.client import ApiClient
-from bot.messages.templates import (
-    TEAM_APPLICATION_MESSAGE,
-    APPLICATION_CANCEL_MESSAGE,
-    CHAMPIONSHIP_CANCEL_MESSAGE,
-    NEW_MATCH_MESSAGE,
-    MATCH_RESCHEDULE_MESSAGE,
-    PLAYOFF_RESULT_MESSAGE,
-    MATCH_REMINDER_MESSAGE,
-    NEW_CHAMPIONSHIP_MESSAGE,
-    COMMITTEE_MESSAGE,
-    TEAM_INVITATION_MESSAGE,
-    COMMITTEE_INVITATION_MESSAGE
-)
-from bot.keyboards.keyboards import get_invitation_keyboard
+from database.repositories.user_repository import UserRepository
+from api.client import get_api_client
+from bot.messages.templates import TEMPLATES_VERSION
+from bot.messages.renderer import render_notification
+from bot.receipts import ReceiptOutbox
 
 logger = get_logger("notification_handler")
 api_client = None
 
 
-async def send_notification(bot, notification, user):
+def _parse_metadata(notification):
     """
-    Отправка уведомления пользователю
+    Разбор metadata_json уведомления
 
     Args:
-        bot: Объект бота Telegram
         notification: Объект уведомления
-        user: Объект пользователя
 
     Returns:
-        bool: True, если уведомление успешно отправлено, иначе False
+        Словарь метаданных (пустой, если метаданных нет или они некорректны)
     """
-    if not user.telegram_id:
-        logger.warning(f"Пользователь {user.id} не имеет привязанного Telegram ID")
-        return False
-
+    if not notification.metadata_json:
+        return {}
     try:
-        metadata = {}
-        if notification.metadata_json:
-            try:
-                metadata = json.loads(notification.metadata_json)
-            except json.JSONDecodeError as e:
-                logger.error(f"Ошибка парсинга JSON метаданных для уведомления {notification.id}: {e}")
-                logger.error(f"Содержимое metadata_json: {notification.metadata_json}")
-                metadata = {}
-
-        message_text = ""
-        markup = None
-
-        if notification.type == NotificationType.TEAM_APPLICATION:
-            message_text = TEAM_APPLICATION_MESSAGE.format(
-                team_name=metadata.get("team_name", "Команда"),
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                application_deadline=metadata.get("application_deadline", "Не указан")
-            )
+        return json_codec.loads(notification.metadata_json)
+    except json_codec.DECODE_ERRORS as e:
+        logger.error(f"Ошибка парсинга JSON метаданных для уведомления {notification.id}: {e}")
+        logger.error(f"Содержимое metadata_json: {notification.metadata_json}")
+        return {}
 
-        elif notification.type == NotificationType.APPLICATION_CANCEL:
-            message_text = APPLICATION_CANCEL_MESSAGE.format(
-                status=metadata.get("status", "отклонена"),
-                team_name=metadata.get("team_name", "Команда"),
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                reason=metadata.get("reason", "Причина не указана")
-            )
-
-        elif notification.type == NotificationType.CHAMPIONSHIP_CANCEL:
-            message_text = CHAMPIONSHIP_CANCEL_MESSAGE.format(
-                status=metadata.get("status", "отменен"),
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                additional_info=metadata.get("additional_info", "")
-            )
-
-        elif notification.type == NotificationType.NEW_MATCH:
-            message_text = NEW_MATCH_MESSAGE.format(
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                opponent_name=metadata.get("opponent_name", "Соперник"),
-                match_date=metadata.get("match_date", "Дата не указана"),
-                match_time=metadata.get("match_time", "Время не указано"),
-                venue=metadata.get("venue", "Место не указано"),
-                address=metadata.get("address", "Адрес не указан")
-            )
-
-        elif notification.type == NotificationType.MATCH_RESCHEDULE:
-            message_text = MATCH_RESCHEDULE_MESSAGE.format(
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                opponent_name=metadata.get("opponent_name", "Соперник"),
-                new_date=metadata.get("new_date", "Новая дата"),
-                new_time=metadata.get("new_time", "Новое время"),
-                new_venue=metadata.get("new_venue", "Новое место"),
-                new_address=metadata.get("new_address", "Новый адрес"),
-                old_date=metadata.get("old_date", "Старая дата"),
-                old_time=metadata.get("old_time", "Старое время")
-            )
 
-        elif notification.type == NotificationType.PLAYOFF_RESULT:
-            message_text = PLAYOFF_RESULT_MESSAGE.format(
-                team_name=metadata.get("team_name", "Команда"),
-                result=metadata.get("result", "прошла"),
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                additional_info=metadata.get("additional_info", "")
-            )
+def _mark_unreachable(notification: PendingNotification, reason: str, unreachable: Optional[Set[int]]):
+    """
+    Отметка получателя, которому Telegram отказал в доставке
 
-        elif notification.type == NotificationType.MATCH_REMINDER:
-            message_text = MATCH_REMINDER_MESSAGE.format(
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                opponent_name=metadata.get("opponent_name", "Соперник"),
-                match_date=metadata.get("match_date", "Дата"),
-                match_time=metadata.get("match_time", "Время"),
-                venue=metadata.get("venue", "Место"),
-                address=metadata.get("address", "Адрес")
-            )
+    Его неотправленные уведомления, включая это, остаются в базе, но не
+    выбираются из очереди до следующего /start пользователя.
+    """
+    if UserRepository.mark_unreachable(notification.user_id, reason):
+        logger.info(f"Пользователь {notification.user_id} отмечен как недоступный ({reason})")
+    if unreachable is not None:
+        unreachable.add(notification.user_id)
 
-        elif notification.type == NotificationType.NEW_CHAMPIONSHIP:
-            message_text = NEW_CHAMPIONSHIP_MESSAGE.format(
-                championship_name=metadata.get("championship_name", "Новый чемпионат"),
-                sport_type=metadata.get("sport_type", "Спорт"),
-                deadline=metadata.get("deadline", "Дедлайн"),
-                city=metadata.get("city", "Город"),
-                description=metadata.get("description", "")
-            )
 
-        elif notification.type == NotificationType.COMMITTEE_MESSAGE:
-            message_text = COMMITTEE_MESSAGE.format(
-                championship_name=metadata.get("championship_name", "Чемпионат"),
-                message=metadata.get("message", "Сообщение от оргкомитета")
-            )
+async def send_notification(bot, notification: PendingNotification, unreachable: Optional[Set[int]] = None):
+    """
+    Отправка уведомления пользователю
 
-        elif notification.type == NotificationType.TEAM_INVITATION:
-            message_text = TEAM_INVITATION_MESSAGE.format(
-                team_name=metadata.get("team_name", "Команда"),
-                sport_type=metadata.get("sport_type", "Спорт"),
-                captain_name=metadata.get("captain_name", "Капитан")
-            )
-            invitation_id = metadata.get("invitation_id")
-            if invitation_id:
-                markup = get_invitation_keyboard(invitation_id, "team")
-                logger.info(f"Создана клавиатура для приглашения в команду id={invitation_id}")
+    Args:
+        bot: Объект бота Telegram
+        notification: Неотправленное уведомление с Telegram ID получателя
+        unreachable: Множество, в которое добавляется ID получателя, если его чат недоступен (опционально)
 
-        elif notification.type == NotificationType.COMMITTEE_INVITATION:
-            message_text = COMMITTEE_INVITATION_MESSAGE.format(
-                committee_name=metadata.get("committee_name", "Оргкомитет"),
-                inviter_name=metadata.get("inviter_name", "Организатор")
-            )
-            invitation_id = metadata.get("invitation_id")
-            if invitation_id:
-                markup = get_invitation_keyboard(invitation_id, "committee")
-                logger.info(f"Создана клавиатура для приглашения в оргкомитет id={invitation_id}")
+    Returns:
+        bool: True, если уведомление успешно отправлено, иначе False
+    """
+    if not notification.telegram_id:
+        logger.warning(f"Пользователь {notification.user_id} не имеет привязанного Telegram ID")
+        return False
 
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        if notification.rendered_text and notification.template_version == TEMPLATES_VERSION:
+            message_text = notification.rendered_text
+            parse_mode = notification.parse_mode
+            reply_markup = notification.reply_markup_json
         else:
-            message_text = f"<b>{notification.title}</b>\n\n{notification.content}"
-
-        if not message_text.strip():
-            message_text = f"<b>{notification.title}</b>\n\n{notification.content}"
+            message = render_notification(
+                notification.type,
+                notification.title,
+                notification.content,
+                _parse_metadata(notification)
+            )
+            message_text = message.text
+            parse_mode = message.parse_mode
+            reply_markup = message.reply_markup_json
 
+        # Клавиатура передается уже сериализованной, aiogram отправляет строку как есть
         await bot.send_message(
-            chat_id=user.telegram_id,
+            chat_id=notification.telegram_id,
             text=message_text,
-            reply_markup=markup,
-            parse_mode="HTML"
+            reply_markup=reply_markup,
+            parse_mode=parse_mode
         )
+        outcome = "sent"
 
         NotificationRepository.mark_as_sent(notification.id)
         return True
 
     except BotBlocked:
-        logger.warning(f"Бот заблокирован пользователем {user.id}")
-        NotificationRepository.mark_as_sent(notification.id)
+        outcome = "blocked"
+        logger.warning(f"Бот заблокирован пользователем {notification.user_id}")
+        _mark_unreachable(notification, outcome, unreachable)
         return False
     except ChatNotFound:
-        logger.warning(f"Чат с пользователем {user.id} не найден")
-        NotificationRepository.mark_as_sent(notification.id)
+        outcome = "chat_not_found"
+        logger.warning(f"Чат с пользователем {notification.user_id} не найден")
+        _mark_unreachable(notification, outcome, unreachable)
         return False
     except UserDeactivated:
-        logger.warning(f"Пользователь {user.id} деактивировал свой аккаунт")
-        NotificationRepository.mark_as_sent(notification.id)
+        outcome = "deactivated"
+        logger.warning(f"Пользователь {notification.user_id} деактивировал свой аккаунт")
+        _mark_unreachable(notification, outcome, unreachable)
         return False
     except TelegramAPIError as e:
-        logger.error(f"Ошибка Telegram API при отправке уведомления пользователю {user.id}: {e}")
+        outcome = "telegram_error"
+        logger.error(f"Ошибка Telegram API при отправке уведомления пользователю {notification.user_id}: {e}")
         return False
     except Exception as e:
-        logger.error(f"Необработанная ошибка при отправке уведомления пользователю {user.id}: {e}")
+        logger.error(f"Необработанная ошибка при отправке уведомления пользователю {notification.user_id}: {e}")
         return False
+    finally:
+        NOTIFICATION_SEND_SECONDS.observe(time.perf_counter() - start, notification.type.value, outcome)
 
 
-async def process_pending_notifications(bot):
+async def process_pending_notifications(
+        bot,
+        shard: Optional[Shard] = None,
+        max_rps: float = MAX_RPS,
+        outbox: Optional[ReceiptOutbox] = None,
+        stop: Optional[Callable[[], bool]] = None
+):
     """
     Обработка ожидающих отправки уведомлений
 
+    Уведомления читаются из базы потоком, страницами по NOTIFICATION_PAGE_SIZE,
+    и отправляются не чаще max_rps сообщений в секунду. Если передана
+    проверка stop, она выполняется перед каждым уведомлением: когда она
+    возвращает True, проход прерывается после текущего сообщения, а
+    оставшиеся уведомления остаются в очереди.
+
     Args:
         bot: Объект бота Telegram
+        shard: Обрабатывать только уведомления пользователей этой части очереди
+        max_rps: Максимальное количество сообщений в секунду
+        outbox: Очередь подтверждений доставки, которой сообщается о новых подтверждениях (опционально)
+        stop: Проверка необходимости прервать проход (опционально)
     """
-    try:
-        notifications_data = NotificationRepository.get_pending_notifications(limit=MAX_RPS)
+    loop = asyncio.get_running_loop()
+    interval = 1 / max_rps
+    next_send_at = loop.time()
+    processed = 0
+    # Уведомления недоступных пользователей не выбираются из очереди, но
+    # могли попасть в страницу, прочитанную до отметки
+    unreachable: Set[int] = set()
 
-        if not notifications_data:
-            return
-
-        logger.info(f"Найдено {len(notifications_data)} неотправленных уведомлений")
-
-        for item in notifications_data:
-            notification_data = item['notification']
-            user_data = item['user']
-
-            if not user_data['telegram_id']:
-                logger.warning(f"Уведомление {notification_data['id']}: пользователь не имеет Telegram ID")
-                NotificationRepository.mark_as_sent(notification_data['id'])
+    try:
+        async for notification in NotificationRepository.stream_pending_notifications(
+                page_size=NOTIFICATION_PAGE_SIZE,
+                shard=shard
+        ):
+            if stop is not None and stop():
+                logger.info("Рассылка прервана, оставшиеся уведомления остаются в очереди")
+                break
+            processed += 1
+            if not notification.telegram_id:
+                logger.warning(f"Уведомление {notification.id}: пользователь не имеет Telegram ID")
+                NotificationRepository.mark_as_sent(notification.id, delivered=False)
+                if outbox is not None:
+                    outbox.notify()
+                continue
+            if notification.user_id in unreachable:
                 continue
 
-            class MockNotification:
-                def __init__(self, data):
-                    self.id = data['id']
-                    self.type = data['type']
-                    self.title = data['title']
-                    self.content = data['content']
-                    self.metadata_json = data['metadata_json']
-
-            class MockUser:
-                def __init__(self, data):
-                    self.id = data['id']
-                    self.telegram_id = data['telegram_id']
-                    self.first_name = data['first_name']
-                    self.last_name = data['last_name']
-
-            mock_notification = MockNotification(notification_data)
-            mock_user = MockUser(user_data)
+            delay = next_send_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_send_at = max(next_send_at, loop.time()) + interval
 
-            success = await send_notification(bot, mock_notification, mock_user)
+            success = await send_notification(bot, notification, unreachable)
+            if outbox is not None:
+                outbox.notify()
             if success:
                 logger.info(
-                    f"Уведомление {notification_data['id']} успешно отправлено пользователю {user_data['telegram_id']}")
+                    f"Уведомление {notification.id} успешно отправлено пользователю {notification.telegram_id}",
+                    extra={"sample": "notification_sent"})
             else:
                 logger.warning(
-                    f"Не удалось отправить уведомление {notification_data['id']} пользователю {user_data['telegram_id']}")
+                    f"Не удалось отправить уведомление {notification.id} пользователю {notification.telegram_id}")
+
+        if processed:
+            logger.info(f"Обработано {processed} неотправленных уведомлений")
 
     except Exception as e:
         logger.error(f"Ошибка при обработке неотправленных уведомлений: {e}")
 
+
 def register_notification_handlers(dp: Dispatcher):
     """
     Регистрация обработчиков для колбэков от уведомлений
@@ -252,69 +207,6 @@ def register_notification_handlers(dp: Dispatcher):
         dp: Диспетчер Aiogram
     """
     global api_client
-    api_client = ApiClient()
+    api_client = get_api_client()
 
     logger.info("Регистрация обработчиков для уведомлений")
-
-    @dp.message_handler(commands=['invitations'])
-    @dp.message_handler(lambda message: message.text == "Приглашения")
-    async def my_invitations(message: types.Message):
-        """
-        Обработчик запроса информации о приглашениях пользователя
-
-        Args:
-            message: Сообщение от пользователя
-        """
-        telegram_id = str(message.from_user.id)
-        user = UserRepository.get_by_telegram_id(telegram_id)
-
-        if not user:
-            await message.answer(
-                "Ваш аккаунт не привязан к боту. Отправьте /start для привязки."
-            )
-            return
-
-        await message.answer("Ищем ваши приглашения...")
-
-        try:
-            user_id = user['id'] if isinstance(user, dict) else user.id
-
-            invitations = await api_client.get_user_invitations(user_id)
-
-            if not invitations:
-                await message.answer("У вас нет активных приглашений.")
-                return
-
-            await message.answer(f"📨 Найдено {len(invitations)} приглашений:")
-
-            for invitation in invitations:
-                try:
-                    if invitation['type'] == 'team':
-                        markup = get_invitation_keyboard(invitation['invitation_id'], "team")
-
-                        await message.answer(
-                            TEAM_INVITATION_MESSAGE.format(
-                                team_name=invitation.get('team_name', ''),
-                                sport_type=invitation.get('sport', ''),
-                                captain_name=invitation.get('inviter_name', '')
-                            ),
-                            reply_markup=markup
-                        )
-                    elif invitation['type'] == 'committee':
-                        markup = get_invitation_keyboard(invitation['invitation_id'], "committee")
-
-                        await message.answer(
-                            COMMITTEE_INVITATION_MESSAGE.format(
-                                committee_name=invitation.get('committee_name', ''),
-                                inviter_name=invitation.get('inviter_name', '')
-                            ),
-                            reply_markup=markup
-                        )
-                except Exception as e:
-                    logger.error(f"Ошибка при обработке приглашения: {e}")
-
-        except Exception as e:
-            logger.error(f"Ошибка при получении приглашений пользователя {telegram_id}: {e}")
-            await message.answer(
-                "Произошла ошибка при получении информации о приглашениях. Пожалуйста, попробуйте позже."
-            )
\ No newline at end of file
@@ -1,12 +1,16 @@
 import re
 import logging
+from html import escape
+
 from aiogram import Dispatcher, types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 
 from utils.logger import get_logger
 from database.repositories.user_repository import UserRepository
-from api.client import ApiClient
+from api.client import get_api_client
+from api.errors import ApiError
+from api.models import Championship, Invitation, Match, Team
 from bot.messages.templates import (
     WELCOME_MESSAGE,
     PHONE_LINKED_MESSAGE,
@@ -22,6 +26,8 @@ from bot.keyboards.keyboards import (
     get_help_keyboard,
     get_invitation_keyboard
 )
+from bot.pagination import PageItem, send_paginated
+from bot.router import get_text_router
 
 logger = get_logger("user_handler")
 
@@ -30,9 +36,66 @@ class UserStates(StatesGroup):
 
 PHONE_REGEX = r'^(\+7|7|8)[0-9]{10}$'
 
+CHAMPIONSHIP_STATUSES = {
+    "active": "Активный",
+    "past": "Завершен"
+}
+
 api_client = None
 
 
+def _match_item(match: Match) -> PageItem:
+    return PageItem(
+        f"🏆 <b>{escape(match.tournament_name)}</b>\n"
+        f"🆚 Соперник: {escape(match.opponent_name)}\n"
+        f"📍 Место: {escape(match.location_name)}\n"
+        f"📆 Дата: {escape(match.date)} в {escape(match.time)}\n\n"
+    )
+
+
+def _championship_item(championship: Championship) -> PageItem:
+    text = f"<b>{escape(championship.name)}</b>\n"
+    text += f"⚽ Вид спорта: {escape(championship.sport)}\n"
+    text += f"🌆 Город: {escape(championship.city)}\n"
+    text += f"📊 Статус: {CHAMPIONSHIP_STATUSES.get(championship.status, 'Неизвестно')}\n"
+    if championship.position:
+        text += f"🏅 Позиция: {championship.position}\n"
+    return PageItem(text + "\n")
+
+
+def _team_item(team: Team) -> PageItem:
+    text = f"<b>{escape(team.name or 'Без названия')}</b>\n"
+    text += f"⚽ Вид спорта: {escape(team.sport or 'Не указан')}\n"
+    if team.is_captain:
+        text += "👑 Вы капитан этой команды\n"
+    if team.id:
+        text += f"Для просмотра подробной информации: /team_{team.id}\n"
+    return PageItem(text + "\n")
+
+
+def _invitation_item(number: int, invitation: Invitation) -> PageItem:
+    """
+    Приглашение с номером и кнопками ответа, подписанными этим номером
+    """
+    if invitation.type == 'team':
+        text = TEAM_INVITATION_MESSAGE.format(
+            team_name=invitation.team_name,
+            sport_type=invitation.sport,
+            captain_name=invitation.inviter_name
+        )
+    else:
+        text = COMMITTEE_INVITATION_MESSAGE.format(
+            committee_name=invitation.committee_name,
+            inviter_name=invitation.inviter_name
+        )
+    markup = get_invitation_keyboard(invitation.invitation_id, invitation.type)
+    buttons = tuple(
+        (f"{button.text} №{number}", button.callback_data)
+        for row in markup.inline_keyboard for button in row
+    )
+    return PageItem(f"\n<b>{number}.</b> {escape(text.strip())}\n", buttons)
+
+
 def register_user_handlers(dp: Dispatcher):
     """
     Регистрация обработчиков команд пользователя
@@ -41,9 +104,10 @@ def register_user_handlers(dp: Dispatcher):
         dp: Диспетчер Aiogram
     """
     global api_client
-    api_client = ApiClient()
+    api_client = get_api_client()
+    router = get_text_router(dp)
 
-    @dp.message_handler(commands=['start'])
+    @router.command('start')
     async def cmd_start(message: types.Message):
         """
         Обработчик команды /start
@@ -56,6 +120,9 @@ def register_user_handlers(dp: Dispatcher):
         user_data = UserRepository.get_by_telegram_id(str(user_id))
 
         if user_data:
+            # Пользователь снова пишет боту, значит, чат с ним доступен
+            if UserRepository.clear_unreachable(str(user_id)):
+                logger.info(f"Пользователь {user_data['id']} снова доступен для уведомлений")
             await message.answer(
                 f"Привет, {user_data['first_name']}! Ваш аккаунт уже привязан к боту.",
                 reply_markup=get_start_keyboard()
@@ -104,8 +171,8 @@ def register_user_handlers(dp: Dispatcher):
 
         await process_phone_number(message, phone_number, state)
 
-    @dp.message_handler(commands=['help'])
-    @dp.message_handler(lambda message: message.text == "Помощь")
+    @router.command('help')
+    @router.text("Помощь")
     async def cmd_help(message: types.Message):
         """
         Обработчик команды /help
@@ -120,7 +187,7 @@ def register_user_handlers(dp: Dispatcher):
 
         print("Отправлено меню помощи с клавиатурой")
 
-    @dp.message_handler(lambda message: message.text == "Мои матчи")
+    @router.text("Мои матчи")
     async def my_matches(message: types.Message):
         """
         Обработчик запроса информации о предстоящих матчах
@@ -150,15 +217,10 @@ def register_user_handlers(dp: Dispatcher):
                 await message.answer("У вас нет предстоящих матчей.")
                 return
 
-            response = "📅 Ваши предстоящие матчи:\n\n"
-
-            for match in matches:
-                response += f"🏆 *{match['tournament_name']}*\n"
-                response += f"🆚 Соперник: {match['opponent_name']}\n"
-                response += f"📍 Место: {match['location_name']}\n"
-                response += f"📆 Дата: {match['date']} в {match['time']}\n\n"
-
-            await message.answer(response, parse_mode="Markdown")
+            await send_paginated(
+                message, dp.storage, [_match_item(match) for match in matches],
+                header=f"📅 Ваши предстоящие матчи ({len(matches)}):\n\n"
+            )
 
         except Exception as e:
             user_id_str = str(user.id if hasattr(user, 'id') else user.get('id', 'unknown'))
@@ -168,8 +230,8 @@ def register_user_handlers(dp: Dispatcher):
                 "Произошла ошибка при получении информации о матчах. Пожалуйста, попробуйте позже."
             )
 
-    @dp.message_handler(commands=['invitations'])
-    @dp.message_handler(lambda message: message.text == "Приглашения")
+    @router.command('invitations')
+    @router.text("Приглашения")
     async def my_invitations(message: types.Message):
         """
         Обработчик запроса информации о приглашениях пользователя
@@ -197,32 +259,19 @@ def register_user_handlers(dp: Dispatcher):
                 await message.answer("У вас нет активных приглашений.")
                 return
 
-            await message.answer(f"📨 Найдено {len(invitations)} приглашений:")
-
-            for invitation in invitations:
-                if invitation['type'] == 'team':
-                    markup = get_invitation_keyboard(invitation['invitation_id'], "team")
-
-                    await message.answer(
-                        TEAM_INVITATION_MESSAGE.format(
-                            team_name=invitation.get('team_name', ''),
-                            sport_type=invitation.get('sport', ''),
-                            captain_name=invitation.get('inviter_name', '')
-                        ),
-                        reply_markup=markup,
-                        parse_mode="Markdown"
-                    )
-                elif invitation['type'] == 'committee':
-                    markup = get_invitation_keyboard(invitation['invitation_id'], "committee")
+            items = [
+                _invitation_item(number, invitation)
+                for number, invitation in enumerate(invitations, start=1)
+                if invitation.type in ('team', 'committee')
+            ]
+            if not items:
+                await message.answer("У вас нет активных приглашений.")
+                return
 
-                    await message.answer(
-                        COMMITTEE_INVITATION_MESSAGE.format(
-                            committee_name=invitation.get('committee_name', ''),
-                            inviter_name=invitation.get('inviter_name', '')
-                        ),
-                        reply_markup=markup,
-                        parse_mode="Markdown"
-                    )
+            await send_paginated(
+                message, dp.storage, items,
+                header=f"📨 Найдено {len(items)} приглашений:\n"
+            )
 
         except Exception as e:
             logger.error(f"Ошибка при получении приглашений пользователя {telegram_id}: {e}")
@@ -230,7 +279,7 @@ def register_user_handlers(dp: Dispatcher):
                 "Произошла ошибка при получении информации о приглашениях. Пожалуйста, попробуйте позже."
             )
 
-    @dp.message_handler(lambda message: message.text == "Мои чемпионаты")
+    @router.text("Мои чемпионаты")
     async def my_championships(message: types.Message):
         """
         Обработчик запроса информации о чемпионатах пользователя
@@ -260,28 +309,10 @@ def register_user_handlers(dp: Dispatcher):
                 await message.answer("Вы не участвуете ни в одном чемпионате.")
                 return
 
-            response = "🏆 Ваши чемпионаты:\n\n"
-
-            for championship in championships:
-                response += f"*{championship['name']}*\n"
-                response += f"⚽ Вид спорта: {championship['sport']}\n"
-                response += f"🌆 Город: {championship['city']}\n"
-
-                if championship['status'] == "active":
-                    status = "Активный"
-                elif championship['status'] == "past":
-                    status = "Завершен"
-                else:
-                    status = "Неизвестно"
-
-                response += f"📊 Статус: {status}\n"
-
-                if 'position' in championship and championship['position']:
-                    response += f"🏅 Позиция: {championship['position']}\n"
-
-                response += "\n"
-
-            await message.answer(response, parse_mode="Markdown")
+            await send_paginated(
+                message, dp.storage, [_championship_item(championship) for championship in championships],
+                header=f"🏆 Ваши чемпионаты ({len(championships)}):\n\n"
+            )
 
         except Exception as e:
             user_id_str = str(user.id if hasattr(user, 'id') else user.get('id', 'unknown'))
@@ -291,7 +322,7 @@ def register_user_handlers(dp: Dispatcher):
                 "Произошла ошибка при получении информации о чемпионатах. Пожалуйста, попробуйте позже."
             )
 
-    @dp.message_handler(lambda message: message.text == "Мои команды")
+    @router.text("Мои команды")
     async def my_teams(message: types.Message):
         """
         Обработчик запроса информации о командах пользователя
@@ -318,24 +349,11 @@ def register_user_handlers(dp: Dispatcher):
                 await message.answer("Вы не состоите ни в одной команде.")
                 return
 
-            response = "👥 Ваши команды:\n\n"
-
-            for team in teams:
-                response += f"<b>{team.get('name', 'Без названия')}</b>\n"
-                response += f"⚽ Вид спорта: {team.get('sport', 'Не указан')}\n"
-
-                if team.get('is_captain', False):
-                    response += "👑 Вы капитан этой команды\n"
-
-                team_id = team.get('id', team.get('team_id', ''))
-                if team_id:
-                    response += f"Для просмотра подробной информации: /team_{team_id}\n"
-
-                response += "\n"
-
-            response += "Чтобы просмотреть подробную информацию о команде, отправьте /team_ID (например, /team_123)"
-
-            await message.answer(response, parse_mode="HTML")
+            await send_paginated(
+                message, dp.storage, [_team_item(team) for team in teams],
+                header=f"👥 Ваши команды ({len(teams)}):\n\n",
+                footer="Чтобы просмотреть подробную информацию о команде, отправьте /team_ID (например, /team_123)"
+            )
 
         except Exception as e:
             logger.error(f"Ошибка при получении команд пользователя: {e}")
@@ -344,7 +362,7 @@ def register_user_handlers(dp: Dispatcher):
                 reply_markup=get_start_keyboard()
             )
 
-    @dp.message_handler(commands=['changephone'])
+    @router.command('changephone')
     async def cmd_change_phone(message: types.Message):
         """
         Обработчик команды /changephone
@@ -392,12 +410,17 @@ def register_user_handlers(dp: Dispatcher):
                 return
 
             if api_client:
-                user_data = await api_client.get_user_data(phone_number)
-                if "error" not in user_data and user_data:
+                try:
+                    profile = await api_client.get_user_data(phone_number)
+                except ApiError as e:
+                    logger.info(f"Пользователь с номером {phone_number} не получен из API: {e}")
+                    profile = None
+
+                if profile:
                     user = UserRepository.create(
                         phone_number=phone_number,
-                        first_name=user_data.get("first_name", "Пользователь"),
-                        last_name=user_data.get("last_name", ""),
+                        first_name=profile.first_name,
+                        last_name=profile.last_name,
                         telegram_id=str(message.from_user.id)
                     )
 
@@ -433,7 +456,8 @@ def register_user_handlers(dp: Dispatcher):
                 reply_markup=get_phone_keyboard()
             )
 
-    @dp.message_handler(lambda message: re.match(r'/team_?\d+', message.text))
+    # /team_15 и /team15
+    @router.prefix('/team_', '/team', argument=lambda rest: rest[:1].isdigit())
     async def team_details(message: types.Message):
         """
         Обработчик запроса информации о конкретной команде
@@ -464,28 +488,17 @@ def register_user_handlers(dp: Dispatcher):
 
             team = await api_client.get_team_details(team_id)
 
-            if not team or not isinstance(team, dict):
-                await message.answer("Команда не найдена или у вас нет доступа к ней.")
-                return
-
-            name = team.get('name', 'Без названия')
-            sport = team.get('sport', 'Не указан')
-            count_member = team.get('count_member', 0)
-            wins = team.get('wins', 0)
-            loss = team.get('loss', 0)
-            members = team.get('members', [])
-
-            response = f"👥 <b>{name}</b>\n\n"
-            response += f"⚽ Вид спорта: {sport}\n"
-            response += f"👨‍👩‍👧‍👦 Участников: {count_member}\n"
-            response += f"🏆 Побед: {wins}\n"
-            response += f"❌ Поражений: {loss}\n\n"
+            response = f"👥 <b>{team.name or 'Без названия'}</b>\n\n"
+            response += f"⚽ Вид спорта: {team.sport or 'Не указан'}\n"
+            response += f"👨‍👩‍👧‍👦 Участников: {team.count_member}\n"
+            response += f"🏆 Побед: {team.wins}\n"
+            response += f"❌ Поражений: {team.loss}\n\n"
 
-            if members:
+            if team.members:
                 response += "<b>Состав команды:</b>\n"
-                for member in members:
-                    member_name = f"{member.get('first_name', '')} {member.get('last_name', '')}"
-                    if member.get('is_captain', False):
+                for member in team.members:
+                    member_name = f"{member.first_name} {member.last_name}"
+                    if member.is_captain:
                         member_name += " 👑"
                     response += f"- {member_name}\n"
 
@@ -496,10 +509,10 @@ def register_user_handlers(dp: Dispatcher):
 
             error_message = "Произошла ошибка при получении информации о команде."
 
-            if hasattr(e, 'response') and hasattr(e.response, 'status'):
-                if e.response.status == 404:
+            if isinstance(e, ApiError):
+                if e.status == 404:
                     error_message = "Команда не найдена."
-                elif e.response.status == 403:
+                elif e.status == 403:
                     error_message = "У вас нет доступа к информации об этой команде."
 
             await message.answer(
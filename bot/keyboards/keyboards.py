@@ -1,5 +1,22 @@
+from typing import Optional
+
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 
+# Тексты кнопок меню, которые бот обрабатывает как команды
+MENU_BUTTONS = frozenset({
+    "Мои матчи",
+    "Мои чемпионаты",
+    "Мои команды",
+    "Приглашения",
+    "Рекомендуемые чемпионаты",
+    "Помощь",
+    "Главное меню"
+})
+
+# callback_data кнопок перелистывания списков: page_<номер страницы>
+PAGE_CALLBACK_PREFIX = "page_"
+PAGE_CURRENT_CALLBACK = "page_current"
+
 def get_phone_keyboard() -> ReplyKeyboardMarkup:
     """
     Клавиатура для запроса номера телефона
@@ -60,6 +77,33 @@ def get_invitation_keyboard(invitation_id: int, invitation_type: str) -> InlineK
     return keyboard
 
 
+def get_pagination_keyboard(page: int, pages: int, buttons=()) -> Optional[InlineKeyboardMarkup]:
+    """
+    Клавиатура страницы списка
+
+    Args:
+        page: Номер страницы (с нуля)
+        pages: Количество страниц
+        buttons: Ряды кнопок элементов страницы: списки пар (подпись, callback_data)
+
+    Returns:
+        InlineKeyboardMarkup: Кнопки элементов и ряд перелистывания или None, если кнопок нет
+    """
+    keyboard = InlineKeyboardMarkup()
+    for row in buttons:
+        keyboard.row(*(InlineKeyboardButton(text, callback_data=data) for text, data in row))
+
+    if pages > 1:
+        navigation = []
+        if page > 0:
+            navigation.append(InlineKeyboardButton("◀️", callback_data=f"{PAGE_CALLBACK_PREFIX}{page - 1}"))
+        navigation.append(InlineKeyboardButton(f"{page + 1}/{pages}", callback_data=PAGE_CURRENT_CALLBACK))
+        if page < pages - 1:
+            navigation.append(InlineKeyboardButton("▶️", callback_data=f"{PAGE_CALLBACK_PREFIX}{page + 1}"))
+        keyboard.row(*navigation)
+
+    return keyboard if keyboard.inline_keyboard else None
+
 
 def get_match_actions_keyboard(match_id: int, team_id: int) -> InlineKeyboardMarkup:
     """
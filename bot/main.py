@@ -2,26 +2,56 @@ import asyncio
 import logging
 import sys
 import datetime
-from aiogram import Bot, Dispatcher, executor
-from aiogram.contrib.fsm_storage.memory import MemoryStorage
-
-from config.config import TELEGRAM_BOT_TOKEN
+from aiogram import Dispatcher
+from aiogram.utils.executor import Executor
+
+from config.config import (
+    TELEGRAM_BOT_TOKEN,
+    BOT_MODE,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_MAX_CONCURRENCY,
+    WEBAPP_HOST,
+    WEBAPP_PORT,
+    DISPATCH_WORKERS,
+    DELIVERY_RECEIPTS_ENABLED,
+    DB_AUTO_MIGRATE,
+    METRICS_ENABLED,
+    METRICS_PORT
+)
 from utils.logger import setup_logger
-from database.connection import init_db
+from database.migrations import check_schema, upgrade
+from api.client import get_api_client
+from database.leader import LeaderElection
+from database.records import Shard
+from bot.storage import create_storage
+from bot.webhook import SecureWebhookRequestHandler
+from bot.middlewares import MetricsMiddleware, ThrottlingMiddleware
+from bot.profiling import TimedBot, ProfilingMiddleware
+from bot.telegram_api import get_api_server
+from bot.monitoring import HEALTH, start_monitoring_server
+from bot.warmup import warm_up
+from bot.receipts import ReceiptOutbox
 from bot.handlers.user import register_user_handlers
 from bot.handlers.notification import register_notification_handlers, process_pending_notifications
 from bot.handlers.match import register_match_handlers
 from bot.handlers.championship import register_championship_handlers
 from bot.handlers.callback_handlers import register_callback_handlers
+from bot.pagination import register_pagination_handlers
 from database.repositories.notification_repository import NotificationRepository
 
 logger = setup_logger("bot")
 
-bot = Bot(token=TELEGRAM_BOT_TOKEN)
-storage = MemoryStorage()
+bot = TimedBot(token=TELEGRAM_BOT_TOKEN, server=get_api_server())
+storage = create_storage()
 dp = Dispatcher(bot, storage=storage)
+dp.middleware.setup(MetricsMiddleware())
+dp.middleware.setup(ProfilingMiddleware())
+dp.middleware.setup(ThrottlingMiddleware())
 
 register_callback_handlers(dp)
+register_pagination_handlers(dp)
 register_user_handlers(dp)
 register_notification_handlers(dp)
 register_match_handlers(dp)
@@ -29,20 +59,47 @@ register_championship_handlers(dp)
 
 background_tasks_running = False
 
+leader = LeaderElection("periodic_jobs")
+# Рассылкой в процессе бота занимается одна реплика: та, что держит блокировку
+# единственной части очереди (ту же, что и единственный процесс bot.worker)
+dispatch_owner = LeaderElection(Shard(0, 1).lock_name)
+monitoring_server = None
+# Подтверждения доставки передает тот процесс, который рассылает уведомления
+receipt_outbox = None
+# Дата последнего запуска ежедневных задач в этом процессе: избавляет от повторных
+# вызовов в ту же минуту, а один запуск за день гарантирует отметка в базе
+last_run = {}
+
+ALLOWED_UPDATES = ['message', 'callback_query']
+
 
 async def check_notifications_periodically():
     while background_tasks_running:
         try:
-            await process_pending_notifications(bot)
-
+            # При DISPATCH_WORKERS > 0 уведомления рассылают процессы bot.supervisor
+            if not DISPATCH_WORKERS and dispatch_owner.is_leader:
+                await process_pending_notifications(
+                    bot, outbox=receipt_outbox,
+                    stop=lambda: not background_tasks_running or not dispatch_owner.is_leader
+                )
+
+            # Напоминания и очистку выполняет только ведущий экземпляр. Дата
+            # последнего запуска хранится в базе, поэтому после смены ведущего в
+            # ту же минуту задача за этот день повторно не выполняется
             now = datetime.datetime.now()
-            if now.hour == 12 and now.minute == 0:
-                count = NotificationRepository.create_match_reminder_notifications()
-                logger.info(f"Создано {count} напоминаний о матчах")
-
-            if now.hour == 3 and now.minute == 0:
-                count = NotificationRepository.delete_old_sent_notifications(days=30)
-                logger.info(f"Удалено {count} старых уведомлений")
+            today = now.date()
+            if leader.is_leader:
+                if now.hour == 12 and now.minute == 0 and last_run.get("reminders") != today:
+                    last_run["reminders"] = today
+                    count = await asyncio.to_thread(
+                        NotificationRepository.create_match_reminder_notifications, today
+                    )
+                    logger.info(f"Создано {count} напоминаний о матчах")
+
+                if now.hour == 3 and now.minute == 0 and last_run.get("cleanup") != today:
+                    last_run["cleanup"] = today
+                    count = await asyncio.to_thread(NotificationRepository.delete_old_sent_notifications, 30, today)
+                    logger.info(f"Удалено {count} старых уведомлений")
 
         except Exception as e:
             logger.error(f"Ошибка при выполнении фоновых задач: {e}")
@@ -57,10 +114,27 @@ async def on_startup(dispatcher):
     Args:
         dispatcher: Диспетчер Aiogram
     """
-    global background_tasks_running
+    global background_tasks_running, monitoring_server, receipt_outbox
     try:
-        init_db()
-        logger.info("База данных инициализирована")
+        # Сервер запускается первым: до окончания прогрева /health/ready отвечает 503
+        if METRICS_ENABLED:
+            monitoring_server = await start_monitoring_server(METRICS_PORT)
+
+        if DB_AUTO_MIGRATE:
+            await asyncio.to_thread(upgrade)
+        version = await asyncio.to_thread(check_schema)
+        logger.info(f"Схема базы данных версии {version}")
+
+        timings = await warm_up(bot=dispatcher.bot, api_client=get_api_client())
+        HEALTH.set_ready(timings)
+
+        leader.start()
+        if not DISPATCH_WORKERS:
+            dispatch_owner.start()
+
+        if DELIVERY_RECEIPTS_ENABLED and not DISPATCH_WORKERS:
+            receipt_outbox = ReceiptOutbox(get_api_client())
+            receipt_outbox.start()
 
         background_tasks_running = True
         asyncio.create_task(check_notifications_periodically())
@@ -72,6 +146,26 @@ async def on_startup(dispatcher):
         sys.exit(1)
 
 
+async def on_startup_webhook(dispatcher):
+    """
+    Функция, выполняемая при запуске бота в режиме webhook
+
+    Args:
+        dispatcher: Диспетчер Aiogram
+    """
+    await on_startup(dispatcher)
+
+    webhook_url = WEBHOOK_HOST.rstrip("/") + WEBHOOK_PATH
+    await dispatcher.bot.set_webhook(
+        webhook_url,
+        max_connections=WEBHOOK_MAX_CONCURRENCY,
+        allowed_updates=ALLOWED_UPDATES,
+        drop_pending_updates=True,
+        secret_token=WEBHOOK_SECRET
+    )
+    logger.info(f"Webhook установлен: {webhook_url}")
+
+
 async def on_shutdown(dispatcher):
     """
     Функция, выполняемая при остановке бота
@@ -82,8 +176,17 @@ async def on_shutdown(dispatcher):
     global background_tasks_running
     try:
         background_tasks_running = False
+        await leader.stop()
+        await dispatch_owner.stop()
         logger.info("Фоновые задачи остановлены")
 
+        if monitoring_server is not None:
+            await monitoring_server.cleanup()
+
+        if receipt_outbox is not None:
+            await receipt_outbox.stop()
+        await get_api_client().close()
+
         await dispatcher.storage.close()
         await dispatcher.storage.wait_closed()
         logger.info("Хранилище состояний закрыто")
@@ -94,10 +197,19 @@ async def on_shutdown(dispatcher):
 
 
 if __name__ == '__main__':
-    executor.start_polling(
-        dp,
-        on_startup=on_startup,
-        on_shutdown=on_shutdown,
-        skip_updates=True,
-        allowed_updates=['message', 'callback_query']
-    )
\ No newline at end of file
+    # В режиме webhook накопившиеся обновления сбрасываются при установке webhook
+    executor = Executor(dp, skip_updates=BOT_MODE != "webhook")
+
+    if BOT_MODE == "webhook":
+        executor.on_startup(on_startup_webhook)
+        executor.on_shutdown(on_shutdown)
+        executor.start_webhook(
+            webhook_path=WEBHOOK_PATH,
+            request_handler=SecureWebhookRequestHandler,
+            host=WEBAPP_HOST,
+            port=WEBAPP_PORT
+        )
+    else:
+        executor.on_startup(on_startup)
+        executor.on_shutdown(on_shutdown)
+        executor.start_polling(reset_webhook=True, allowed_updates=ALLOWED_UPDATES)
@@ -0,0 +1,164 @@
+""" Подготовка текста уведомлений по шаблонам """
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from database.models import NotificationType
+from bot.messages.templates import (
+    TEAM_APPLICATION_MESSAGE,
+    APPLICATION_CANCEL_MESSAGE,
+    CHAMPIONSHIP_CANCEL_MESSAGE,
+    NEW_MATCH_MESSAGE,
+    MATCH_RESCHEDULE_MESSAGE,
+    PLAYOFF_RESULT_MESSAGE,
+    MATCH_REMINDER_MESSAGE,
+    NEW_CHAMPIONSHIP_MESSAGE,
+    COMMITTEE_MESSAGE,
+    TEAM_INVITATION_MESSAGE,
+    COMMITTEE_INVITATION_MESSAGE
+)
+from bot.keyboards.keyboards import get_invitation_keyboard
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedMessage:
+    """Готовое к отправке сообщение"""
+    text: str
+    parse_mode: str
+    reply_markup_json: Optional[str] = None
+
+
+def render_notification(
+        notification_type: NotificationType,
+        title: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]] = None
+) -> RenderedMessage:
+    """
+    Формирование текста и клавиатуры уведомления по шаблону
+
+    Args:
+        notification_type: Тип уведомления
+        title: Заголовок уведомления
+        content: Содержание уведомления
+        metadata: Дополнительные данные для шаблона (опционально)
+
+    Returns:
+        Готовое к отправке сообщение
+    """
+    metadata = metadata or {}
+    message_text = ""
+    markup = None
+
+    if notification_type == NotificationType.TEAM_APPLICATION:
+        message_text = TEAM_APPLICATION_MESSAGE.format(
+            team_name=metadata.get("team_name", "Команда"),
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            application_deadline=metadata.get("application_deadline", "Не указан")
+        )
+
+    elif notification_type == NotificationType.APPLICATION_CANCEL:
+        message_text = APPLICATION_CANCEL_MESSAGE.format(
+            status=metadata.get("status", "отклонена"),
+            team_name=metadata.get("team_name", "Команда"),
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            reason=metadata.get("reason", "Причина не указана")
+        )
+
+    elif notification_type == NotificationType.CHAMPIONSHIP_CANCEL:
+        message_text = CHAMPIONSHIP_CANCEL_MESSAGE.format(
+            status=metadata.get("status", "отменен"),
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            additional_info=metadata.get("additional_info", "")
+        )
+
+    elif notification_type == NotificationType.NEW_MATCH:
+        message_text = NEW_MATCH_MESSAGE.format(
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            opponent_name=metadata.get("opponent_name", "Соперник"),
+            match_date=metadata.get("match_date", "Дата не указана"),
+            match_time=metadata.get("match_time", "Время не указано"),
+            venue=metadata.get("venue", "Место не указано"),
+            address=metadata.get("address", "Адрес не указан")
+        )
+
+    elif notification_type == NotificationType.MATCH_RESCHEDULE:
+        message_text = MATCH_RESCHEDULE_MESSAGE.format(
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            opponent_name=metadata.get("opponent_name", "Соперник"),
+            new_date=metadata.get("new_date", "Новая дата"),
+            new_time=metadata.get("new_time", "Новое время"),
+            new_venue=metadata.get("new_venue", "Новое место"),
+            new_address=metadata.get("new_address", "Новый адрес"),
+            old_date=metadata.get("old_date", "Старая дата"),
+            old_time=metadata.get("old_time", "Старое время")
+        )
+
+    elif notification_type == NotificationType.PLAYOFF_RESULT:
+        message_text = PLAYOFF_RESULT_MESSAGE.format(
+            team_name=metadata.get("team_name", "Команда"),
+            result=metadata.get("result", "прошла"),
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            additional_info=metadata.get("additional_info", "")
+        )
+
+    elif notification_type == NotificationType.MATCH_REMINDER:
+        message_text = MATCH_REMINDER_MESSAGE.format(
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            opponent_name=metadata.get("opponent_name", "Соперник"),
+            match_date=metadata.get("match_date", "Дата"),
+            match_time=metadata.get("match_time", "Время"),
+            venue=metadata.get("venue", "Место"),
+            address=metadata.get("address", "Адрес")
+        )
+
+    elif notification_type == NotificationType.NEW_CHAMPIONSHIP:
+        message_text = NEW_CHAMPIONSHIP_MESSAGE.format(
+            championship_name=metadata.get("championship_name", "Новый чемпионат"),
+            sport_type=metadata.get("sport_type", "Спорт"),
+            deadline=metadata.get("deadline", "Дедлайн"),
+            city=metadata.get("city", "Город"),
+            description=metadata.get("description", "")
+        )
+
+    elif notification_type == NotificationType.COMMITTEE_MESSAGE:
+        message_text = COMMITTEE_MESSAGE.format(
+            championship_name=metadata.get("championship_name", "Чемпионат"),
+            message=metadata.get("message", "Сообщение от оргкомитета")
+        )
+
+    elif notification_type == NotificationType.TEAM_INVITATION:
+        message_text = TEAM_INVITATION_MESSAGE.format(
+            team_name=metadata.get("team_name", "Команда"),
+            sport_type=metadata.get("sport_type", "Спорт"),
+            captain_name=metadata.get("captain_name", "Капитан")
+        )
+        invitation_id = metadata.get("invitation_id")
+        if invitation_id:
+            markup = get_invitation_keyboard(invitation_id, "team")
+            logger.info(f"Создана клавиатура для приглашения в команду id={invitation_id}")
+
+    elif notification_type == NotificationType.COMMITTEE_INVITATION:
+        message_text = COMMITTEE_INVITATION_MESSAGE.format(
+            committee_name=metadata.get("committee_name", "Оргкомитет"),
+            inviter_name=metadata.get("inviter_name", "Организатор")
+        )
+        invitation_id = metadata.get("invitation_id")
+        if invitation_id:
+            markup = get_invitation_keyboard(invitation_id, "committee")
+            logger.info(f"Создана клавиатура для приглашения в оргкомитет id={invitation_id}")
+
+    else:
+        message_text = f"<b>{title}</b>\n\n{content}"
+
+    if not message_text.strip():
+        message_text = f"<b>{title}</b>\n\n{content}"
+
+    return RenderedMessage(
+        text=message_text,
+        parse_mode="HTML",
+        reply_markup_json=markup.as_json() if markup else None
+    )
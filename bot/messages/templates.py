@@ -1,5 +1,10 @@
 """ Шаблоны сообщений для отправки пользователям """
 
+# Версия шаблонов уведомлений. Увеличивайте при любом изменении шаблонов
+# уведомлений: сохраненные заранее тексты со старой версией будут
+# сформированы заново при отправке.
+TEMPLATES_VERSION = 1
+
 WELCOME_MESSAGE = """
 Привет! Я бот для уведомлений о спортивных соревнованиях.
 
@@ -0,0 +1,216 @@
+""" Промежуточные обработчики (middleware) обновлений Telegram """
+
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiogram import types
+from aiogram.dispatcher.handler import CancelHandler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from config.config import THROTTLE_RATE, THROTTLE_BURST
+from bot.keyboards.keyboards import MENU_BUTTONS
+from utils.metrics import HANDLER_SECONDS, THROTTLED_UPDATES
+
+# Числовые части команд и данных колбэков (/team_15, accept_team_7) не входят в метку
+_ID_PATTERN = re.compile(r"_?\d+")
+
+
+def command_label(update: types.Update) -> str:
+    """
+    Метка команды обновления для метрик
+
+    Произвольный текст пользователя и идентификаторы в командах в метку не
+    попадают, чтобы число различных меток оставалось ограниченным.
+
+    Args:
+        update: Обновление Telegram
+
+    Returns:
+        Команда (/start), текст кнопки меню, шаблон данных колбэка или тип обновления
+    """
+    message = update.message
+    if message is not None:
+        text = message.text
+        if text:
+            if text.startswith("/"):
+                command = text.split(maxsplit=1)[0].split("@", 1)[0]
+                return _ID_PATTERN.sub("_", command)
+            if text in MENU_BUTTONS:
+                return text
+            return "text"
+        if message.contact is not None:
+            return "contact"
+        return "message"
+
+    callback_query = update.callback_query
+    if callback_query is not None:
+        return "callback:" + _ID_PATTERN.sub("", callback_query.data or "")
+
+    return "other"
+
+
+class MetricsMiddleware(BaseMiddleware):
+    """
+    Измерение времени обработки каждого обновления по команде
+    """
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        data["_started_at"] = time.perf_counter()
+
+    async def on_post_process_update(self, update: types.Update, result, data: dict):
+        started_at = data.get("_started_at")
+        if started_at is not None:
+            HANDLER_SECONDS.observe(time.perf_counter() - started_at, command_label(update))
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов по алгоритму token bucket отдельно для каждого ключа
+
+    Ведро каждого ключа вмещает burst жетонов и пополняется со скоростью
+    rate жетонов в секунду; каждый запрос забирает один жетон. Ведра,
+    успевшие наполниться, не отличаются от новых и периодически удаляются,
+    поэтому память занимают только недавно активные ключи.
+
+    Args:
+        rate: Количество запросов в секунду в среднем
+        burst: Количество запросов подряд
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._refill_time = self.burst / rate
+        # Ключ -> [жетоны, время обновления, отклоненных запросов подряд]
+        self._buckets: Dict[int, List[float]] = {}
+        self._swept_at = time.monotonic()
+
+    def allow(self, key: int, now: Optional[float] = None) -> bool:
+        """
+        Попытка забрать жетон для запроса
+
+        Args:
+            key: Ключ (ID пользователя)
+            now: Текущее время time.monotonic() (опционально)
+
+        Returns:
+            True, если запрос укладывается в ограничение
+        """
+        if now is None:
+            now = time.monotonic()
+        if now - self._swept_at >= self._refill_time:
+            self._sweep(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [self.burst - 1, now, 0]
+            return True
+
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            bucket[2] += 1
+            return False
+        bucket[0] = tokens - 1
+        bucket[2] = 0
+        return True
+
+    def rejected(self, key: int) -> int:
+        """
+        Количество запросов ключа, отклоненных подряд
+        """
+        bucket = self._buckets.get(key)
+        return int(bucket[2]) if bucket is not None else 0
+
+    def _sweep(self, now: float):
+        self._swept_at = now
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if now - bucket[1] < self._refill_time
+        }
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Защита от флуда: ограничение частоты запросов пользователя и повторных нажатий
+
+    Сообщения и нажатия кнопок каждого пользователя проходят через
+    RateLimiter; сверх ограничения они отбрасываются, а пользователь один
+    раз получает предупреждение. Пока обрабатывается команда, кнопка меню
+    или нажатие инлайн-кнопки, такие же запросы того же пользователя
+    отбрасываются без обращения к API: повторное нажатие инлайн-кнопки
+    сразу получает ответ «Запрос уже обрабатывается». Состояние хранится в
+    памяти процесса.
+
+    Args:
+        rate: Количество запросов пользователя в секунду в среднем (0 - без ограничения)
+        burst: Количество запросов пользователя подряд
+    """
+
+    RATE_LIMIT_TEXT = "Слишком много запросов. Подождите несколько секунд"
+    DUPLICATE_TEXT = "Запрос уже обрабатывается"
+
+    def __init__(self, rate: float = THROTTLE_RATE, burst: int = THROTTLE_BURST):
+        super().__init__()
+        self.limiter = RateLimiter(rate, burst) if rate > 0 else None
+        # Пары (ID пользователя, команда или данные колбэка), обработка которых еще идет
+        self._in_flight: Set[Tuple[int, str]] = set()
+
+    def _allow(self, user_id: int) -> bool:
+        if self.limiter is None or self.limiter.allow(user_id):
+            return True
+        THROTTLED_UPDATES.inc("rate")
+        return False
+
+    def _acquire(self, key: Tuple[int, str], data: dict):
+        self._in_flight.add(key)
+        data["_in_flight_key"] = key
+
+    def _release(self, data: dict):
+        key = data.get("_in_flight_key")
+        if key is not None:
+            self._in_flight.discard(key)
+
+    async def on_pre_process_message(self, message: types.Message, data: dict):
+        if message.from_user is None:
+            return
+        user_id = message.from_user.id
+
+        text = message.text
+        key = None
+        if text and (text.startswith("/") or text in MENU_BUTTONS):
+            key = (user_id, text)
+            if key in self._in_flight:
+                THROTTLED_UPDATES.inc("duplicate")
+                raise CancelHandler()
+
+        if not self._allow(user_id):
+            if self.limiter.rejected(user_id) == 1:
+                await message.answer(self.RATE_LIMIT_TEXT)
+            raise CancelHandler()
+
+        if key is not None:
+            self._acquire(key, data)
+
+    async def on_post_process_message(self, message: types.Message, results, data: dict):
+        self._release(data)
+
+    async def on_pre_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        user_id = callback_query.from_user.id
+
+        key = (user_id, callback_query.data or "")
+        if key in self._in_flight:
+            THROTTLED_UPDATES.inc("duplicate")
+            await callback_query.answer(self.DUPLICATE_TEXT)
+            raise CancelHandler()
+
+        if not self._allow(user_id):
+            await callback_query.answer(self.RATE_LIMIT_TEXT)
+            raise CancelHandler()
+
+        self._acquire(key, data)
+
+    async def on_post_process_callback_query(self, callback_query: types.CallbackQuery, results, data: dict):
+        self._release(data)
@@ -0,0 +1,163 @@
+""" HTTP-сервер с метриками и проверками состояния процесса """
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from config.config import METRICS_HOST, HEALTH_CHECK_TIMEOUT
+from utils.metrics import (
+    REGISTRY,
+    NOTIFICATION_QUEUE_DEPTH,
+    NOTIFICATION_QUEUE_OLDEST_AGE,
+    DB_POOL_CHECKED_OUT
+)
+from database.connection import get_engine
+from database.repositories.notification_repository import NotificationRepository
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HealthState:
+    """
+    Состояние процесса для проверок /health/live и /health/ready
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.warmup: Dict[str, float] = {}
+
+    def set_ready(self, warmup: Optional[Dict[str, float]] = None):
+        """
+        Отметка о готовности процесса обрабатывать обновления
+
+        Args:
+            warmup: Время шагов прогрева в секундах
+        """
+        self.warmup = dict(warmup or {})
+        self.ready = True
+
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+HEALTH = HealthState()
+
+
+async def collect_queue_metrics() -> Tuple[int, float]:
+    """
+    Обновление метрик очереди уведомлений перед выдачей
+
+    Returns:
+        Глубина очереди и возраст самого старого уведомления в секундах
+    """
+    depth, oldest = await asyncio.to_thread(NotificationRepository.get_queue_stats)
+    age = max((datetime.now() - oldest).total_seconds() if oldest else 0, 0)
+    NOTIFICATION_QUEUE_DEPTH.set(depth)
+    NOTIFICATION_QUEUE_OLDEST_AGE.set(age)
+    return depth, age
+
+
+def ping_database() -> bool:
+    """
+    Проверка доступности базы данных запросом SELECT 1
+    """
+    try:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except SQLAlchemyError as e:
+        logger.warning(f"База данных недоступна: {e}")
+        return False
+
+
+async def queue_lag(app: web.Application) -> Optional[Dict[str, float]]:
+    """
+    Отставание очереди уведомлений для ответа проверки состояния
+    """
+    if not app["collect_queue"]:
+        return None
+    depth, age = await collect_queue_metrics()
+    return {"depth": depth, "oldest_age_seconds": round(age, 1)}
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    if request.app["collect_queue"]:
+        await collect_queue_metrics()
+    DB_POOL_CHECKED_OUT.set(get_engine().pool.checkedout())
+    return web.Response(body=REGISTRY.render().encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def live_handler(request: web.Request) -> web.Response:
+    """
+    Проверка, что процесс жив: отвечает всегда, пока работает цикл событий
+
+    Проверка не обращается к базе данных, чтобы медленная или недоступная
+    база не приводила к перезапуску работающего процесса.
+    """
+    return web.json_response({"status": "ok", "uptime_seconds": round(HEALTH.uptime(), 1)})
+
+
+async def ready_handler(request: web.Request) -> web.Response:
+    """
+    Проверка готовности: 503 до окончания прогрева и при недоступной базе данных
+
+    Запросы к базе данных ограничены HEALTH_CHECK_TIMEOUT секундами; если
+    отставание очереди не удалось получить за это время, оно не выводится.
+    """
+    if not HEALTH.ready:
+        return web.json_response({"status": "warming_up"}, status=503)
+    try:
+        database_available = await asyncio.wait_for(asyncio.to_thread(ping_database), HEALTH_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"База данных не ответила на проверку состояния за {HEALTH_CHECK_TIMEOUT:g} с")
+        database_available = False
+    if not database_available:
+        return web.json_response({"status": "database_unavailable"}, status=503)
+
+    body = {"status": "ready", "warmup": HEALTH.warmup}
+    try:
+        queue = await asyncio.wait_for(queue_lag(request.app), HEALTH_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        queue = None
+    if queue is not None:
+        body["queue"] = queue
+    return web.json_response(body)
+
+
+async def start_monitoring_server(port: int, collect_queue: bool = True) -> Optional[web.AppRunner]:
+    """
+    Запуск HTTP-сервера с метриками и проверками состояния
+
+    Args:
+        port: Порт сервера
+        collect_queue: Обновлять метрики очереди уведомлений при каждом запросе
+
+    Returns:
+        Запущенный сервер или None, если его не удалось запустить
+    """
+    app = web.Application()
+    app["collect_queue"] = collect_queue
+    app.router.add_get("/metrics", metrics_handler)
+    app.router.add_get("/health/live", live_handler)
+    app.router.add_get("/health/ready", ready_handler)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, METRICS_HOST, port).start()
+    except OSError as e:
+        logger.error(f"Не удалось запустить сервер метрик на порту {port}: {e}")
+        await runner.cleanup()
+        return None
+
+    logger.info(f"Метрики доступны по адресу http://{METRICS_HOST}:{port}/metrics")
+    return runner
@@ -0,0 +1,230 @@
+""" Постраничный вывод списков в одном сообщении с кнопками перелистывания """
+
+import logging
+from dataclasses import dataclass
+from html import escape
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from aiogram import Dispatcher, types
+from aiogram.dispatcher.storage import BaseStorage
+from aiogram.utils.exceptions import MessageNotModified
+
+from config.config import PAGINATION_PAGE_SIZE, PAGINATION_MAX_VIEWS
+from bot.keyboards.keyboards import get_pagination_keyboard, PAGE_CALLBACK_PREFIX, PAGE_CURRENT_CALLBACK
+
+logger = logging.getLogger(__name__)
+
+# Ограничение Telegram на длину текста сообщения
+MESSAGE_LIMIT = 4096
+# Ключ bucket хранилища состояний, под которым лежат страницы открытых списков
+BUCKET_KEY = "pagination"
+
+
+@dataclass(frozen=True, slots=True)
+class PageItem:
+    """Элемент списка: текст и инлайн-кнопки (подпись, callback_data), относящиеся к нему"""
+    text: str
+    buttons: Tuple[Tuple[str, str], ...] = ()
+
+
+def _split(items: Sequence[PageItem], header: str, footer: str, page_size: int) -> List[List[PageItem]]:
+    limit = MESSAGE_LIMIT - len(header) - len(footer)
+    chunks: List[List[PageItem]] = []
+    length = 0
+    for item in items:
+        if not chunks or len(chunks[-1]) >= page_size or length + len(item.text) > limit:
+            chunks.append([])
+            length = 0
+        chunks[-1].append(item)
+        length += len(item.text)
+    return chunks
+
+
+def build_pages(
+        items: Sequence[PageItem],
+        header: str = "",
+        footer: str = "",
+        page_size: int = PAGINATION_PAGE_SIZE
+) -> List[Dict]:
+    """
+    Разбиение списка на страницы
+
+    На странице не больше page_size элементов, а текст страницы вместе с
+    заголовком и подвалом не длиннее ограничения Telegram.
+
+    Args:
+        items: Элементы списка
+        header: Текст в начале каждой страницы
+        footer: Текст в конце каждой страницы
+        page_size: Максимальное количество элементов на странице
+
+    Returns:
+        Страницы: словари с текстом, рядами кнопок и количеством элементов
+    """
+    return [
+        {
+            "text": header + "".join(item.text for item in chunk) + footer,
+            "buttons": [[list(button) for button in item.buttons] for item in chunk if item.buttons],
+            "size": len(chunk)
+        }
+        for chunk in _split(items, header, footer, page_size)
+    ]
+
+
+def _view_pages(view: Dict) -> List[Dict]:
+    items = [PageItem(text, tuple(tuple(button) for button in buttons)) for text, buttons in view["items"]]
+    return build_pages(items, view["header"], view["footer"], view["page_size"])
+
+
+def _page_markup(pages: List[Dict], page: int) -> Optional[types.InlineKeyboardMarkup]:
+    return get_pagination_keyboard(page, len(pages), pages[page]["buttons"])
+
+
+async def send_paginated(
+        message: types.Message,
+        storage: BaseStorage,
+        items: Sequence[PageItem],
+        header: str = "",
+        footer: str = "",
+        page_size: int = PAGINATION_PAGE_SIZE,
+        parse_mode: str = "HTML"
+) -> types.Message:
+    """
+    Отправка первой страницы списка
+
+    Элементы списка сохраняются в bucket хранилища состояний пользователя
+    под ID отправленного сообщения, поэтому при перелистывании сообщение
+    редактируется без повторных запросов к API, а ответ на кнопку элемента
+    меняет только этот элемент (update_item). Сохраняются списки из
+    нескольких страниц или с кнопками, последние PAGINATION_MAX_VIEWS.
+
+    Args:
+        message: Сообщение пользователя, в ответ на которое отправляется список
+        storage: Хранилище состояний диалогов
+        items: Элементы списка
+        header: Текст в начале каждой страницы
+        footer: Текст в конце каждой страницы
+        page_size: Максимальное количество элементов на странице
+        parse_mode: Режим разметки текста
+
+    Returns:
+        Отправленное сообщение
+    """
+    pages = build_pages(items, header, footer, page_size)
+    sent = await message.answer(pages[0]["text"], parse_mode=parse_mode, reply_markup=_page_markup(pages, 0))
+
+    if len(pages) > 1 or any(item.buttons for item in items):
+        view = {
+            "items": [[item.text, [list(button) for button in item.buttons]] for item in items],
+            "header": header,
+            "footer": footer,
+            "page_size": page_size,
+            "parse_mode": parse_mode
+        }
+        bucket = await storage.get_bucket(chat=message.chat.id, user=message.from_user.id)
+        views = bucket.get(BUCKET_KEY, {})
+        views[str(sent.message_id)] = view
+        # Словарь сохраняет порядок добавления, поэтому первыми удаляются самые старые списки
+        for key in list(views)[:-PAGINATION_MAX_VIEWS]:
+            del views[key]
+        bucket[BUCKET_KEY] = views
+        await storage.set_bucket(chat=message.chat.id, user=message.from_user.id, bucket=bucket)
+    return sent
+
+
+async def turn_page(callback_query: types.CallbackQuery, storage: BaseStorage):
+    """
+    Показ другой страницы списка редактированием сообщения
+
+    Args:
+        callback_query: Запрос от кнопки перелистывания
+        storage: Хранилище состояний диалогов
+    """
+    if callback_query.data == PAGE_CURRENT_CALLBACK:
+        await callback_query.answer()
+        return
+
+    message = callback_query.message
+    bucket = await storage.get_bucket(chat=message.chat.id, user=callback_query.from_user.id)
+    view = bucket.get(BUCKET_KEY, {}).get(str(message.message_id))
+    page = int(callback_query.data[len(PAGE_CALLBACK_PREFIX):])
+    pages = _view_pages(view) if view is not None else []
+
+    if not 0 <= page < len(pages):
+        await callback_query.answer("Список устарел, откройте его заново")
+        await message.edit_reply_markup(reply_markup=None)
+        return
+
+    await callback_query.answer()
+    try:
+        await message.edit_text(pages[page]["text"], parse_mode=view["parse_mode"], reply_markup=_page_markup(pages, page))
+    except MessageNotModified:
+        pass
+
+
+async def update_item(callback_query: types.CallbackQuery, storage: BaseStorage, status: str) -> bool:
+    """
+    Замена кнопок элемента списка строкой с результатом нажатия
+
+    Элемент ищется по данным нажатой кнопки в сохраненном списке сообщения.
+    Кнопки элемента удаляются, в конец его текста добавляется status, а
+    страница с элементом показывается заново; остальные элементы и кнопки
+    перелистывания не меняются.
+
+    Args:
+        callback_query: Запрос от кнопки элемента
+        storage: Хранилище состояний диалогов
+        status: Результат нажатия (обычный текст)
+
+    Returns:
+        False, если сообщение не является сохраненным списком с такой кнопкой
+    """
+    message = callback_query.message
+    bucket = await storage.get_bucket(chat=message.chat.id, user=callback_query.from_user.id)
+    views = bucket.get(BUCKET_KEY, {})
+    view = views.get(str(message.message_id))
+    if view is None:
+        return False
+
+    items = view["items"]
+    index = next(
+        (i for i, (_, buttons) in enumerate(items) if any(data == callback_query.data for _, data in buttons)),
+        None
+    )
+    if index is None:
+        return False
+
+    if view["parse_mode"] == "HTML":
+        status = escape(status)
+    text = items[index][0]
+    body = text.rstrip()
+    # Статус добавляется перед завершающими переводами строк, чтобы не сдвигать следующий элемент
+    items[index] = [f"{body}\n{status}{text[len(body):]}", []]
+    bucket[BUCKET_KEY] = views
+    await storage.set_bucket(chat=message.chat.id, user=callback_query.from_user.id, bucket=bucket)
+
+    pages = _view_pages(view)
+    page = 0
+    first = pages[0]["size"]
+    while index >= first:
+        page += 1
+        first += pages[page]["size"]
+    try:
+        await message.edit_text(pages[page]["text"], parse_mode=view["parse_mode"], reply_markup=_page_markup(pages, page))
+    except MessageNotModified:
+        pass
+    return True
+
+
+def register_pagination_handlers(dp: Dispatcher):
+    """
+    Регистрация обработчика кнопок перелистывания
+
+    Args:
+        dp: Диспетчер Aiogram
+    """
+
+    # Перелистывание не меняет состояние диалога, поэтому доступно в любом состоянии
+    @dp.callback_query_handler(lambda c: c.data and c.data.startswith(PAGE_CALLBACK_PREFIX), state="*")
+    async def page_callback(callback_query: types.CallbackQuery):
+        await turn_page(callback_query, dp.storage)
@@ -0,0 +1,115 @@
+""" Профилирование обработки обновлений Telegram """
+
+import cProfile
+import logging
+import os
+import random
+import time
+from datetime import datetime
+from typing import Optional
+
+from aiogram import Bot, types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from config.config import SLOW_UPDATE_THRESHOLD, PROFILE_SAMPLE_RATE, PROFILE_DIR, PROFILE_KEEP
+from utils import phases
+from bot.middlewares import command_label
+
+logger = logging.getLogger(__name__)
+
+
+class TimedBot(Bot):
+    """
+    Бот, который учитывает время запросов к Telegram Bot API в фазе telegram
+    """
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        with phases.measure(phases.TELEGRAM):
+            return await super().request(method, data, files, **kwargs)
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """
+    Измерение времени обработки каждого обновления с разбивкой по фазам
+
+    Время запросов к базе данных, API основного приложения и Telegram
+    накапливается в контекстных счетчиках utils.phases. Если обработка заняла
+    больше threshold секунд, обновление записывается в лог с разбивкой.
+
+    Доля sample_rate обновлений профилируется cProfile; профили медленных
+    обновлений сохраняются в profile_dir. Одновременно работает только один
+    профилировщик, и он учитывает все, что выполняется в потоке цикла событий,
+    включая параллельно обрабатываемые обновления.
+    """
+
+    def __init__(
+            self,
+            threshold: float = SLOW_UPDATE_THRESHOLD,
+            sample_rate: float = PROFILE_SAMPLE_RATE,
+            profile_dir: str = PROFILE_DIR,
+            keep: int = PROFILE_KEEP
+    ):
+        super().__init__()
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.profile_dir = profile_dir
+        self.keep = keep
+        self._profiler: Optional[cProfile.Profile] = None
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        data["_phases"] = phases.start()
+        data["_profile_started_at"] = time.perf_counter()
+
+        if self.sample_rate and self._profiler is None and random.random() < self.sample_rate:
+            self._profiler = cProfile.Profile()
+            data["_profiler"] = self._profiler
+            self._profiler.enable()
+
+    async def on_post_process_update(self, update: types.Update, result, data: dict):
+        started_at = data.get("_profile_started_at")
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+
+        profiler = data.get("_profiler")
+        if profiler is not None:
+            profiler.disable()
+            self._profiler = None
+
+        if elapsed < self.threshold:
+            return
+
+        label = command_label(update)
+        spent = data["_phases"]
+        other = max(elapsed - sum(spent.values()), 0.0)
+        logger.warning(
+            f"Медленное обновление {update.update_id} ({label}): {elapsed * 1000:.0f} мс, "
+            f"база данных {spent[phases.DB] * 1000:.0f} мс, "
+            f"API {spent[phases.API] * 1000:.0f} мс, "
+            f"Telegram {spent[phases.TELEGRAM] * 1000:.0f} мс, "
+            f"прочее {other * 1000:.0f} мс"
+        )
+
+        if profiler is not None:
+            self._dump(profiler, update.update_id, elapsed)
+
+    def _dump(self, profiler: cProfile.Profile, update_id: int, elapsed: float):
+        """
+        Сохранение профиля медленного обновления и удаление самых старых профилей
+        """
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(self.profile_dir, f"update_{timestamp}_{update_id}_{elapsed * 1000:.0f}ms.prof")
+            profiler.dump_stats(path)
+            logger.warning(f"Профиль обновления {update_id} сохранен в {path}")
+
+            profiles = sorted(
+                (os.path.join(self.profile_dir, name) for name in os.listdir(self.profile_dir)
+                 if name.endswith(".prof")),
+                key=os.path.getmtime
+            )
+            for old in profiles[:max(len(profiles) - self.keep, 0)]:
+                os.remove(old)
+        except OSError as e:
+            logger.error(f"Не удалось сохранить профиль обновления {update_id}: {e}")
@@ -0,0 +1,182 @@
+""" Передача подтверждений доставки уведомлений основному приложению """
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from config.config import RECEIPT_BATCH_SIZE, RECEIPT_FLUSH_INTERVAL, RECEIPT_MAX_AGE
+from api.client import ApiClient
+from database.records import Shard
+from database.repositories.receipt_repository import ReceiptRepository
+
+logger = logging.getLogger(__name__)
+
+# Как часто удалять подтверждения старше RECEIPT_MAX_AGE (в секундах)
+EXPIRE_INTERVAL = 3600
+# Статусы ответа на пакетный запрос, при которых API не поддерживает пакетное подтверждение
+BATCH_UNSUPPORTED_STATUSES = (404, 405)
+
+
+def _failed(result) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+def _rejected(result) -> bool:
+    """
+    Ошибка 4xx: API отклонило подтверждения, повторная передача не поможет
+
+    Временные ошибки (сеть, 5xx, 408, 429) клиент API возвращает без статуса.
+    """
+    return _failed(result) and 400 <= result.get("status", 0) < 500
+
+
+class ReceiptOutbox:
+    """
+    Пакетная отправка подтверждений доставки из таблицы delivery_receipts
+
+    Подтверждения записываются в базу вместе с отметкой об отправке
+    уведомления и передаются основному приложению пачками: когда после
+    последней передачи их накопилось batch_size или прошло flush_interval
+    секунд. Переданные подтверждения удаляются; если API временно
+    недоступно, они остаются в базе и передаются позже, в том числе после
+    перезапуска, но не дольше RECEIPT_MAX_AGE секунд. Подтверждения,
+    отклоненные API с ошибкой 4xx, записываются в лог и удаляются. Если API
+    не поддерживает пакетную передачу, подтверждения передаются по одному.
+    Доставка подтверждений - «хотя бы один раз»: при сбое между передачей и
+    удалением пачка будет передана повторно.
+
+    Args:
+        api_client: Клиент API основного приложения
+        shard: Передавать подтверждения только пользователей этой части очереди
+        batch_size: Количество подтверждений в одном запросе
+        flush_interval: Максимальная пауза между передачами (в секундах)
+    """
+
+    def __init__(
+            self,
+            api_client: ApiClient,
+            shard: Optional[Shard] = None,
+            batch_size: int = RECEIPT_BATCH_SIZE,
+            flush_interval: float = RECEIPT_FLUSH_INTERVAL
+    ):
+        self.api_client = api_client
+        self.shard = shard
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._added = 0
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._batch_supported = True
+        self._expired_at: Optional[float] = None
+
+    def notify(self, count: int = 1):
+        """
+        Сообщение о новых подтверждениях в базе; при накоплении пачки она передается сразу
+        """
+        self._added += count
+        if self._added >= self.batch_size:
+            self._batch_ready.set()
+
+    def start(self):
+        """
+        Запуск фоновой задачи передачи подтверждений
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Остановка фоновой задачи с передачей накопленных подтверждений
+        """
+        if self._task is not None:
+            # Задача не отменяется: если событие пачки уже установлено, wait_for
+            # в Python 3.11 может поглотить отмену, и задача не завершится
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping:
+                return
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Ошибка при передаче подтверждений доставки: {e}")
+
+    async def flush(self) -> int:
+        """
+        Передача всех накопленных подтверждений пачками по batch_size
+
+        Returns:
+            Количество переданных подтверждений
+        """
+        self._added = 0
+        self._batch_ready.clear()
+
+        if self._expired_at is None or time.monotonic() - self._expired_at >= EXPIRE_INTERVAL:
+            self._expired_at = time.monotonic()
+            expired = await asyncio.to_thread(ReceiptRepository.delete_expired, RECEIPT_MAX_AGE)
+            if expired:
+                logger.warning(f"Удалено {expired} подтверждений доставки, не переданных за {RECEIPT_MAX_AGE} с")
+
+        sent = 0
+        while True:
+            receipt_ids, receipts = await asyncio.to_thread(
+                ReceiptRepository.get_batch, self.batch_size, self.shard
+            )
+            if not receipts:
+                break
+
+            done = await self._send(receipts)
+            if done:
+                await asyncio.to_thread(ReceiptRepository.delete, receipt_ids[:done])
+                sent += done
+            if done < len(receipts) or len(receipts) < self.batch_size:
+                break
+
+        if sent:
+            logger.info(f"Передано {sent} подтверждений доставки")
+        return sent
+
+    async def _send(self, receipts: List[Dict[str, Any]]) -> int:
+        """
+        Передача пачки подтверждений
+
+        Returns:
+            Количество первых подтверждений пачки, которые можно удалить:
+            принятых или окончательно отклоненных API
+        """
+        if self._batch_supported:
+            result = await self.api_client.confirm_notification_deliveries(receipts)
+            if not (_failed(result) and result.get("status") in BATCH_UNSUPPORTED_STATUSES):
+                return self._handle_result(result, len(receipts))
+            logger.warning("API не поддерживает пакетное подтверждение доставки, подтверждения передаются по одному")
+            self._batch_supported = False
+
+        for done, receipt in enumerate(receipts):
+            result = await self.api_client.confirm_notification_delivery(
+                receipt["notification_id"], receipt["delivered"], receipt["delivered_at"]
+            )
+            if not self._handle_result(result, 1):
+                return done
+        return len(receipts)
+
+    @staticmethod
+    def _handle_result(result, count: int) -> int:
+        if not _failed(result):
+            return count
+        if _rejected(result):
+            logger.error(f"API отклонило {count} подтверждений доставки, они удалены: {result['error']}")
+            return count
+        logger.warning(f"Не удалось передать {count} подтверждений доставки: {result['error']}")
+        return 0
@@ -0,0 +1,150 @@
+""" Маршрутизация текстовых сообщений: кнопки меню, команды и команды с ID """
+
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import Dispatcher, types
+
+Handler = Callable[[types.Message], Awaitable]
+ArgumentCheck = Callable[[str], bool]
+
+# Ключ данных диспетчера, под которым хранится маршрутизатор
+ROUTER_KEY = "text_router"
+
+
+class _TrieNode:
+    __slots__ = ("children", "route")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.route: Optional[Tuple[Handler, Optional[ArgumentCheck]]] = None
+
+
+class TextRouter:
+    """
+    Выбор обработчика текстового сообщения по словарю и префиксному дереву
+
+    Обработчики, зарегистрированные в Aiogram фильтрами-лямбдами, проверяются
+    по очереди для каждого сообщения, поэтому время выбора растет с числом
+    обработчиков. Маршрутизатор регистрируется в диспетчере одним
+    обработчиком: текст кнопки ищется в словаре, команда (/help) - в словаре
+    команд, а команда с параметром (/team_15) - в префиксном дереве за число
+    шагов, равное длине префикса. Время выбора не зависит от числа маршрутов.
+
+    Маршруты, как и обработчики без явного состояния, действуют только вне
+    диалогов с состоянием.
+    """
+
+    def __init__(self):
+        self._texts: Dict[str, Handler] = {}
+        self._commands: Dict[str, Handler] = {}
+        self._prefixes = _TrieNode()
+
+    def text(self, *texts: str):
+        """
+        Декоратор обработчика сообщений с точным текстом (кнопки меню)
+        """
+        def decorator(handler: Handler) -> Handler:
+            for text in texts:
+                self._texts[text] = handler
+            return handler
+        return decorator
+
+    def command(self, *commands: str):
+        """
+        Декоратор обработчика команд без учета регистра, упоминания бота и аргументов
+
+        Args:
+            commands: Команды без косой черты (start, help)
+        """
+        def decorator(handler: Handler) -> Handler:
+            for command in commands:
+                self._commands["/" + command.lower()] = handler
+            return handler
+        return decorator
+
+    def prefix(self, *prefixes: str, argument: Optional[ArgumentCheck] = None):
+        """
+        Декоратор обработчика команд, начинающихся с префикса (/team_15)
+
+        При нескольких подходящих префиксах выбирается самый длинный.
+
+        Args:
+            prefixes: Префиксы команды вместе с косой чертой
+            argument: Проверка части команды после префикса (опционально)
+        """
+        def decorator(handler: Handler) -> Handler:
+            for prefix in prefixes:
+                node = self._prefixes
+                for char in prefix:
+                    node = node.children.setdefault(char, _TrieNode())
+                node.route = (handler, argument)
+            return handler
+        return decorator
+
+    def resolve(self, text: Optional[str]) -> Optional[Handler]:
+        """
+        Выбор обработчика для текста сообщения
+
+        Args:
+            text: Текст сообщения
+
+        Returns:
+            Обработчик или None, если текст не подходит ни к одному маршруту
+        """
+        if not text:
+            return None
+        if text[0] != "/":
+            return self._texts.get(text)
+
+        word = text.split(maxsplit=1)[0]
+        handler = self._commands.get(word.split("@", 1)[0].lower())
+        if handler is not None:
+            return handler
+
+        node = self._prefixes
+        matches: List[Tuple[int, Tuple[Handler, Optional[ArgumentCheck]]]] = []
+        for position, char in enumerate(word):
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.route is not None:
+                matches.append((position + 1, node.route))
+
+        for length, (handler, argument) in reversed(matches):
+            if argument is None or argument(word[length:]):
+                return handler
+        return None
+
+    def filter(self, message: types.Message):
+        """
+        Фильтр Aiogram: передает найденный обработчик в данных обновления
+        """
+        handler = self.resolve(message.text)
+        if handler is None:
+            return False
+        return {"text_route": handler}
+
+    @staticmethod
+    async def dispatch(message: types.Message, text_route: Handler):
+        return await text_route(message)
+
+
+def get_text_router(dp: Dispatcher) -> TextRouter:
+    """
+    Маршрутизатор текстовых сообщений диспетчера
+
+    При первом обращении маршрутизатор создается и регистрируется в
+    диспетчере одним обработчиком сообщений.
+
+    Args:
+        dp: Диспетчер Aiogram
+
+    Returns:
+        Маршрутизатор
+    """
+    router = dp.get(ROUTER_KEY)
+    if router is None:
+        router = TextRouter()
+        dp[ROUTER_KEY] = router
+        dp.register_message_handler(router.dispatch, router.filter)
+    return router
@@ -0,0 +1,204 @@
+""" Хранилища состояний диалогов (FSM) """
+
+import asyncio
+import copy
+import logging
+import typing
+
+from aiogram.dispatcher.storage import BaseStorage
+
+from config.config import (
+    FSM_STORAGE,
+    FSM_STATE_TTL,
+    FSM_PURGE_INTERVAL,
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_DB,
+    REDIS_PASSWORD
+)
+from utils import json_codec
+from database.repositories.fsm_repository import FsmRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SQLStorage(BaseStorage):
+    """
+    Хранилище состояний диалогов в базе данных
+
+    Состояние доступно всем экземплярам бота, работающим с одной базой, и
+    переживает перезапуск. Каждое изменение продлевает время жизни состояния
+    на ttl секунд; истекшие состояния не читаются и периодически удаляются,
+    поэтому брошенные диалоги не накапливаются.
+    """
+
+    def __init__(self, ttl: int = FSM_STATE_TTL, purge_interval: int = FSM_PURGE_INTERVAL):
+        self._ttl = ttl
+        self._purge_interval = purge_interval
+        self._last_purge = None
+        self._purge_task = None
+
+    async def close(self):
+        if self._purge_task is not None:
+            await self._purge_task
+            self._purge_task = None
+
+    async def wait_closed(self):
+        pass
+
+    async def _load(self, chat, user):
+        chat, user = self.check_address(chat=chat, user=user)
+        return await asyncio.to_thread(FsmRepository.get, str(chat), str(user))
+
+    async def _save(self, chat, user, **values):
+        chat, user = self.check_address(chat=chat, user=user)
+        await asyncio.to_thread(FsmRepository.save, str(chat), str(user), values, self._ttl)
+        self._schedule_purge()
+
+    def _schedule_purge(self):
+        """
+        Запуск удаления истекших состояний не чаще раза в purge_interval секунд
+        """
+        now = asyncio.get_running_loop().time()
+        if self._last_purge is not None and now - self._last_purge < self._purge_interval:
+            return
+        self._last_purge = now
+        self._purge_task = asyncio.create_task(self._purge())
+
+    async def _purge(self):
+        count = await asyncio.to_thread(FsmRepository.delete_expired)
+        if count:
+            logger.info(f"Удалено {count} истекших состояний диалогов")
+
+    @staticmethod
+    def _decode(value: typing.Optional[str]) -> typing.Dict:
+        if not value:
+            return {}
+        try:
+            return json_codec.loads(value)
+        except json_codec.DECODE_ERRORS as e:
+            logger.error(f"Некорректные данные состояния диалога: {e}")
+            return {}
+
+    @staticmethod
+    def _encode(value: typing.Optional[typing.Dict]) -> typing.Optional[str]:
+        return json_codec.dumps(value) if value else None
+
+    async def get_state(self, *,
+                        chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        default: typing.Optional[str] = None) -> typing.Optional[str]:
+        entry = await self._load(chat, user)
+        if entry is None or entry.state is None:
+            return self.resolve_state(default)
+        return entry.state
+
+    async def get_data(self, *,
+                       chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       default: typing.Optional[typing.Dict] = None) -> typing.Dict:
+        entry = await self._load(chat, user)
+        if entry is None or entry.data is None:
+            return copy.deepcopy(default or {})
+        return self._decode(entry.data)
+
+    async def set_state(self, *,
+                        chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        state: typing.Optional[typing.AnyStr] = None):
+        await self._save(chat, user, state=self.resolve_state(state))
+
+    async def set_data(self, *,
+                       chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       data: typing.Dict = None):
+        await self._save(chat, user, data=self._encode(data))
+
+    async def update_data(self, *,
+                          chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          data: typing.Dict = None,
+                          **kwargs):
+        if data is None:
+            data = {}
+        current = await self.get_data(chat=chat, user=user)
+        current.update(data, **kwargs)
+        await self.set_data(chat=chat, user=user, data=current)
+
+    async def reset_state(self, *,
+                          chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          with_data: typing.Optional[bool] = True):
+        if with_data:
+            await self._save(chat, user, state=None, data=None)
+        else:
+            await self._save(chat, user, state=None)
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(self, *,
+                         chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         default: typing.Optional[dict] = None) -> typing.Dict:
+        entry = await self._load(chat, user)
+        if entry is None or entry.bucket is None:
+            return copy.deepcopy(default or {})
+        return self._decode(entry.bucket)
+
+    async def set_bucket(self, *,
+                         chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         bucket: typing.Dict = None):
+        await self._save(chat, user, bucket=self._encode(bucket))
+
+    async def update_bucket(self, *,
+                            chat: typing.Union[str, int, None] = None,
+                            user: typing.Union[str, int, None] = None,
+                            bucket: typing.Dict = None,
+                            **kwargs):
+        if bucket is None:
+            bucket = {}
+        current = await self.get_bucket(chat=chat, user=user)
+        current.update(bucket, **kwargs)
+        await self.set_bucket(chat=chat, user=user, bucket=current)
+
+
+def create_storage(kind: str = FSM_STORAGE) -> BaseStorage:
+    """
+    Создание хранилища состояний диалогов
+
+    Args:
+        kind: Тип хранилища: sql (база данных бота), redis или memory
+
+    Returns:
+        Хранилище состояний для Dispatcher
+
+    Raises:
+        ValueError: Если тип хранилища неизвестен или для него не установлен клиент
+    """
+    if kind == "sql":
+        return SQLStorage()
+    if kind == "redis":
+        # RedisStorage2 из aiogram 2.25 работает через пакет redis (redis.asyncio);
+        # подойдет любой сервер, совместимый с протоколом Redis
+        try:
+            import redis.asyncio  # noqa: F401
+        except ImportError:
+            raise ValueError("Для FSM_STORAGE=redis нужен пакет redis: pip install -r requirements.txt") from None
+        from aiogram.contrib.fsm_storage.redis import RedisStorage2
+
+        return RedisStorage2(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            db=REDIS_DB,
+            password=REDIS_PASSWORD,
+            state_ttl=FSM_STATE_TTL,
+            data_ttl=FSM_STATE_TTL,
+            bucket_ttl=FSM_STATE_TTL
+        )
+    if kind == "memory":
+        from aiogram.contrib.fsm_storage.memory import MemoryStorage
+
+        return MemoryStorage()
+    raise ValueError(f"Неизвестный тип хранилища состояний: {kind}")
@@ -0,0 +1,156 @@
+"""
+Запуск и перезапуск процессов рассылки уведомлений.
+
+Запуск:
+    python -m bot.supervisor [--workers 4]
+
+Очередь уведомлений делится между процессами по user_id: процесс с номером i
+рассылает уведомления пользователей с user_id % N == i. Каждый пользователь
+всегда обслуживается одним процессом, поэтому его уведомления отправляются
+в том порядке, в котором стоят в очереди. Лимит MAX_RPS делится между
+процессами поровну.
+
+Каждый процесс рассылает свою часть, только пока держит ее advisory-блокировку
+в базе, поэтому два супервизора с одинаковым DISPATCH_WORKERS не отправляют
+уведомления дважды. При DISPATCH_WORKERS = 0 уведомления рассылает процесс
+бота, и супервизор не запускается.
+"""
+
+import argparse
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, Optional
+
+from config.config import DISPATCH_WORKERS, MAX_RPS, METRICS_ENABLED, METRICS_PORT
+from utils.logger import setup_logger
+
+logger = setup_logger("supervisor")
+
+# Процесс, проработавший дольше, считается стабильным, и задержка перезапуска сбрасывается
+STABLE_UPTIME = 60
+RESTART_DELAY_MIN = 1
+RESTART_DELAY_MAX = 60
+STOP_TIMEOUT = 30
+
+
+class WorkerProcess:
+    """
+    Процесс рассылки одной части очереди и его история перезапусков
+    """
+
+    def __init__(self, index: int, count: int):
+        self.index = index
+        self.count = count
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.restart_at = 0.0
+        self.restart_delay = RESTART_DELAY_MIN
+
+    def start(self):
+        command = [
+            sys.executable, "-m", "bot.worker",
+            "--shard", str(self.index),
+            "--shards", str(self.count),
+            "--max-rps", str(MAX_RPS / self.count)
+        ]
+        if METRICS_ENABLED:
+            command += ["--metrics-port", str(METRICS_PORT + 1 + self.index)]
+        self.process = subprocess.Popen(command)
+        self.started_at = time.monotonic()
+        logger.info(f"Запущен процесс рассылки {self.index}/{self.count} (pid {self.process.pid})")
+
+    def check(self, now: float):
+        """
+        Перезапуск завершившегося процесса с растущей задержкой при частых сбоях
+        """
+        if self.process is None:
+            if now >= self.restart_at:
+                self.start()
+            return
+
+        returncode = self.process.poll()
+        if returncode is None:
+            return
+
+        if now - self.started_at >= STABLE_UPTIME:
+            self.restart_delay = RESTART_DELAY_MIN
+        logger.error(
+            f"Процесс рассылки {self.index}/{self.count} завершился с кодом {returncode}, "
+            f"перезапуск через {self.restart_delay} с"
+        )
+        self.process = None
+        self.restart_at = now + self.restart_delay
+        self.restart_delay = min(self.restart_delay * 2, RESTART_DELAY_MAX)
+
+    def terminate(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def wait(self, deadline: float):
+        if self.process is None:
+            return
+        try:
+            self.process.wait(timeout=max(deadline - time.monotonic(), 0))
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Процесс рассылки {self.index}/{self.count} не остановился, принудительное завершение")
+            self.process.kill()
+            self.process.wait()
+
+
+class Supervisor:
+    """
+    Запускает процессы рассылки и перезапускает их при завершении
+    """
+
+    def __init__(self, workers: int):
+        self.workers: Dict[int, WorkerProcess] = {
+            index: WorkerProcess(index, workers) for index in range(workers)
+        }
+        self.running = False
+
+    def stop(self, signum=None, frame=None):
+        self.running = False
+
+    def run(self):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        logger.info(f"Запуск {len(self.workers)} процессов рассылки уведомлений")
+        try:
+            while self.running:
+                now = time.monotonic()
+                for worker in self.workers.values():
+                    worker.check(now)
+                time.sleep(1)
+        finally:
+            logger.info("Остановка процессов рассылки")
+            for worker in self.workers.values():
+                worker.terminate()
+            deadline = time.monotonic() + STOP_TIMEOUT
+            for worker in self.workers.values():
+                worker.wait(deadline)
+            logger.info("Процессы рассылки остановлены")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запуск процессов рассылки уведомлений")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DISPATCH_WORKERS,
+        help="Количество процессов (по умолчанию DISPATCH_WORKERS)"
+    )
+    args = parser.parse_args()
+    if not DISPATCH_WORKERS:
+        parser.error("DISPATCH_WORKERS = 0: уведомления рассылает процесс бота, укажите DISPATCH_WORKERS больше 0")
+    if args.workers < 1:
+        parser.error("--workers должен быть больше 0")
+
+    Supervisor(args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
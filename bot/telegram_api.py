@@ -0,0 +1,20 @@
+""" Сервер Telegram Bot API, с которым работает бот """
+
+from aiogram.bot.api import TelegramAPIServer, TELEGRAM_PRODUCTION
+
+from config.config import TELEGRAM_API_URL
+
+
+def get_api_server(url: str = TELEGRAM_API_URL) -> TelegramAPIServer:
+    """
+    Сервер Telegram Bot API из конфигурации
+
+    Args:
+        url: Базовый адрес сервера (пустая строка - официальный сервер)
+
+    Returns:
+        Описание сервера для aiogram.Bot
+    """
+    if not url:
+        return TELEGRAM_PRODUCTION
+    return TelegramAPIServer.from_base(url)
@@ -0,0 +1,123 @@
+""" Прогрев соединений и кэшей при запуске бота """
+
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from aiogram import Bot
+from aiogram.utils.exceptions import TelegramAPIError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from config.config import (
+    WARMUP_DB_CONNECTIONS,
+    WARMUP_HTTP_CONNECTIONS,
+    WARMUP_USER_CACHE_SIZE,
+    WARMUP_TIMEOUT
+)
+from api.client import ApiClient
+from database.connection import get_engine
+from database.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+def open_db_connections(count: int) -> int:
+    """
+    Открытие соединений пула базы данных
+
+    Соединения берутся из пула одновременно, поэтому пул создает новые, а
+    после проверки запросом SELECT 1 они возвращаются в пул открытыми.
+
+    Args:
+        count: Количество соединений (не больше размера пула)
+
+    Returns:
+        Количество открытых соединений
+    """
+    engine = get_engine()
+    count = min(count, engine.pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        logger.warning(f"Не удалось открыть соединение с базой данных: {e}")
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def _step(name: str, timings: Dict[str, float], coroutine):
+    """
+    Выполнение шага прогрева с записью его времени и результата в лог
+    """
+    started_at = time.perf_counter()
+    try:
+        result = await coroutine
+        if isinstance(result, int):
+            logger.info(f"Прогрев {name}: {result} за {time.perf_counter() - started_at:.2f} с")
+        return result
+    except (TelegramAPIError, SQLAlchemyError, OSError) as e:
+        logger.warning(f"Ошибка при прогреве {name}: {e}")
+    finally:
+        timings[name] = round(time.perf_counter() - started_at, 3)
+
+
+async def warm_up(
+        bot: Optional[Bot] = None,
+        api_client: Optional[ApiClient] = None,
+        db_connections: int = WARMUP_DB_CONNECTIONS,
+        http_connections: int = WARMUP_HTTP_CONNECTIONS,
+        user_cache_size: int = WARMUP_USER_CACHE_SIZE,
+        timeout: float = WARMUP_TIMEOUT
+) -> Dict[str, float]:
+    """
+    Прогрев перед обработкой первых обновлений
+
+    Одновременно открываются соединения пула базы данных, соединения с API
+    основного приложения (вместе с разрешением имени в DNS) и соединение с
+    Telegram Bot API, а кэш пользователей заполняется активными
+    пользователями. Ошибки отдельных шагов записываются в лог и не мешают
+    запуску; шаги, не завершившиеся за timeout секунд, прерываются.
+
+    Args:
+        bot: Бот, для которого открывается соединение с Telegram (опционально)
+        api_client: Клиент API основного приложения (опционально)
+        db_connections: Количество соединений с базой данных
+        http_connections: Количество соединений с API
+        user_cache_size: Количество пользователей, загружаемых в кэш
+        timeout: Максимальное время прогрева в секундах
+
+    Returns:
+        Время каждого шага в секундах
+    """
+    timings: Dict[str, float] = {}
+    steps = []
+    if db_connections > 0:
+        steps.append(_step("database", timings, asyncio.to_thread(open_db_connections, db_connections)))
+    if api_client is not None and http_connections > 0:
+        steps.append(_step("api", timings, api_client.warm_up(http_connections)))
+    if bot is not None:
+        steps.append(_step("telegram", timings, bot.get_me()))
+    if user_cache_size > 0:
+        steps.append(_step(
+            "user_cache", timings, asyncio.to_thread(UserRepository.preload_active_users, user_cache_size)
+        ))
+
+    started_at = time.perf_counter()
+    tasks = [asyncio.ensure_future(step) for step in steps]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Прогрев не завершился за {timeout:.0f} с, бот запускается без прогрева оставшегося")
+    timings["total"] = round(time.perf_counter() - started_at, 3)
+
+    logger.info(f"Прогрев завершен за {timings['total']:.2f} с")
+    return timings
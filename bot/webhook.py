@@ -0,0 +1,57 @@
+""" Прием обновлений Telegram через webhook """
+
+import asyncio
+import hmac
+import logging
+
+from aiogram import types
+from aiogram.dispatcher.webhook import WebhookRequestHandler
+from aiohttp import web
+
+from config.config import WEBHOOK_SECRET, WEBHOOK_MAX_CONCURRENCY
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+# Ключ приложения aiohttp, которым можно задать секретный токен вместо WEBHOOK_SECRET
+WEBHOOK_SECRET_KEY = "webhook_secret"
+
+_semaphore = asyncio.Semaphore(WEBHOOK_MAX_CONCURRENCY)
+
+
+class SecureWebhookRequestHandler(WebhookRequestHandler):
+    """
+    Обработчик webhook с проверкой секретного токена
+
+    Telegram передает токен, указанный при установке webhook, в заголовке
+    X-Telegram-Bot-Api-Secret-Token; запросы без него отклоняются. Если
+    токен не задан, отклоняются все запросы. Одновременно
+    обрабатывается не больше WEBHOOK_MAX_CONCURRENCY обновлений, остальные
+    запросы ждут своей очереди.
+    """
+
+    def validate_secret(self):
+        """
+        Проверка секретного токена запроса
+
+        Raises:
+            web.HTTPUnauthorized: Если токен не совпадает
+        """
+        secret = self.request.app.get(WEBHOOK_SECRET_KEY, WEBHOOK_SECRET)
+        token = self.request.headers.get(SECRET_TOKEN_HEADER, "")
+        if not secret or not hmac.compare_digest(token.encode(), secret.encode()):
+            logger.warning(f"Отклонен запрос к webhook с неверным секретным токеном от {self.request.remote}")
+            raise web.HTTPUnauthorized()
+
+    async def parse_update(self, bot):
+        try:
+            data = json_codec.loads(await self.request.read())
+        except json_codec.DECODE_ERRORS:
+            raise web.HTTPBadRequest()
+        return types.Update(**data)
+
+    async def post(self):
+        self.validate_secret()
+        async with _semaphore:
+            return await super().post()
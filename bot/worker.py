@@ -0,0 +1,112 @@
+"""
+Процесс рассылки уведомлений для одной части очереди.
+
+Запуск (обычно процессы запускает bot.supervisor):
+    python -m bot.worker --shard 0 --shards 4
+"""
+
+import argparse
+import asyncio
+import signal
+from typing import Optional
+
+from aiogram import Bot
+
+from config.config import TELEGRAM_BOT_TOKEN, MAX_RPS, DISPATCH_POLL_INTERVAL, DELIVERY_RECEIPTS_ENABLED
+from utils.logger import setup_logger
+from database.records import Shard
+from database.leader import LeaderElection
+from bot.handlers.notification import process_pending_notifications
+from bot.monitoring import HEALTH, start_monitoring_server
+from bot.warmup import warm_up
+from bot.telegram_api import get_api_server
+from bot.receipts import ReceiptOutbox
+from api.client import get_api_client
+
+
+async def run_worker(shard: Shard, max_rps: float, metrics_port: Optional[int] = None):
+    """
+    Рассылка уведомлений пользователей своей части очереди до получения сигнала остановки
+
+    Часть очереди рассылает только процесс, который держит ее
+    advisory-блокировку в базе. Второй процесс той же части (другой
+    супервизор, реплика или перезапущенный процесс, пока жив старый) ждет,
+    пока блокировка освободится, и не отправляет уведомления повторно.
+
+    Args:
+        shard: Часть очереди, которую обслуживает процесс
+        max_rps: Максимальное количество сообщений в секунду для этого процесса
+        metrics_port: Порт сервера метрик процесса (опционально)
+    """
+    logger = setup_logger(f"worker_{shard.index}")
+    bot = Bot(token=TELEGRAM_BOT_TOKEN, server=get_api_server())
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    # Размер очереди публикует процесс бота, процесс рассылки отдает только свои метрики
+    monitoring_server = None
+    if metrics_port:
+        monitoring_server = await start_monitoring_server(metrics_port, collect_queue=False)
+
+    # Каждый процесс передает подтверждения доставки своей части очереди
+    outbox = ReceiptOutbox(get_api_client(), shard=shard) if DELIVERY_RECEIPTS_ENABLED else None
+
+    # Процессу рассылки нужны соединения с базой и Telegram, а API - только для подтверждений
+    HEALTH.set_ready(await warm_up(
+        bot=bot,
+        api_client=outbox.api_client if outbox is not None else None,
+        user_cache_size=0
+    ))
+    if outbox is not None:
+        outbox.start()
+
+    owner = LeaderElection(shard.lock_name)
+    owner.start()
+
+    logger.info(f"Процесс рассылки {shard} запущен, лимит {max_rps:.1f} сообщений/с")
+    try:
+        while not stop.is_set():
+            # Сигнал остановки или потеря блокировки прерывают проход после текущего
+            # сообщения: иначе разбор большой очереди не уложится в время ожидания
+            # супервизора, а после потери блокировки часть рассылает другой процесс
+            if owner.is_leader:
+                await process_pending_notifications(
+                    bot, shard=shard, max_rps=max_rps, outbox=outbox,
+                    stop=lambda: stop.is_set() or not owner.is_leader
+                )
+            try:
+                await asyncio.wait_for(stop.wait(), DISPATCH_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        await owner.stop()
+        if outbox is not None:
+            await outbox.stop()
+            await get_api_client().close()
+        session = await bot.get_session()
+        await session.close()
+        if monitoring_server is not None:
+            await monitoring_server.cleanup()
+        logger.info(f"Процесс рассылки {shard} остановлен")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Процесс рассылки уведомлений")
+    parser.add_argument("--shard", type=int, required=True, help="Номер части очереди")
+    parser.add_argument("--shards", type=int, required=True, help="Количество частей очереди")
+    parser.add_argument("--max-rps", type=float, default=None, help="Лимит сообщений в секунду")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Порт сервера метрик")
+    args = parser.parse_args()
+
+    if not 0 <= args.shard < args.shards:
+        parser.error("--shard должен быть в диапазоне от 0 до --shards - 1")
+
+    max_rps = args.max_rps or MAX_RPS / args.shards
+    asyncio.run(run_worker(Shard(args.shard, args.shards), max_rps, args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
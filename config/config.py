@@ -7,21 +7,170 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 if not TELEGRAM_BOT_TOKEN:
     raise ValueError("TELEGRAM_BOT_TOKEN не указан в переменных окружения")
 
+# Адрес сервера Telegram Bot API. Пустое значение - официальный сервер;
+# для нагрузочных тестов можно указать локальный эмулятор (benchmarks.fake_telegram)
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "sports_platform")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Полный адрес базы данных; если не задан, собирается из параметров DB_*
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+# Выполнять миграции схемы при запуске бота. По умолчанию миграции выполняются
+# отдельно (python -m database.migrations), а бот только проверяет версию схемы
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+# Способ получения обновлений Telegram: polling или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+# Публичный адрес бота, на который Telegram отправляет обновления (https://...)
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+# Секретный токен, который Telegram передает в каждом запросе к webhook; в режиме webhook обязателен
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+if BOT_MODE == "webhook" and not WEBHOOK_SECRET:
+    raise ValueError("WEBHOOK_SECRET не указан в переменных окружения (обязателен при BOT_MODE=webhook)")
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "50"))
+# Адрес и порт встроенного HTTP-сервера (порт отличается от API основного приложения, 8080)
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", "8081"))
+
+# Хранилище состояний диалогов (FSM): sql, redis или memory
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sql")
+# Время жизни незавершенного диалога (в секундах)
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", "86400"))
+# Как часто удалять из базы истекшие состояния (в секундах)
+FSM_PURGE_INTERVAL = int(os.getenv("FSM_PURGE_INTERVAL", "3600"))
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
 
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080/api")
 API_TOKEN = os.getenv("API_TOKEN")
 
 API_TIMEOUT = int(os.getenv("API_TIMEOUT", "2"))
+# Максимальное число одновременных соединений с API
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "100"))
+# Сколько секунд держать простаивающие соединения с API и кэшировать адрес из DNS
+API_KEEPALIVE_TIMEOUT = int(os.getenv("API_KEEPALIVE_TIMEOUT", "60"))
+API_DNS_CACHE_TTL = int(os.getenv("API_DNS_CACHE_TTL", "300"))
+
+
+def _parse_endpoint_timeouts(value):
+    """
+    Разбор строки вида "matches/upcoming=5,users/{id}/matches=3"
+    """
+    timeouts = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        route, seconds = item.split("=", 1)
+        timeouts[route.strip().strip("/")] = float(seconds)
+    return timeouts
+
+
+# Бюджеты времени (в секундах) на запрос к отдельным конечным точкам API,
+# включая все повторные попытки. Для остальных используется API_TIMEOUT.
+# Числовые идентификаторы в пути заменяются на {id}.
+API_ENDPOINT_TIMEOUTS = {
+    "matches/upcoming": 5.0,
+    "championships/recommended/{id}": 3.0,
+}
+API_ENDPOINT_TIMEOUTS.update(_parse_endpoint_timeouts(os.getenv("API_ENDPOINT_TIMEOUTS", "")))
+
+API_RETRY_ATTEMPTS = int(os.getenv("API_RETRY_ATTEMPTS", "3"))
+API_RETRY_BASE_DELAY = float(os.getenv("API_RETRY_BASE_DELAY", "0.1"))
+API_RETRY_MAX_DELAY = float(os.getenv("API_RETRY_MAX_DELAY", "1.0"))
+
+API_BREAKER_FAILURE_THRESHOLD = int(os.getenv("API_BREAKER_FAILURE_THRESHOLD", "5"))
+API_BREAKER_RESET_TIMEOUT = float(os.getenv("API_BREAKER_RESET_TIMEOUT", "30"))
+
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "1000"))
+API_CACHE_STALE_TTL = int(os.getenv("API_CACHE_STALE_TTL", "3600"))
+
+# Кэш пользователей по Telegram ID: время жизни записи (в секундах) и размер
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "300"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Библиотека для работы с JSON: auto, orjson, msgspec или json
+JSON_CODEC = os.getenv("JSON_CODEC", "auto")
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Записывать лог в формате JSON (по объекту на строку)
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+# Из однотипных записей об успешной отправке в лог попадает одна из LOG_SAMPLE_EVERY
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "100"))
+# Максимальное количество записей в очереди фонового потока логирования
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+MAX_RPS = int(os.getenv("MAX_RPS", "1000"))
+
+# Количество процессов рассылки уведомлений (bot.supervisor). При 0 уведомления
+# рассылает сам процесс бота
+DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", "0"))
+# Пауза между проходами по очереди уведомлений (в секундах)
+DISPATCH_POLL_INTERVAL = float(os.getenv("DISPATCH_POLL_INTERVAL", "10"))
+
+# Периодические задачи (напоминания, очистка) выполняет только ведущий экземпляр бота.
+# Ведущий продлевает аренду каждые LEADER_RENEW_INTERVAL секунд и теряет статус,
+# если не смог продлить ее за LEADER_LEASE_TIMEOUT секунд
+LEADER_RENEW_INTERVAL = float(os.getenv("LEADER_RENEW_INTERVAL", "2"))
+LEADER_LEASE_TIMEOUT = float(os.getenv("LEADER_LEASE_TIMEOUT", "6"))
+
+# Размер страницы при потоковом чтении очереди уведомлений
+NOTIFICATION_PAGE_SIZE = int(os.getenv("NOTIFICATION_PAGE_SIZE", "200"))
+
+# Подтверждения доставки уведомлений основному приложению: отправляются пачками
+# по RECEIPT_BATCH_SIZE или не реже раза в RECEIPT_FLUSH_INTERVAL секунд
+DELIVERY_RECEIPTS_ENABLED = os.getenv("DELIVERY_RECEIPTS_ENABLED", "true").lower() in ("1", "true", "yes")
+RECEIPT_BATCH_SIZE = int(os.getenv("RECEIPT_BATCH_SIZE", "100"))
+RECEIPT_FLUSH_INTERVAL = float(os.getenv("RECEIPT_FLUSH_INTERVAL", "5"))
+# Подтверждения, которые не удалось передать за RECEIPT_MAX_AGE секунд, удаляются
+RECEIPT_MAX_AGE = int(os.getenv("RECEIPT_MAX_AGE", "604800"))
+
+# Ограничение частоты запросов пользователя: в среднем THROTTLE_RATE сообщений и
+# нажатий кнопок в секунду, подряд - не больше THROTTLE_BURST (0 - без ограничения)
+THROTTLE_RATE = float(os.getenv("THROTTLE_RATE", "1"))
+THROTTLE_BURST = int(os.getenv("THROTTLE_BURST", "5"))
+
+# Списки матчей, команд, чемпионатов и приглашений: элементов на странице и
+# количество списков пользователя, страницы которых хранятся для перелистывания
+PAGINATION_PAGE_SIZE = int(os.getenv("PAGINATION_PAGE_SIZE", "5"))
+PAGINATION_MAX_VIEWS = int(os.getenv("PAGINATION_MAX_VIEWS", "5"))
+
+# Формировать текст уведомления при его создании, а не при отправке
+NOTIFICATION_PRERENDER = os.getenv("NOTIFICATION_PRERENDER", "true").lower() in ("1", "true", "yes")
+
+# HTTP-сервер с метриками в формате Prometheus (/metrics). Процессы рассылки
+# bot.supervisor используют следующие порты: METRICS_PORT + 1 + номер процесса
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+# Максимальное время запросов к базе данных при проверке /health/ready (в секундах)
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+
+# Прогрев при запуске: соединения с базой данных и API, которые открываются
+# заранее, и число пользователей, загружаемых в кэш
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+WARMUP_HTTP_CONNECTIONS = int(os.getenv("WARMUP_HTTP_CONNECTIONS", "5"))
+WARMUP_USER_CACHE_SIZE = int(os.getenv("WARMUP_USER_CACHE_SIZE", "5000"))
+# Максимальное время прогрева (в секундах); после него бот запускается без прогрева оставшегося
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
 
-MAX_RPS = int(os.getenv("MAX_RPS", "1000"))
\ No newline at end of file
+# Обновления, обработка которых заняла больше SLOW_UPDATE_THRESHOLD секунд,
+# записываются в лог с разбивкой времени по базе данных, API и Telegram
+SLOW_UPDATE_THRESHOLD = float(os.getenv("SLOW_UPDATE_THRESHOLD", "1.0"))
+# Доля обновлений, обработка которых профилируется cProfile (0 - профилирование выключено).
+# Профили медленных обновлений сохраняются в PROFILE_DIR, хранятся последние PROFILE_KEEP
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "20"))
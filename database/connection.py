@@ -1,26 +1,65 @@
 import logging
+import threading
+import time
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
 
 from config.config import DATABASE_URL
+from utils import phases
+from utils.metrics import DB_POOL_CHECKOUT_SECONDS
 
 Base = declarative_base()
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_size=20,
-    max_overflow=0,
-    pool_timeout=30,
-    pool_recycle=1800,
-    echo=False,
-)
 
-session_factory = sessionmaker(bind=engine)
+class TimedQueuePool(QueuePool):
+    """
+    Пул соединений, который измеряет время ожидания свободного соединения
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+session_factory = sessionmaker()
 
 Session = scoped_session(session_factory)
 
+
+def get_engine():
+    """
+    Движок базы данных с пулом соединений
+
+    Движок создается при первом обращении, поэтому импорт модулей бота не
+    загружает драйвер базы данных и не создает пул.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    DATABASE_URL,
+                    poolclass=TimedQueuePool,
+                    pool_size=20,
+                    max_overflow=0,
+                    pool_timeout=30,
+                    pool_recycle=1800,
+                    echo=False,
+                )
+                session_factory.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
 logger = logging.getLogger(__name__)
 
 @contextmanager
@@ -29,24 +68,15 @@ def get_db_session():
     Контекстный менеджер для работы с сессией базы данных.
     Автоматически закрывает сессию после использования.
     """
-    session = Session()
-    try:
-        yield session
-        session.commit()
-    except Exception as e:
-        session.rollback()
-        logger.error(f"Ошибка при работе с базой данных: {e}")
-        raise
-    finally:
-        session.close()
-
-def init_db():
-    """
-    Инициализирует базу данных и создает все необходимые таблицы.
-    """
-    try:
-        Base.metadata.create_all(engine)
-        logger.info("База данных успешно инициализирована")
-    except Exception as e:
-        logger.error(f"Ошибка при инициализации базы данных: {e}")
-        raise
\ No newline at end of file
+    with phases.measure(phases.DB):
+        get_engine()
+        session = Session()
+        try:
+            yield session
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Ошибка при работе с базой данных: {e}")
+            raise
+        finally:
+            session.close()
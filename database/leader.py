@@ -0,0 +1,170 @@
+""" Выбор ведущего экземпляра бота для периодических задач """
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+
+from config.config import DATABASE_URL, LEADER_RENEW_INTERVAL, LEADER_LEASE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+
+def lock_key(name: str) -> int:
+    """
+    Ключ advisory-блокировки PostgreSQL (знаковое 64-битное число) для имени задачи
+    """
+    digest = hashlib.sha256(name.encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+class LeaderElection:
+    """
+    Выбор ведущего экземпляра с помощью advisory-блокировки PostgreSQL
+
+    Каждый экземпляр раз в renew_interval секунд пытается взять блокировку
+    pg_try_advisory_lock на отдельном соединении. Экземпляр, который ее взял,
+    становится ведущим и на каждом шаге продлевает аренду, проверяя, что
+    соединение живо. Если продлить аренду не удалось в течение lease_timeout
+    секунд, экземпляр перестает считать себя ведущим. Блокировка принадлежит
+    сессии: когда ведущий процесс завершается или теряет соединение, PostgreSQL
+    снимает ее, и следующий экземпляр становится ведущим при ближайшей попытке.
+
+    Для других СУБД (например, SQLite при локальной разработке) экземпляр
+    всегда считается ведущим.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            renew_interval: float = LEADER_RENEW_INTERVAL,
+            lease_timeout: float = LEADER_LEASE_TIMEOUT
+    ):
+        self.name = name
+        self.key = lock_key(name)
+        self.renew_interval = renew_interval
+        self.lease_timeout = lease_timeout
+        self._engine = None
+        self._connection: Optional[Connection] = None
+        self._lease_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._enabled = DATABASE_URL.startswith("postgresql")
+
+    @property
+    def is_leader(self) -> bool:
+        """Экземпляр является ведущим и его аренда не истекла"""
+        if not self._enabled:
+            return True
+        return self._connection is not None and time.monotonic() < self._lease_until
+
+    def start(self):
+        """
+        Запуск фоновой задачи захвата и продления блокировки
+        """
+        if not self._enabled:
+            logger.info(f"Выбор ведущего для {self.name} отключен: база данных не PostgreSQL")
+            return
+        if self._task is None:
+            # Отдельное соединение вне общего пула; keepalive позволяет PostgreSQL
+            # быстро заметить пропавший узел и снять его блокировку
+            self._engine = create_engine(
+                DATABASE_URL,
+                poolclass=NullPool,
+                connect_args={
+                    "connect_timeout": max(int(self.lease_timeout), 1),
+                    "keepalives": 1,
+                    "keepalives_idle": 5,
+                    "keepalives_interval": 2,
+                    "keepalives_count": 2
+                }
+            )
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Остановка задачи и освобождение блокировки
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self._release)
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    async def _run(self):
+        while True:
+            was_leader = self.is_leader
+            try:
+                if self._connection is None:
+                    acquired = await asyncio.wait_for(
+                        asyncio.to_thread(self._try_acquire), self.lease_timeout
+                    )
+                else:
+                    acquired = await asyncio.wait_for(
+                        asyncio.to_thread(self._renew), self.lease_timeout
+                    )
+                if acquired:
+                    self._lease_until = time.monotonic() + self.lease_timeout
+            except asyncio.TimeoutError:
+                logger.warning(f"Превышено время ожидания базы данных при выборе ведущего для {self.name}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка при выборе ведущего для {self.name}: {e}")
+
+            if self._connection is not None and not self.is_leader:
+                await asyncio.to_thread(self._release)
+
+            if self.is_leader and not was_leader:
+                logger.info(f"Экземпляр стал ведущим для {self.name}")
+            elif was_leader and not self.is_leader:
+                logger.warning(f"Экземпляр больше не ведущий для {self.name}")
+
+            await asyncio.sleep(self.renew_interval)
+
+    def _try_acquire(self) -> bool:
+        connection = self._engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar()
+        except SQLAlchemyError:
+            connection.close()
+            raise
+        if acquired:
+            self._connection = connection
+            return True
+        connection.close()
+        return False
+
+    def _renew(self) -> bool:
+        try:
+            self._connection.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Соединение с блокировкой {self.name} потеряно: {e}")
+            self._release()
+            return False
+
+    def _release(self):
+        connection, self._connection = self._connection, None
+        self._lease_until = 0.0
+        if connection is None:
+            return
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+        except SQLAlchemyError:
+            pass
+        finally:
+            connection.close()
@@ -0,0 +1,149 @@
+""" Версионные миграции схемы базы данных """
+
+import importlib
+import logging
+import pkgutil
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select
+from sqlalchemy.engine import Connection
+
+from database.connection import get_engine
+from database.leader import lock_key
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_MODULE = re.compile(r"^v(\d{4})_\w+$")
+
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    """
+    Схема базы данных не соответствует версии, которую ожидает бот
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class Migration:
+    """Миграция схемы: модуль database/migrations/vNNNN_<название>.py"""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def load_migrations() -> List[Migration]:
+    """
+    Загрузка миграций пакета в порядке версий
+
+    Returns:
+        Список миграций
+
+    Raises:
+        SchemaVersionError: Если номера версий идут не подряд
+    """
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = MIGRATION_MODULE.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            description=(module.__doc__ or module_info.name).strip(),
+            upgrade=module.upgrade
+        ))
+    migrations.sort(key=lambda migration: migration.version)
+
+    for expected, migration in enumerate(migrations, start=1):
+        if migration.version != expected:
+            raise SchemaVersionError(f"Пропущена миграция {expected:04d}")
+    return migrations
+
+
+def latest_version() -> int:
+    """
+    Версия схемы, которую ожидает текущий код
+    """
+    migrations = load_migrations()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(connection: Connection) -> int:
+    """
+    Версия схемы базы данных (0, если миграции еще не выполнялись)
+    """
+    if not inspect(connection).has_table(schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def upgrade(target: Optional[int] = None) -> List[int]:
+    """
+    Выполнение миграций до версии target (по умолчанию - до последней)
+
+    Все миграции выполняются в одной транзакции. В PostgreSQL на время
+    транзакции берется advisory-блокировка, поэтому одновременный запуск
+    миграций с нескольких машин безопасен: второй запуск дождется первого и
+    не найдет невыполненных миграций.
+
+    Args:
+        target: Версия, до которой нужно обновить схему
+
+    Returns:
+        Версии выполненных миграций
+    """
+    migrations = load_migrations()
+    applied = []
+    with get_engine().begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(select(func.pg_advisory_xact_lock(lock_key("schema_migrations"))))
+        schema_version.create(connection, checkfirst=True)
+
+        current = current_version(connection)
+        for migration in migrations:
+            if migration.version <= current or (target is not None and migration.version > target):
+                continue
+            logger.info(f"Выполняется миграция {migration.version:04d}: {migration.description}")
+            migration.upgrade(connection)
+            connection.execute(schema_version.insert().values(
+                version=migration.version,
+                description=migration.description[:200]
+            ))
+            applied.append(migration.version)
+
+    if applied:
+        logger.info(f"Схема базы данных обновлена до версии {applied[-1]}")
+    return applied
+
+
+def check_schema() -> int:
+    """
+    Быстрая проверка версии схемы при запуске бота
+
+    Returns:
+        Версия схемы базы данных
+
+    Raises:
+        SchemaVersionError: Если в базе выполнены не все миграции
+    """
+    expected = latest_version()
+    with get_engine().connect() as connection:
+        current = current_version(connection)
+
+    if current < expected:
+        raise SchemaVersionError(
+            f"Схема базы данных версии {current}, требуется {expected}. "
+            f"Выполните миграции: python -m database.migrations"
+        )
+    if current > expected:
+        # Во время поэтапного обновления база может быть уже новее кода
+        logger.warning(f"Схема базы данных версии {current} новее ожидаемой {expected}")
+    return current
@@ -0,0 +1,44 @@
+"""
+Выполнение миграций схемы базы данных.
+
+Запуск:
+    python -m database.migrations            обновить схему до последней версии
+    python -m database.migrations --target 1 обновить схему до версии 1
+    python -m database.migrations --status   показать версию схемы
+"""
+
+import argparse
+import sys
+
+from utils.logger import setup_logger
+from database.connection import get_engine
+from database.migrations import current_version, load_migrations, upgrade
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции схемы базы данных")
+    parser.add_argument("--target", type=int, default=None, help="Версия, до которой обновить схему")
+    parser.add_argument("--status", action="store_true", help="Только показать версию схемы")
+    args = parser.parse_args()
+
+    logger = setup_logger("migrations")
+
+    try:
+        if args.status:
+            with get_engine().connect() as connection:
+                current = current_version(connection)
+            for migration in load_migrations():
+                mark = "выполнена" if migration.version <= current else "ожидает"
+                print(f"{migration.version:04d}  {mark:<10} {migration.description}")
+            return
+
+        applied = upgrade(args.target)
+        if not applied:
+            logger.info("Невыполненных миграций нет")
+    except Exception as e:
+        logger.error(f"Ошибка при выполнении миграций: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
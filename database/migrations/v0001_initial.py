@@ -0,0 +1,88 @@
+"""Начальная схема: пользователи, уведомления и состояния диалогов"""
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    func, inspect, text
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+from database.models import NotificationType
+
+# Схема на момент перехода на миграции. Модели дальше меняются только
+# следующими миграциями, поэтому таблицы здесь описаны отдельно от моделей.
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("phone_number", String(20), unique=True, nullable=False),
+    Column("telegram_id", String(20), unique=True, nullable=True),
+    Column("first_name", String(80), nullable=False),
+    Column("last_name", String(80), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("is_active", Boolean),
+)
+
+notifications = Table(
+    "notifications", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("type", Enum(NotificationType), nullable=False),
+    Column("title", String(200), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("is_sent", Boolean),
+    Column("sent_at", DateTime, nullable=True),
+    Column("created_at", DateTime),
+    Column("scheduled_for", DateTime, nullable=True),
+    Column("metadata_json", Text, nullable=True),
+    Column("rendered_text", Text, nullable=True),
+    Column("parse_mode", String(16), nullable=True),
+    Column("reply_markup_json", Text, nullable=True),
+    Column("template_version", Integer, nullable=True),
+)
+
+fsm_states = Table(
+    "fsm_states", metadata,
+    Column("chat", String(32), primary_key=True),
+    Column("user", String(32), primary_key=True),
+    Column("state", String(255), nullable=True),
+    Column("data", Text, nullable=True),
+    Column("bucket", Text, nullable=True),
+    Column("expires_at", DateTime, nullable=False, index=True),
+)
+
+Index(
+    "ix_notifications_pending_due",
+    func.coalesce(notifications.c.scheduled_for, notifications.c.created_at),
+    notifications.c.id,
+    postgresql_where=notifications.c.is_sent == False,
+    sqlite_where=notifications.c.is_sent == False
+)
+
+
+def upgrade(connection: Connection):
+    """
+    Создание таблиц или приведение к этой схеме базы, созданной прежними
+    версиями бота через create_all: недостающие столбцы (все они допускают
+    NULL) и индексы добавляются в существующие таблицы.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    metadata.create_all(connection, checkfirst=True)
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+        # Индексы по выражениям не отражаются инспектором, поэтому проверку
+        # существования выполняет сама база (CREATE INDEX IF NOT EXISTS)
+        for index in table.indexes:
+            connection.execute(CreateIndex(index, if_not_exists=True))
@@ -0,0 +1,28 @@
+"""Отметка пользователей, чаты с которыми недоступны"""
+
+from sqlalchemy import Boolean, Column, Index, Integer, MetaData, Table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+notifications = Table(
+    "notifications", MetaData(),
+    Column("user_id", Integer),
+    Column("is_sent", Boolean),
+)
+
+pending_user_index = Index(
+    "ix_notifications_pending_user",
+    notifications.c.user_id,
+    postgresql_where=notifications.c.is_sent == False,
+    sqlite_where=notifications.c.is_sent == False
+)
+
+
+def upgrade(connection: Connection):
+    """
+    Добавление в users времени и причины недоступности чата и индекса
+    неотправленных уведомлений по пользователю
+    """
+    connection.execute(text("ALTER TABLE users ADD COLUMN unreachable_since TIMESTAMP"))
+    connection.execute(text("ALTER TABLE users ADD COLUMN unreachable_reason VARCHAR(32)"))
+    connection.execute(CreateIndex(pending_user_index))
@@ -0,0 +1,20 @@
+"""Очередь подтверждений доставки уведомлений для основного приложения"""
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+delivery_receipts = Table(
+    "delivery_receipts", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("notification_id", Integer, nullable=False),
+    Column("user_id", Integer, nullable=False),
+    Column("delivered", Boolean, nullable=False),
+    Column("delivered_at", DateTime, nullable=False),
+)
+
+
+def upgrade(connection: Connection):
+    """
+    Создание таблицы delivery_receipts
+    """
+    delivery_receipts.create(connection)
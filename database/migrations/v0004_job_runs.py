@@ -0,0 +1,25 @@
+"""Даты последнего запуска ежедневных задач"""
+
+from datetime import date
+
+from sqlalchemy import Column, Date, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+job_runs = Table(
+    "job_runs", MetaData(),
+    Column("name", String(64), primary_key=True),
+    Column("last_run_on", Date, nullable=False),
+)
+
+# Ежедневные задачи бота (см. database/repositories/job_repository.py)
+JOBS = ("match_reminders", "notification_cleanup")
+
+
+def upgrade(connection: Connection):
+    """
+    Создание таблицы job_runs со строкой для каждой ежедневной задачи
+    """
+    job_runs.create(connection)
+    connection.execute(job_runs.insert(), [
+        {"name": name, "last_run_on": date(1970, 1, 1)} for name in JOBS
+    ])
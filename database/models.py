@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Boolean, Text, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -33,6 +33,10 @@ class User(Base):
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     is_active = Column(Boolean, default=True)
+    # Telegram отказал в доставке (бот заблокирован, чат не найден или аккаунт
+    # удален): уведомления пользователю не отправляются до его следующего /start
+    unreachable_since = Column(DateTime, nullable=True)
+    unreachable_reason = Column(String(32), nullable=True)
 
     notifications = relationship("Notification", back_populates="user")
 
@@ -54,8 +58,72 @@ class Notification(Base):
     created_at = Column(DateTime, default=func.now())
     scheduled_for = Column(DateTime, nullable=True)
     metadata_json = Column(Text, nullable=True)
+    rendered_text = Column(Text, nullable=True)
+    parse_mode = Column(String(16), nullable=True)
+    reply_markup_json = Column(Text, nullable=True)
+    template_version = Column(Integer, nullable=True)
 
     user = relationship("User", back_populates="notifications")
 
     def __repr__(self):
-        return f"<Notification {self.id}: {self.title}>"
\ No newline at end of file
+        return f"<Notification {self.id}: {self.title}>"
+
+
+class DeliveryReceipt(Base):
+    """Результат доставки уведомления, еще не переданный основному приложению"""
+    __tablename__ = "delivery_receipts"
+
+    id = Column(Integer, primary_key=True)
+    notification_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    delivered = Column(Boolean, nullable=False)
+    delivered_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<DeliveryReceipt {self.notification_id}: {self.delivered}>"
+
+
+class FsmState(Base):
+    """Состояние диалога пользователя с ботом (FSM)"""
+    __tablename__ = "fsm_states"
+
+    chat = Column(String(32), primary_key=True)
+    user = Column(String(32), primary_key=True)
+    state = Column(String(255), nullable=True)
+    data = Column(Text, nullable=True)
+    bucket = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<FsmState {self.chat}:{self.user} {self.state}>"
+
+
+class JobRun(Base):
+    """Дата последнего запуска ежедневной задачи"""
+    __tablename__ = "job_runs"
+
+    name = Column(String(64), primary_key=True)
+    last_run_on = Column(Date, nullable=False)
+
+    def __repr__(self):
+        return f"<JobRun {self.name}: {self.last_run_on}>"
+
+# Время, когда уведомление должно быть отправлено: запланированное или время создания
+notification_due_at = func.coalesce(Notification.scheduled_for, Notification.created_at)
+
+# Очередь читается страницами по ключу (due_at, id) только среди неотправленных
+Index(
+    "ix_notifications_pending_due",
+    notification_due_at,
+    Notification.id,
+    postgresql_where=Notification.is_sent == False,
+    sqlite_where=Notification.is_sent == False
+)
+
+# Неотправленные уведомления пользователя: очередь без уведомлений недоступных пользователей
+Index(
+    "ix_notifications_pending_user",
+    Notification.user_id,
+    postgresql_where=Notification.is_sent == False,
+    sqlite_where=Notification.is_sent == False
+)
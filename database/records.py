@@ -0,0 +1,56 @@
+""" Компактные записи, которые репозитории передают дальше без ORM-объектов """
+
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional
+
+from database.models import Notification, NotificationType, User
+
+
+@dataclass(slots=True)
+class PendingNotification:
+    """Неотправленное уведомление вместе с Telegram ID получателя"""
+    id: int
+    user_id: int
+    type: NotificationType
+    title: str
+    content: str
+    metadata_json: Optional[str]
+    rendered_text: Optional[str]
+    parse_mode: Optional[str]
+    reply_markup_json: Optional[str]
+    template_version: Optional[int]
+    created_at: Optional[datetime]
+    scheduled_for: Optional[datetime]
+    telegram_id: str
+
+
+@dataclass(slots=True)
+class FsmEntry:
+    """Состояние диалога, как оно хранится в базе"""
+    state: Optional[str]
+    data: Optional[str]
+    bucket: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class Shard:
+    """Часть очереди уведомлений: пользователи с user_id % count == index"""
+    index: int
+    count: int
+
+    def __str__(self):
+        return f"{self.index}/{self.count}"
+
+    @property
+    def lock_name(self) -> str:
+        """Имя advisory-блокировки процесса, который рассылает эту часть очереди"""
+        return f"dispatch_shard_{self.index}_of_{self.count}"
+
+
+# Столбцы запроса в порядке полей PendingNotification: строка результата
+# передается в конструктор как есть, без промежуточных словарей
+PENDING_NOTIFICATION_COLUMNS = tuple(
+    User.telegram_id if field.name == "telegram_id" else getattr(Notification, field.name)
+    for field in fields(PendingNotification)
+)
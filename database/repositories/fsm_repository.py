@@ -0,0 +1,112 @@
+import logging
+from typing import Optional, Dict, Any
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+
+from database.connection import get_db_session
+from database.models import FsmState
+from database.records import FsmEntry
+
+logger = logging.getLogger(__name__)
+
+
+class FsmRepository:
+    """
+    Репозиторий для работы с состояниями диалогов (FSM)
+    """
+
+    @staticmethod
+    def get(chat: str, user: str) -> Optional[FsmEntry]:
+        """
+        Получение состояния диалога
+
+        Args:
+            chat: ID чата
+            user: ID пользователя
+
+        Returns:
+            Состояние диалога или None, если его нет или время его жизни истекло
+        """
+        try:
+            with get_db_session() as session:
+                row = session.query(
+                    FsmState.state, FsmState.data, FsmState.bucket
+                ).filter(
+                    FsmState.chat == chat,
+                    FsmState.user == user,
+                    FsmState.expires_at > datetime.now()
+                ).first()
+                return FsmEntry(*row) if row else None
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при получении состояния диалога {chat}:{user}: {e}")
+            return None
+
+    @staticmethod
+    def save(chat: str, user: str, values: Dict[str, Any], ttl: int) -> bool:
+        """
+        Сохранение полей состояния диалога с продлением времени его жизни
+
+        Если после сохранения состояние, данные и bucket пусты, запись удаляется.
+        Поля истекшей записи при сохранении сбрасываются.
+
+        Args:
+            chat: ID чата
+            user: ID пользователя
+            values: Новые значения полей state, data и/или bucket
+            ttl: Время жизни состояния (в секундах)
+
+        Returns:
+            True, если сохранение успешно, иначе False
+        """
+        for attempt in range(2):
+            try:
+                with get_db_session() as session:
+                    now = datetime.now()
+                    record = session.query(FsmState).filter(
+                        FsmState.chat == chat,
+                        FsmState.user == user
+                    ).with_for_update().first()
+
+                    if record is None:
+                        record = FsmState(chat=chat, user=user)
+                        session.add(record)
+                    elif record.expires_at <= now:
+                        record.state = record.data = record.bucket = None
+
+                    for field, value in values.items():
+                        setattr(record, field, value)
+
+                    if record.state is None and record.data is None and record.bucket is None:
+                        if record in session.new:
+                            session.expunge(record)
+                        else:
+                            session.delete(record)
+                    else:
+                        record.expires_at = now + timedelta(seconds=ttl)
+                    return True
+            except IntegrityError:
+                # Запись одновременно создана другим экземпляром бота, обновляем ее
+                if attempt:
+                    logger.error(f"Не удалось сохранить состояние диалога {chat}:{user}")
+                    return False
+            except SQLAlchemyError as e:
+                logger.error(f"Ошибка при сохранении состояния диалога {chat}:{user}: {e}")
+                return False
+        return False
+
+    @staticmethod
+    def delete_expired() -> int:
+        """
+        Удаление состояний диалогов, время жизни которых истекло
+
+        Returns:
+            Количество удаленных состояний
+        """
+        try:
+            with get_db_session() as session:
+                return session.query(FsmState).filter(
+                    FsmState.expires_at <= datetime.now()
+                ).delete(synchronize_session=False)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при удалении истекших состояний диалогов: {e}")
+            return 0
@@ -0,0 +1,38 @@
+import logging
+from datetime import date
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from database.models import JobRun
+
+logger = logging.getLogger(__name__)
+
+MATCH_REMINDERS_JOB = "match_reminders"
+NOTIFICATION_CLEANUP_JOB = "notification_cleanup"
+
+
+def claim_daily_run(session: Session, name: str, day: date) -> bool:
+    """
+    Отметка запуска ежедневной задачи за день, если за этот день она еще не запускалась
+
+    Вызывается в транзакции, в которой задача записывает свои изменения:
+    если задача не завершилась, отметка откатывается вместе с ними. В
+    PostgreSQL строка задачи остается заблокированной до конца транзакции,
+    поэтому второй экземпляр, запустивший задачу в тот же день (например,
+    после смены ведущего), дождется первого и получит False.
+
+    Args:
+        session: Сессия текущей транзакции
+        name: Имя задачи (строка задачи создается миграцией)
+        day: День запуска
+
+    Returns:
+        True, если задачу нужно выполнить
+    """
+    claimed = session.execute(
+        update(JobRun).where(JobRun.name == name, JobRun.last_run_on < day).values(last_run_on=day)
+    ).rowcount
+    if not claimed and session.get(JobRun, name) is None:
+        logger.error(f"Задача {name} не найдена в таблице job_runs, выполните миграции")
+    return bool(claimed)
@@ -1,12 +1,17 @@
+import asyncio
 import logging
-import json
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+from datetime import date, datetime
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, insert, tuple_
 
+from config.config import NOTIFICATION_PRERENDER
+from utils import json_codec
 from database.connection import get_db_session
-from database.models import Notification, NotificationType, User
+from database.models import Notification, NotificationType, User, notification_due_at
+from database.records import PendingNotification, Shard, PENDING_NOTIFICATION_COLUMNS
+from database.repositories.receipt_repository import record_receipts
+from database.repositories.job_repository import MATCH_REMINDERS_JOB, NOTIFICATION_CLEANUP_JOB, claim_daily_run
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +28,8 @@ class NotificationRepository:
             title: str,
             content: str,
             metadata: Dict[str, Any] = None,
-            scheduled_for: datetime = None
+            scheduled_for: datetime = None,
+            prerender: bool = None
     ) -> Optional[Notification]:
         """
         Создание нового уведомления
@@ -35,13 +41,20 @@ class NotificationRepository:
             content: Содержание уведомления
             metadata: Дополнительные данные (опционально)
             scheduled_for: Время запланированной отправки (опционально)
+            prerender: Сформировать текст сообщения сразу (по умолчанию NOTIFICATION_PRERENDER)
 
         Returns:
             Объект созданного уведомления или None в случае ошибки
         """
         try:
             with get_db_session() as session:
-                metadata_json = json.dumps(metadata) if metadata else None
+                metadata_json = json_codec.dumps(metadata) if metadata else None
+
+                if prerender is None:
+                    prerender = NOTIFICATION_PRERENDER
+                rendered = NotificationRepository._render(
+                    notification_type, title, content, metadata
+                ) if prerender else {}
 
                 notification = Notification(
                     user_id=user_id,
@@ -49,7 +62,8 @@ class NotificationRepository:
                     title=title,
                     content=content,
                     metadata_json=metadata_json,
-                    scheduled_for=scheduled_for
+                    scheduled_for=scheduled_for,
+                    **rendered
                 )
 
                 session.add(notification)
@@ -61,94 +75,180 @@ class NotificationRepository:
             return None
 
     @staticmethod
-    def get_pending_notifications(limit: int = 100) -> List[Dict[str, Any]]:
+    def _render(
+            notification_type: NotificationType,
+            title: str,
+            content: str,
+            metadata: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Формирование готового текста уведомления для сохранения вместе с ним
+
+        Args:
+            notification_type: Тип уведомления
+            title: Заголовок уведомления
+            content: Содержание уведомления
+            metadata: Дополнительные данные
+
+        Returns:
+            Значения полей rendered_text, parse_mode, reply_markup_json и template_version
+        """
+        from bot.messages.renderer import render_notification
+        from bot.messages.templates import TEMPLATES_VERSION
+
+        message = render_notification(notification_type, title, content, metadata)
+        return {
+            'rendered_text': message.text,
+            'parse_mode': message.parse_mode,
+            'reply_markup_json': message.reply_markup_json,
+            'template_version': TEMPLATES_VERSION
+        }
+
+    @staticmethod
+    def get_pending_notifications(
+            limit: int = 100,
+            after: Optional[Tuple[datetime, int]] = None,
+            shard: Optional[Shard] = None
+    ) -> List[PendingNotification]:
         """
-        Получение списка неотправленных уведомлений с данными пользователей
+        Получение страницы неотправленных уведомлений с Telegram ID получателей
+
+        Уведомления упорядочены по ключу (due_at, id), где due_at — время
+        запланированной отправки или время создания. Следующая страница
+        начинается строго после ключа последней записи предыдущей, поэтому
+        выборка не зависит от смещения и использует индекс
+        ix_notifications_pending_due.
 
         Args:
             limit: Максимальное количество уведомлений
+            after: Ключ (due_at, id) последней записи предыдущей страницы
+            shard: Выбирать уведомления только пользователей этой части очереди
 
         Returns:
-            Список словарей с уведомлениями и данными пользователей
+            Список неотправленных уведомлений
         """
         try:
             with get_db_session() as session:
-                from datetime import datetime
-                from sqlalchemy import and_, or_
-
-                now = datetime.now()
-
-                results = session.query(Notification, User).join(
+                query = session.query(*PENDING_NOTIFICATION_COLUMNS).join(
                     User, Notification.user_id == User.id
                 ).filter(
-                    and_(
-                        Notification.is_sent == False,
-                        User.telegram_id.isnot(None),
-                        User.is_active == True,
-                        or_(
-                            Notification.scheduled_for.is_(None),
-                            Notification.scheduled_for <= now
-                        )
-                    )
-                ).order_by(Notification.created_at).limit(limit).all()
-
-                notifications = []
-                for notification, user in results:
-                    notifications.append({
-                        'notification': {
-                            'id': notification.id,
-                            'user_id': notification.user_id,
-                            'type': notification.type,
-                            'title': notification.title,
-                            'content': notification.content,
-                            'metadata_json': notification.metadata_json,
-                            'created_at': notification.created_at,
-                            'scheduled_for': notification.scheduled_for
-                        },
-                        'user': {
-                            'id': user.id,
-                            'telegram_id': user.telegram_id,
-                            'first_name': user.first_name,
-                            'last_name': user.last_name,
-                            'is_active': user.is_active
-                        }
-                    })
+                    Notification.is_sent == False,
+                    notification_due_at <= datetime.now(),
+                    User.telegram_id.isnot(None),
+                    User.is_active == True,
+                    User.unreachable_since.is_(None)
+                )
+                if after is not None:
+                    query = query.filter(tuple_(notification_due_at, Notification.id) > after)
+                if shard is not None:
+                    query = query.filter(Notification.user_id % shard.count == shard.index)
 
-                return notifications
+                rows = query.order_by(notification_due_at, Notification.id).limit(limit).all()
+
+                return [PendingNotification(*row) for row in rows]
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при получении неотправленных уведомлений: {e}")
             return []
 
     @staticmethod
-    def mark_as_sent(notification_id: int) -> bool:
+    async def stream_pending_notifications(
+            page_size: int = 100,
+            shard: Optional[Shard] = None
+    ) -> AsyncIterator[PendingNotification]:
+        """
+        Потоковое чтение очереди неотправленных уведомлений
+
+        Страницы по page_size записей читаются по ключу (due_at, id) в
+        отдельном потоке, чтобы не блокировать цикл событий. Соединение с
+        базой занято только на время чтения страницы, в памяти одновременно
+        находится не больше одной страницы. Поток заканчивается, когда
+        очередная страница оказывается неполной; уведомления, которые не
+        удалось отправить, в этом проходе повторно не выбираются.
+
+        Args:
+            page_size: Количество уведомлений в одной странице
+            shard: Читать только уведомления пользователей этой части очереди
+
+        Yields:
+            Неотправленные уведомления в порядке due_at, id
+        """
+        after = None
+        while True:
+            page = await asyncio.to_thread(
+                NotificationRepository.get_pending_notifications, page_size, after, shard
+            )
+            for notification in page:
+                yield notification
+
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            after = (last.scheduled_for or last.created_at, last.id)
+
+    @staticmethod
+    def get_queue_stats() -> Tuple[int, Optional[datetime]]:
+        """
+        Размер очереди неотправленных уведомлений, время отправки которых наступило
+
+        Returns:
+            Количество таких уведомлений и время, с которого ждет самое старое из них
+        """
+        try:
+            with get_db_session() as session:
+                # Уведомления недоступных пользователей не отправляются и в очередь не входят
+                count, oldest = session.query(
+                    func.count(Notification.id),
+                    func.min(notification_due_at)
+                ).join(
+                    User, Notification.user_id == User.id
+                ).filter(
+                    Notification.is_sent == False,
+                    notification_due_at <= datetime.now(),
+                    User.unreachable_since.is_(None)
+                ).one()
+                return count, oldest
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при получении размера очереди уведомлений: {e}")
+            return 0, None
+
+    @staticmethod
+    def mark_as_sent(notification_id: int, delivered: bool = True) -> bool:
         """
         Пометить уведомление как отправленное
 
+        В той же транзакции записывается подтверждение доставки для
+        основного приложения.
+
         Args:
             notification_id: ID уведомления
+            delivered: Доставлено ли уведомление получателю
 
         Returns:
             True, если обновление успешно, иначе False
         """
         try:
             with get_db_session() as session:
-                notification = session.query(Notification).filter(Notification.id == notification_id).first()
-                if notification:
-                    notification.is_sent = True
-                    notification.sent_at = datetime.now()
-                    return True
-                return False
+                now = datetime.now()
+                record_receipts(session, Notification.id == notification_id, delivered, now)
+                updated = session.query(Notification).filter(
+                    Notification.id == notification_id
+                ).update(
+                    {Notification.is_sent: True, Notification.sent_at: now},
+                    synchronize_session=False
+                )
+                return updated > 0
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при обновлении статуса уведомления {notification_id}: {e}")
             return False
 
     @staticmethod
-    def delete_old_sent_notifications(days: int = 30) -> int:
+    def delete_old_sent_notifications(days: int = 30, run_date: Optional[date] = None) -> int:
         """
         Удаление старых отправленных уведомлений
 
         Args:
             days: Количество дней, после которых уведомления считаются устаревшими
+            run_date: День ежедневной очистки: за один день очистка выполняется один раз (опционально)
 
         Returns:
             Количество удаленных уведомлений
@@ -157,40 +257,39 @@ class NotificationRepository:
             with get_db_session() as session:
                 from datetime import timedelta
 
-                cutoff_date = datetime.now() - timedelta(days=days)
+                if run_date is not None and not claim_daily_run(session, NOTIFICATION_CLEANUP_JOB, run_date):
+                    return 0
 
-                count = session.query(Notification).filter(
-                    and_(
-                        Notification.is_sent == True,
-                        Notification.sent_at <= cutoff_date
-                    )
-                ).count()
+                cutoff_date = datetime.now() - timedelta(days=days)
 
-                session.query(Notification).filter(
+                return session.query(Notification).filter(
                     and_(
                         Notification.is_sent == True,
                         Notification.sent_at <= cutoff_date
                     )
                 ).delete(synchronize_session=False)
-
-                return count
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при удалении старых уведомлений: {e}")
             return 0
 
     @staticmethod
-    def create_match_reminder_notifications() -> int:
+    def create_match_reminder_notifications(run_date: Optional[date] = None) -> int:
         """
         Создание напоминаний о матчах, которые будут через 24 часа
 
+        Args:
+            run_date: День запуска: если передан, напоминания за этот день
+                создаются один раз, даже если задачу запустят несколько
+                экземпляров (опционально)
+
         Returns:
             Количество созданных уведомлений
         """
         try:
             from api.client import ApiClient
+            from api.errors import ApiError
             import asyncio
             from datetime import datetime, timedelta
-            import json
 
             api_client = ApiClient()
 
@@ -203,45 +302,84 @@ class NotificationRepository:
                 tomorrow_start = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 0, 0, 0)
                 tomorrow_end = datetime(tomorrow.year, tomorrow.month, tomorrow.day, 23, 59, 59)
 
-                tomorrow_matches = []
-                for match in matches:
-                    if 'date_time' in match:
-                        match_date_time = datetime.fromisoformat(match['date_time'])
-                        if tomorrow_start <= match_date_time <= tomorrow_end:
-                            tomorrow_matches.append(match)
-
-                notifications_count = 0
+                tomorrow_matches = [
+                    match for match in matches
+                    if match.date_time and tomorrow_start <= match.date_time <= tomorrow_end
+                ]
+
+                # Пары (матч, команда, соперник) для обеих команд каждого матча
+                team_pairs = []
+                for match in tomorrow_matches:
+                    try:
+                        team1 = loop.run_until_complete(api_client.get_team_details(match.team1_id))
+                        team2 = loop.run_until_complete(api_client.get_team_details(match.team2_id))
+                    except ApiError as e:
+                        logger.error(f"Не удалось получить команды матча {match.id}: {e}")
+                        continue
+                    team_pairs.append((match, team1, team2))
+                    team_pairs.append((match, team2, team1))
+
+                member_ids = {
+                    member.user_id
+                    for _, team, _ in team_pairs
+                    for member in team.members
+                    if member.user_id is not None
+                }
+
+                rows = []
                 with get_db_session() as session:
-                    for match in tomorrow_matches:
-                        team1 = loop.run_until_complete(api_client.get_team_details(match['team1_id']))
-                        team2 = loop.run_until_complete(api_client.get_team_details(match['team2_id']))
-
-                        for team, opponent in [(team1, team2), (team2, team1)]:
-                            for member in team.get('members', []):
-                                user = session.query(User).filter(User.id == member['user_id']).first()
-                                if user and user.is_active and user.telegram_id:
-                                    metadata = {
-                                        'championship_name': match.get('tournament_name', ''),
-                                        'opponent_name': opponent.get('name', ''),
-                                        'match_date': match.get('date', '').split('T')[0] if 'date' in match else '',
-                                        'match_time': match.get('time', ''),
-                                        'venue': match.get('location_name', ''),
-                                        'address': match.get('location_address', '')
-                                    }
-
-                                    notification = Notification(
-                                        user_id=user.id,
-                                        type=NotificationType.MATCH_REMINDER,
-                                        title="Напоминание о матче",
-                                        content=f"Завтра у вашей команды матч в {match.get('time', '')}",
-                                        metadata_json=json.dumps(metadata)
-                                    )
-                                    session.add(notification)
-                                    notifications_count += 1
+                    # Отметка запуска записывается в той же транзакции, что и напоминания
+                    if run_date is not None and not claim_daily_run(session, MATCH_REMINDERS_JOB, run_date):
+                        logger.info(f"Напоминания о матчах за {run_date} уже созданы")
+                        return 0
+
+                    # Получатели выбираются одним запросом для всех участников
+                    recipients = {
+                        user_id for (user_id,) in session.query(User.id).filter(
+                            User.id.in_(member_ids),
+                            User.is_active == True,
+                            User.telegram_id.isnot(None),
+                            User.unreachable_since.is_(None)
+                        )
+                    } if member_ids else set()
+
+                    for match, team, opponent in team_pairs:
+                        metadata = {
+                            'championship_name': match.tournament_name,
+                            'opponent_name': opponent.name,
+                            'match_date': match.date,
+                            'match_time': match.time,
+                            'venue': match.location_name,
+                            'address': match.location_address
+                        }
 
+                        title = "Напоминание о матче"
+                        content = f"Завтра у вашей команды матч в {match.time}"
+                        rendered = NotificationRepository._render(
+                            NotificationType.MATCH_REMINDER, title, content, metadata
+                        ) if NOTIFICATION_PRERENDER else {}
+                        metadata_json = json_codec.dumps(metadata)
+
+                        for member in team.members:
+                            if member.user_id in recipients:
+                                rows.append({
+                                    'user_id': member.user_id,
+                                    'type': NotificationType.MATCH_REMINDER,
+                                    'title': title,
+                                    'content': content,
+                                    'metadata_json': metadata_json,
+                                    **rendered
+                                })
+
+                    if rows:
+                        session.execute(insert(Notification), rows)
+
+                notifications_count = len(rows)
                 logger.info(f"Создано {notifications_count} напоминаний о матчах")
                 return notifications_count
             finally:
+                # Сессия клиента привязана к циклу событий этой задачи
+                loop.run_until_complete(api_client.close())
                 loop.close()
         except Exception as e:
             logger.error(f"Ошибка при создании напоминаний о матчах: {e}")
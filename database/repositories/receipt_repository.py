@@ -0,0 +1,126 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from config.config import DELIVERY_RECEIPTS_ENABLED
+from database.connection import get_db_session
+from database.models import DeliveryReceipt, Notification
+from database.records import Shard
+
+logger = logging.getLogger(__name__)
+
+
+def record_receipts(session: Session, condition, delivered: bool, now: datetime):
+    """
+    Запись подтверждений для неотправленных уведомлений, подходящих под условие
+
+    Вызывается в транзакции, которая затем отмечает эти уведомления
+    отправленными, поэтому подтверждение не теряется и не дублируется.
+
+    Args:
+        session: Сессия текущей транзакции
+        condition: Условие отбора уведомлений
+        delivered: Доставлено ли уведомление
+        now: Время доставки
+    """
+    if not DELIVERY_RECEIPTS_ENABLED:
+        return
+    session.execute(insert(DeliveryReceipt).from_select(
+        ["notification_id", "user_id", "delivered", "delivered_at"],
+        select(
+            Notification.id, Notification.user_id, literal(delivered), literal(now)
+        ).where(Notification.is_sent == False, condition)
+    ))
+
+
+class ReceiptRepository:
+    """
+    Репозиторий для работы с очередью подтверждений доставки
+
+    Подтверждения записываются в той же транзакции, в которой уведомление
+    отмечается отправленным (см. NotificationRepository), и удаляются после
+    передачи основному приложению.
+    """
+
+    @staticmethod
+    def get_batch(limit: int, shard: Optional[Shard] = None) -> Tuple[List[int], List[Dict[str, Any]]]:
+        """
+        Получение самых старых подтверждений для передачи основному приложению
+
+        Args:
+            limit: Максимальное количество подтверждений
+            shard: Выбирать подтверждения только пользователей этой части очереди
+
+        Returns:
+            ID записей и подтверждения в формате API
+        """
+        try:
+            with get_db_session() as session:
+                query = session.query(
+                    DeliveryReceipt.id,
+                    DeliveryReceipt.notification_id,
+                    DeliveryReceipt.delivered,
+                    DeliveryReceipt.delivered_at
+                )
+                if shard is not None:
+                    query = query.filter(DeliveryReceipt.user_id % shard.count == shard.index)
+                rows = query.order_by(DeliveryReceipt.id).limit(limit).all()
+
+                return [row.id for row in rows], [
+                    {
+                        "notification_id": row.notification_id,
+                        "delivered": row.delivered,
+                        "delivered_at": row.delivered_at.isoformat()
+                    }
+                    for row in rows
+                ]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при получении подтверждений доставки: {e}")
+            return [], []
+
+    @staticmethod
+    def delete(receipt_ids: Sequence[int]) -> int:
+        """
+        Удаление переданных подтверждений
+
+        Args:
+            receipt_ids: ID записей
+
+        Returns:
+            Количество удаленных записей
+        """
+        if not receipt_ids:
+            return 0
+        try:
+            with get_db_session() as session:
+                return session.query(DeliveryReceipt).filter(
+                    DeliveryReceipt.id.in_(receipt_ids)
+                ).delete(synchronize_session=False)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при удалении подтверждений доставки: {e}")
+            return 0
+
+    @staticmethod
+    def delete_expired(max_age: float) -> int:
+        """
+        Удаление подтверждений, которые не удалось передать за max_age секунд
+
+        Args:
+            max_age: Максимальный возраст подтверждения в секундах
+
+        Returns:
+            Количество удаленных записей
+        """
+        try:
+            with get_db_session() as session:
+                cutoff = datetime.now() - timedelta(seconds=max_age)
+                return session.query(DeliveryReceipt).filter(
+                    DeliveryReceipt.delivered_at < cutoff
+                ).delete(synchronize_session=False)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при удалении устаревших подтверждений доставки: {e}")
+            return 0
@@ -1,13 +1,32 @@
 import logging
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 
+from config.config import USER_CACHE_TTL, USER_CACHE_MAX_ENTRIES
+from api.cache import ResponseCache
 from database.connection import get_db_session
 from database.models import User
 
 logger = logging.getLogger(__name__)
 
+# Пользователи по Telegram ID: этот поиск выполняется почти в каждом обработчике.
+# Записи обновляются при изменениях через этот процесс и устаревают через
+# USER_CACHE_TTL секунд, если пользователя изменил другой экземпляр бота.
+_users_by_telegram_id = ResponseCache(USER_CACHE_MAX_ENTRIES)
+
+
+def _user_dict(user: User) -> Dict[str, Any]:
+    return {
+        "id": user.id,
+        "phone_number": user.phone_number,
+        "telegram_id": user.telegram_id,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "is_active": user.is_active
+    }
+
 
 class UserRepository:
     """
@@ -81,18 +100,17 @@ class UserRepository:
         Returns:
             Словарь с данными пользователя или None, если пользователь не найден
         """
+        cached = _users_by_telegram_id.get(telegram_id, max_age=USER_CACHE_TTL)
+        if cached is not None:
+            return dict(cached)
+
         try:
             with get_db_session() as session:
                 user = session.query(User).filter(User.telegram_id == telegram_id).first()
                 if user:
-                    return {
-                        "id": user.id,
-                        "phone_number": user.phone_number,
-                        "telegram_id": user.telegram_id,
-                        "first_name": user.first_name,
-                        "last_name": user.last_name,
-                        "is_active": user.is_active
-                    }
+                    result = _user_dict(user)
+                    _users_by_telegram_id.set(telegram_id, result)
+                    return dict(result)
                 return None
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при получении пользователя по Telegram ID {telegram_id}: {e}")
@@ -112,6 +130,7 @@ class UserRepository:
         """
         try:
             with get_db_session() as session:
+                _users_by_telegram_id.delete(telegram_id)
                 existing_user = session.query(User).filter(User.telegram_id == telegram_id).first()
                 if existing_user:
                     existing_user.telegram_id = None
@@ -119,7 +138,12 @@ class UserRepository:
 
                 user = session.query(User).filter(User.phone_number == phone_number).first()
                 if user:
+                    if user.telegram_id:
+                        _users_by_telegram_id.delete(user.telegram_id)
                     user.telegram_id = telegram_id
+                    # Новый чат еще не отказывал в доставке
+                    user.unreachable_since = None
+                    user.unreachable_reason = None
                     return True
                 return False
         except SQLAlchemyError as e:
@@ -173,6 +197,7 @@ class UserRepository:
         try:
             with get_db_session() as session:
                 if telegram_id:
+                    _users_by_telegram_id.delete(telegram_id)
                     existing_user = session.query(User).filter(User.telegram_id == telegram_id).first()
                     if existing_user:
                         existing_user.telegram_id = None
@@ -197,4 +222,87 @@ class UserRepository:
                 }
         except SQLAlchemyError as e:
             logger.error(f"Ошибка при создании пользователя: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def preload_active_users(limit: int) -> int:
+        """
+        Заполнение кэша пользователей по Telegram ID при запуске бота
+
+        В кэш загружаются последние обновленные активные пользователи с
+        привязанным Telegram ID.
+
+        Args:
+            limit: Максимальное количество пользователей
+
+        Returns:
+            Количество загруженных пользователей
+        """
+        try:
+            with get_db_session() as session:
+                users = session.query(User).filter(
+                    User.is_active == True,
+                    User.telegram_id.isnot(None)
+                ).order_by(User.updated_at.desc(), User.id.desc()).limit(limit).all()
+
+                for user in users:
+                    _users_by_telegram_id.set(user.telegram_id, _user_dict(user))
+                return len(users)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при загрузке пользователей в кэш: {e}")
+            return 0
+
+    @staticmethod
+    def mark_unreachable(user_id: int, reason: str) -> bool:
+        """
+        Отметка пользователя, чат с которым недоступен
+
+        Неотправленные уведомления пользователя остаются в базе, но не
+        выбираются из очереди, пока отметка не снята, и отправляются после
+        возвращения пользователя.
+
+        Args:
+            user_id: ID пользователя
+            reason: Причина недоступности (blocked, chat_not_found, deactivated)
+
+        Returns:
+            True, если пользователь отмечен сейчас, False, если уже был отмечен или при ошибке
+        """
+        try:
+            with get_db_session() as session:
+                updated = session.query(User).filter(
+                    User.id == user_id,
+                    User.unreachable_since.is_(None)
+                ).update(
+                    {User.unreachable_since: datetime.now(), User.unreachable_reason: reason},
+                    synchronize_session=False
+                )
+                return updated > 0
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при отметке недоступного чата пользователя {user_id}: {e}")
+            return False
+
+    @staticmethod
+    def clear_unreachable(telegram_id: str) -> bool:
+        """
+        Снятие отметки о недоступности чата, когда пользователь снова пишет боту
+
+        Args:
+            telegram_id: Telegram ID пользователя
+
+        Returns:
+            True, если отметка была снята, иначе False
+        """
+        try:
+            with get_db_session() as session:
+                updated = session.query(User).filter(
+                    User.telegram_id == telegram_id,
+                    User.unreachable_since.isnot(None)
+                ).update(
+                    {User.unreachable_since: None, User.unreachable_reason: None},
+                    synchronize_session=False
+                )
+                return updated > 0
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка при снятии отметки недоступного чата пользователя {telegram_id}: {e}")
+            return False
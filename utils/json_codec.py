@@ -0,0 +1,141 @@
+""" Сериализация JSON с использованием самой быстрой доступной библиотеки """
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Tuple, Type, Union
+
+from config.config import JSON_CODEC
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class JsonBackend:
+    """Реализация кодирования и декодирования JSON"""
+    name: str
+    loads: Callable[[Union[str, bytes]], Any]
+    dumps: Callable[[Any], str]
+    dumps_bytes: Callable[[Any], bytes]
+    decode_errors: Tuple[Type[Exception], ...]
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default)
+
+
+def _load_stdlib() -> JsonBackend:
+    return JsonBackend(
+        name="json",
+        loads=json.loads,
+        dumps=_stdlib_dumps,
+        dumps_bytes=lambda obj: _stdlib_dumps(obj).encode("utf-8"),
+        decode_errors=(ValueError,)
+    )
+
+
+def _load_orjson() -> JsonBackend:
+    import orjson
+
+    # Как и json, допускаем нестроковые ключи словарей
+    option = orjson.OPT_NON_STR_KEYS
+
+    return JsonBackend(
+        name="orjson",
+        loads=orjson.loads,
+        dumps=lambda obj: orjson.dumps(obj, option=option).decode("utf-8"),
+        dumps_bytes=lambda obj: orjson.dumps(obj, option=option),
+        decode_errors=(ValueError,)
+    )
+
+
+def _load_msgspec() -> JsonBackend:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    return JsonBackend(
+        name="msgspec",
+        loads=decoder.decode,
+        dumps=lambda obj: encoder.encode(obj).decode("utf-8"),
+        dumps_bytes=encoder.encode,
+        decode_errors=(ValueError, msgspec.DecodeError)
+    )
+
+
+_LOADERS: Dict[str, Callable[[], JsonBackend]] = {
+    "orjson": _load_orjson,
+    "msgspec": _load_msgspec,
+    "json": _load_stdlib,
+}
+
+
+def get_backend(name: str) -> JsonBackend:
+    """
+    Получение реализации JSON по имени
+
+    Args:
+        name: Имя библиотеки (orjson, msgspec, json)
+
+    Returns:
+        Реализация JSON
+
+    Raises:
+        ImportError: Если библиотека не установлена
+    """
+    return _LOADERS[name]()
+
+
+def available_backends() -> Dict[str, JsonBackend]:
+    """
+    Получение всех установленных реализаций JSON
+
+    Returns:
+        Словарь реализаций по имени
+    """
+    backends = {}
+    for name in _LOADERS:
+        try:
+            backends[name] = get_backend(name)
+        except ImportError:
+            continue
+    return backends
+
+
+def _select_backend() -> JsonBackend:
+    if JSON_CODEC != "auto":
+        try:
+            return get_backend(JSON_CODEC)
+        except (ImportError, KeyError):
+            logger.warning(f"Библиотека JSON {JSON_CODEC} недоступна, используется автоматический выбор")
+
+    for name in ("orjson", "msgspec"):
+        try:
+            return get_backend(name)
+        except ImportError:
+            continue
+    return _load_stdlib()
+
+
+backend = _select_backend()
+
+# Кортеж исключений, которые выбрасывает loads при некорректном JSON, для использования в except
+DECODE_ERRORS = backend.decode_errors
+
+
+# Функции выбранной реализации привязываются напрямую, без обертки,
+# чтобы не добавлять лишний вызов на горячем пути:
+#   loads(data: str | bytes) -> Any, ошибки декодирования — DECODE_ERRORS
+#   dumps(obj) -> str, без экранирования не-ASCII символов
+#   dumps_bytes(obj) -> bytes в кодировке UTF-8
+loads = backend.loads
+dumps = backend.dumps
+dumps_bytes = backend.dumps_bytes
@@ -1,34 +1,157 @@
+import atexit
+import copy
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import os
 
-from config.config import LOG_LEVEL, LOG_FORMAT, LOG_DATE_FORMAT
+from config.config import LOG_LEVEL, LOG_FORMAT, LOG_DATE_FORMAT, LOG_JSON, LOG_SAMPLE_EVERY, LOG_QUEUE_SIZE
+from utils import json_codec
+from utils.metrics import LOG_RECORDS_DROPPED
+
+_listener = None
+_queue_handler = None
+# Форматирование трассировок исключений в потоке, который пишет запись
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирование записей лога в JSON, по одному объекту на строку
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, LOG_DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json_codec.dumps(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Прореживание однотипных записей лога
+
+    Записи, переданные с extra={"sample": "<ключ>"}, пропускаются по одной из
+    каждых every с одинаковым ключом; к пропущенной записи добавляется число
+    отброшенных с прошлого раза. Остальные записи не затрагиваются.
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(every, 1)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None or self.every == 1:
+            return True
+        with self._lock:
+            count = self._counters.get(key, 0)
+            self._counters[key] = count + 1
+        if count % self.every:
+            return False
+        if count:
+            record.msg = f"{record.msg} (и еще {self.every - 1} похожих записей)"
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Передача записей в очередь фонового потока без блокировки
+
+    Если очередь переполнена, запись отбрасывается, чтобы запись лога никогда
+    не задерживала цикл событий. Отброшенные записи считаются в метрике
+    log_records_dropped_total, а их общее число выводится при остановке.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Подготовка записи к передаче в фоновый поток
+
+        Стандартный QueueHandler.prepare форматирует запись целиком и
+        добавляет трассировку исключения к тексту сообщения, поэтому
+        JsonFormatter не видит исключения. Здесь подставляются только
+        аргументы сообщения, а трассировка сохраняется отдельно в exc_text.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        if _queue_handler.dropped:
+            # Очередь уже остановлена, поэтому запись передается обработчикам напрямую
+            record = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"Отброшено {_queue_handler.dropped} записей лога из-за переполнения очереди", None, None
+            )
+            for handler in _listener.handlers:
+                handler.handle(record)
+        _listener = None
+
 
 def setup_logger(name="sports_platform_notifier"):
     """
     Настройка логирования для приложения
 
+    При первом вызове в процессе корневой логгер получает обработчик, который
+    складывает записи в очередь, а вывод в консоль и файл logs/<name>.log
+    выполняет фоновый поток. Поэтому запись лога не блокирует цикл событий
+    файловыми операциями и ротацией. Если LOG_JSON включен, записи
+    форматируются в JSON.
+
     Args:
         name: Имя логгера
 
     Returns:
         Настроенный объект логгера
     """
+    global _listener, _queue_handler
 
     logger = logging.getLogger(name)
 
     level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
     logger.setLevel(level)
 
-    if logger.handlers:
+    if _listener is not None:
         return logger
 
-    formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+    if LOG_JSON:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
     logs_dir = os.path.join(os.getcwd(), "logs")
     os.makedirs(logs_dir, exist_ok=True)
@@ -39,7 +162,17 @@ def setup_logger(name="sports_platform_notifier"):
         backupCount=5
     )
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_EVERY))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(_queue_handler.queue, console_handler, file_handler)
+    _listener.start()
+    atexit.register(_stop_listener)
 
     return logger
 
@@ -55,4 +188,4 @@ def get_logger(name=None):
     """
     if name:
         return logging.getLogger(f"sports_platform_notifier.{name}")
-    return logging.getLogger("sports_platform_notifier")
\ No newline at end of file
+    return logging.getLogger("sports_platform_notifier")
@@ -0,0 +1,198 @@
+""" Метрики приложения в формате Prometheus """
+
+import abc
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Границы интервалов гистограмм задержек (в секундах)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(abc.ABC):
+    """
+    Базовый класс метрики с набором меток
+    """
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abc.abstractmethod
+    def collect(self) -> List[str]:
+        """Строки значений метрики в текстовом формате Prometheus"""
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_format(value)}" for key, value in items]
+
+
+class Gauge(Metric):
+    """Значение, которое может расти и уменьшаться"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labelvalues: str):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, key)} {_format(value)}" for key, value in items]
+
+
+class Histogram(Metric):
+    """
+    Гистограмма наблюдений с фиксированными границами интервалов
+
+    Наблюдение стоит одного бинарного поиска и трех сложений под блокировкой,
+    поэтому гистограммы можно оставлять включенными на горячем пути.
+    """
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Для каждого набора меток: количество наблюдений по интервалам, сумма и общее количество
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Набор метрик процесса
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Текстовое представление всех метрик в формате Prometheus
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+NOTIFICATION_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "notification_queue_depth",
+    "Количество неотправленных уведомлений, время отправки которых наступило"
+))
+NOTIFICATION_QUEUE_OLDEST_AGE = REGISTRY.register(Gauge(
+    "notification_queue_oldest_age_seconds",
+    "Сколько секунд ждет отправки самое старое уведомление"
+))
+NOTIFICATION_SEND_SECONDS = REGISTRY.register(Histogram(
+    "notification_send_seconds",
+    "Время отправки уведомления в Telegram по типу уведомления и результату",
+    ("type", "outcome")
+))
+API_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "api_request_seconds",
+    "Время запроса к API основного приложения, включая повторы, по конечной точке и результату",
+    ("method", "route", "outcome")
+))
+DB_POOL_CHECKOUT_SECONDS = REGISTRY.register(Histogram(
+    "db_pool_checkout_seconds",
+    "Время ожидания соединения из пула базы данных"
+))
+DB_POOL_CHECKED_OUT = REGISTRY.register(Gauge(
+    "db_pool_checked_out",
+    "Количество соединений, выданных из пула базы данных"
+))
+HANDLER_SECONDS = REGISTRY.register(Histogram(
+    "handler_seconds",
+    "Время обработки обновления Telegram по команде",
+    ("command",)
+))
+THROTTLED_UPDATES = REGISTRY.register(Counter(
+    "throttled_updates_total",
+    "Количество отброшенных сообщений и нажатий кнопок по причине (rate - превышен лимит, duplicate - повторное нажатие)",
+    ("reason",)
+))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "log_records_dropped_total",
+    "Количество записей лога, отброшенных из-за переполнения очереди фонового потока"
+))
@@ -0,0 +1,48 @@
+""" Учет времени по фазам обработки (база данных, API, Telegram) в пределах одного обновления """
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+DB = "db"
+API = "api"
+TELEGRAM = "telegram"
+
+_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("phases", default=None)
+
+
+def start() -> Dict[str, float]:
+    """
+    Начало учета для текущего контекста (обновления)
+
+    Returns:
+        Словарь, в котором накапливается время фаз в секундах
+    """
+    phases = {DB: 0.0, API: 0.0, TELEGRAM: 0.0}
+    _phases.set(phases)
+    return phases
+
+
+def record(phase: str, seconds: float):
+    """
+    Добавление времени к фазе текущего обновления; вне обновления ничего не делает
+    """
+    phases = _phases.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def measure(phase: str) -> Iterator[None]:
+    """
+    Измерение времени блока кода как части фазы текущего обновления
+    """
+    if _phases.get() is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started_at)